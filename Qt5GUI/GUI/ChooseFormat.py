@@ -54,6 +54,9 @@ class Ui_ChooseFormat(object):
         self.radioButton_2009 = QtWidgets.QRadioButton(ChooseFormat)
         self.radioButton_2009.setGeometry(QtCore.QRect(9, 205, 113, 22))
         self.radioButton_2009.setObjectName("radioButton_2009")
+        self.checkBox_follow = QtWidgets.QCheckBox(ChooseFormat)
+        self.checkBox_follow.setGeometry(QtCore.QRect(128, 205, 252, 22))
+        self.checkBox_follow.setObjectName("checkBox_follow")
         self.buttonBox = QtWidgets.QDialogButtonBox(ChooseFormat)
         self.buttonBox.setEnabled(True)
         self.buttonBox.setGeometry(QtCore.QRect(200, 233, 176, 27))
@@ -83,4 +86,6 @@ class Ui_ChooseFormat(object):
         self.radioButton_bionlp_2009.setText(_translate("ChooseFormat", "BioNLP2009 Shared Task Format"))
         self.radioButton_2008.setText(_translate("ChooseFormat", "CoNLL 2008"))
         self.radioButton_2009.setText(_translate("ChooseFormat", "CoNLL 2009"))
+        self.checkBox_follow.setToolTip(_translate("ChooseFormat", "Load the sentences appended to the file later too (e.g. by a running parser)"))
+        self.checkBox_follow.setText(_translate("ChooseFormat", "Follow the file as it grows"))
 
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5 import QtCore
+
+from ioformats.corpus_format import Monitor, LoadCancelled
+from libwwnlp.corpus_navigator import CorpusNavigator
+
+
+class SignalMonitor(Monitor):
+    """A Monitor that forwards the progress of the loading to a Qt signal (which is thread-safe)."""
+    def __init__(self, signal):
+        super().__init__()
+        self._signal = signal
+
+    def progressed(self, instance_nr: int):
+        self._signal.emit(instance_nr)
+        super().progressed(instance_nr)
+
+
+class CorpusLoader(QtCore.QThread):
+    """Loads a corpus for the CorpusNavigator on a worker thread, so the GUI is not blocked while a large file loads.
+
+    The progress is reported through the `progressed` signal and the loading can be stopped by cancel(). When the
+    thread is finished, `cancelled` and `error` tell the outcome. The navigator is not changed by the thread (the GUI
+    thread reads it meanwhile): the loaded corpus is added by insert(), which is to be called from the `finished`
+    handler on the GUI thread.
+    """
+    progressed = QtCore.pyqtSignal(int)
+
+    def __init__(self, corp_nav: CorpusNavigator, corpus_path: str, corpus_format: str, corpus_type: str,
+                 min_sent: int, max_sent: int, parent=None, follow: bool=False):
+        super().__init__(parent)
+        self._corp_nav = corp_nav
+        self._corpus_path = corpus_path
+        self._corpus_type = corpus_type
+        self._args = (corpus_path, corpus_format, min_sent, max_sent)
+        self._follow = follow
+        self._monitor = SignalMonitor(self.progressed)
+        self._loaded = None  # The result of CorpusNavigator#load_corpus
+        self.cancelled = False
+        self.error = None
+
+    def cancel(self):
+        self._monitor.cancel()
+
+    def insert(self):
+        """Adds the loaded corpus to the navigator (on the GUI thread, after the loading finished successfully)."""
+        if self._loaded is not None:
+            self._corp_nav.insert_corpus(self._corpus_path, self._corpus_type, *self._loaded)
+            self._loaded = None
+
+    def run(self):
+        try:
+            self._loaded = self._corp_nav.load_corpus(*self._args, monitor=self._monitor, follow=self._follow)
+        except LoadCancelled:
+            self.cancelled = True
+        except Exception as e:  # Report every failure of the loader to the user instead of killing the thread
+            self.error = e
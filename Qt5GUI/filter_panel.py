@@ -4,7 +4,7 @@
 from PyQt5 import QtWidgets
 
 from Qt5GUI.qt5_nlp_canvas import Qt5NLPCanvas
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 
 """A FilterPanel updates a NLPCanvas whenever the filter has been changed."""
 
@@ -13,7 +13,7 @@ checkbox_val = {True: 2, False: 0}
 
 
 class FilterPanel:
-    def __init__(self, gui, canvas: Qt5NLPCanvas):
+    def __init__(self, gui, canvas: Qt5NLPCanvas, update_delay: int=250):
 
         self._canvas = canvas
         self._canvas.listeners.add(self)
@@ -62,6 +62,22 @@ class FilterPanel:
 
         self._updating = False
 
+        # Bursts of filter changes (e.g. typing into a filter field) are coalesced into one render after update_delay
+        #  milliseconds of idleness, see _schedule_update()
+        self._update_timer = QTimer()
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(update_delay)
+        self._update_timer.timeout.connect(self._canvas.update_nlp_graphics)
+
+    def _schedule_update(self):
+        """Requests a repaint after the filter has changed.
+
+        Restarting the timer drops the pending request, so only the newest filter state is rendered. Prefetched
+        renders queued with the old filter are stale too, so they are dropped as well.
+        """
+        self._canvas.cancel_prefetch()
+        self._update_timer.start()
+
     @staticmethod
     def _update_match_lists(edge_props, allowed_edge_props, match_class_checkbox, name):
         match_class_checkbox.setEnabled(name in edge_props)
@@ -86,17 +102,17 @@ class FilterPanel:
     def match_action_performed(self, value):
         self._canvas.filter.perform_match_action(value, 'eval_status_Match')
         if not self._updating:
-            self._canvas.update_nlp_graphics()
+            self._schedule_update()
 
     def negative_action_performed(self, value):
         self._canvas.filter.perform_match_action(value, 'eval_status_FN')
         if not self._updating:
-            self._canvas.update_nlp_graphics()
+            self._schedule_update()
 
     def positive_action_performed(self, value):
         self._canvas.filter.perform_match_action(value, 'eval_status_FP')
         if not self._updating:
-            self._canvas.update_nlp_graphics()
+            self._schedule_update()
 
     def selected_edge_types_changed(self):
         if not self._updating:
@@ -106,42 +122,42 @@ class FilterPanel:
                     self._canvas.filter.allowed_edge_types.add(item_text)
                 elif item_text in self._canvas.filter.allowed_edge_types:
                     self._canvas.filter.allowed_edge_types.remove(item_text)
-            self._canvas.update_nlp_graphics()
+            self._schedule_update()
 
     def selected_token_props_changed(self, _=None):
         self._canvas.filter.forbidden_token_properties = \
             {item.text() for item in self._token_prop_list.findItems('', Qt.MatchStartsWith) if not item.isSelected()}
         if not self._updating:
-            self._canvas.update_nlp_graphics()
+            self._schedule_update()
 
     def allowed_token_prop_vals_changed(self, text):
         self._canvas.filter.parse_interval(text, self._canvas.filter.tok_allowed_token_propvals)
-        self._canvas.update_nlp_graphics()
+        self._schedule_update()
 
     # TODO: This should not be the same as above! Should filter edges starts or ends on thefiltered tokens!
     def token_text_field_changed(self, text):
         self._canvas.filter.parse_interval(text, self._canvas.filter.allowed_token_propvals)
-        self._canvas.update_nlp_graphics()
+        self._schedule_update()
 
     def edge_label_field_changed(self, text):
         self._canvas.filter.allowed_labels = {label for label in text.split(',')}
-        self._canvas.update_nlp_graphics()
+        self._schedule_update()
 
     def whole_word_action_performed(self, value):
         self._canvas.filter.tok_propvals_whole_word = bool(value)
-        self._canvas.update_nlp_graphics()
+        self._schedule_update()
 
     def use_path_action(self, value):
         self._canvas.filter.use_path = bool(value)
-        self._canvas.update_nlp_graphics()
+        self._schedule_update()
 
     def collapse_action(self, value):
         self._canvas.filter.collapse = bool(value)
-        self._canvas.update_nlp_graphics()
+        self._schedule_update()
 
     def whole_words_action(self, value):
         self._canvas.filter.propvals_whole_word = bool(value)
-        self._canvas.update_nlp_graphics()
+        self._schedule_update()
 
     def _list_selection(self, list_widget, all_items, selected_items):
         self._updating = True
@@ -165,4 +181,6 @@ class FilterPanel:
         self._list_selection(self._token_prop_list, self._canvas.used_properties,
                              self._canvas.used_properties - self._canvas.filter.forbidden_token_properties)
 
+        # The new instance is rendered right away, which supersedes any pending update
+        self._update_timer.stop()
         self._canvas.update_nlp_graphics()
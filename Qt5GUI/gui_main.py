@@ -4,12 +4,13 @@
 import sys
 from os.path import basename
 
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore, QtWidgets
 
 from Qt5GUI.GUI.ChooseFormat import Ui_ChooseFormat
 from Qt5GUI.GUI.GUI import Ui_MainWindow
 from Qt5GUI.qt5_nlp_canvas import Qt5NLPCanvas
 from Qt5GUI.filter_panel import FilterPanel
+from Qt5GUI.corpus_loader import CorpusLoader
 
 from libwwnlp.corpus_navigator import CorpusNavigator
 
@@ -23,6 +24,10 @@ class MyWindow(QtWidgets.QMainWindow):
         self.corp_widget = corp_widget
         self.corp_nav = corp_nav
         self.corp_type = corp_type
+        self.min_sent = 0
+        self.max_sent = 200
+        self._loader = None
+        self._progress = None
         self.known_corpus_formats = {'CoNLL2000': self.ui.radioButton2000,
                                      'CoNLL2002': self.ui.radioButton_2002,
                                      'CoNLL2003': self.ui.radioButton_2003,
@@ -49,10 +54,54 @@ class MyWindow(QtWidgets.QMainWindow):
 
         self.close()
         directory = QtWidgets.QFileDialog.getOpenFileName(QtWidgets.QFileDialog())[0]
-        item = QtWidgets.QListWidgetItem(basename(directory))
-        self.corp_widget.addItem(item)
-        self.corp_nav.add_corpus(directory, corp_format, self.corp_type)
-        self.corp_widget.item(0).setSelected(True)
+        if len(directory) == 0:
+            return
+        corp_format = self._check_format(directory, corp_format)
+
+        # Load on a worker thread, so the application stays responsive and the loading can be cancelled
+        follow = self.ui.checkBox_follow.isChecked()
+        # The number of instances is known only if the range is loaded (not the whole file), otherwise the progress
+        # dialog is a busy indicator
+        bounded = not follow and corp_format is not None and self.corp_nav.known_corpus_formats[corp_format].loads_range
+        self._progress = QtWidgets.QProgressDialog('Loading {0}...'.format(basename(directory)), 'Cancel',
+                                                   0, self.max_sent - self.min_sent if bounded else 0, self._parent)
+        self._loader = CorpusLoader(self.corp_nav, directory, corp_format, self.corp_type, self.min_sent,
+                                    self.max_sent, self, follow=follow)
+        self._loader.progressed.connect(self._progress.setValue)
+        self._progress.canceled.connect(self._loader.cancel)
+        self._loader.finished.connect(lambda: self._loading_finished(directory))
+        self._progress.show()
+        self._loader.start()
+
+    def _check_format(self, directory, corp_format):
+        """Sniffs the format of the file before the (possibly long) loading.
+
+        Without a selected format the detected one is used (the navigator detects it). If the selected format does
+        not match the head of the file at all, but an other format does, the user is asked which one to use.
+        """
+        if corp_format is None:
+            return None
+        scores = {name: score for score, name in self.corp_nav.suggest_formats(directory)}
+        best_score, best_format = max((score, name) for name, score in scores.items())
+        if scores[corp_format] == 0.0 and best_score >= 0.5 and best_format != corp_format:
+            answer = QtWidgets.QMessageBox.question(self._parent, 'Format mismatch',
+                                                    '{0} does not look like {1}, but like {2}. Load it as {2}?'.
+                                                    format(basename(directory), corp_format, best_format))
+            if answer == QtWidgets.QMessageBox.Yes:
+                return best_format
+        return corp_format
+
+    def _loading_finished(self, directory):
+        self._progress.reset()
+        if self._loader.error is not None:
+            QtWidgets.QMessageBox.warning(self._parent, 'Loading failed',
+                                          'Could not load {0}: {1}'.format(directory, self._loader.error))
+        elif not self._loader.cancelled:
+            self._loader.insert()
+            item = QtWidgets.QListWidgetItem(basename(directory))
+            self.corp_widget.addItem(item)
+            self.corp_widget.item(0).setSelected(True)
+        self._loader = None
 
     def reject(self):
         self.close()
@@ -85,7 +134,7 @@ class MyForm(QtWidgets.QMainWindow):
         self.ui.actionExport.setEnabled(True)
 
         # Spinner stuff
-        self.ui.spinBox.valueChanged.connect(lambda spinbox_value: self.navigator.update_canvas(spinbox_value-1))
+        self.ui.spinBox.valueChanged.connect(self._sentence_changed)
 
         # Search stuff
         self.ui.searchResultLisWidget.itemClicked.connect(self.search_item_clicked)
@@ -94,6 +143,28 @@ class MyForm(QtWidgets.QMainWindow):
         FilterPanel(self.ui, self.canvas)
         self.navigator.update_canvas(-1)
 
+        # Followed corpora (see CorpusNavigator#add_corpus) are checked for appended sentences periodically
+        self._follow_timer = QtCore.QTimer(self)
+        self._follow_timer.timeout.connect(self._poll_followed)
+        self._follow_timer.start(2000)
+
+    def _sentence_changed(self, spinbox_value):
+        index = spinbox_value - 1
+        self.navigator.update_canvas(index)
+        if self.navigator.max_length > 0:
+            # Render the following sentences first as the user is more likely to step forward
+            distance = self.canvas.prefetch_distance
+            neighbours = [i for i in range(index + 1, index + distance + 1) if i < self.navigator.max_length] + \
+                         [i for i in range(index - 1, index - distance - 1, -1) if i >= 0]
+            self.canvas.prefetch(self.navigator.get_instance, neighbours)
+
+    def _poll_followed(self):
+        """Extends the spinner range with the sentences appended to the followed corpora, keeping the current one."""
+        if self.navigator.poll_followed():
+            self.ui.spinBox.setMinimum(self.navigator.min_length)
+            self.ui.spinBox.setMaximum(self.navigator.max_length)
+            self.ui.SpinBoxLabel.setText('of {0}'.format(self.navigator.max_length))
+
     def _add_corpus(self, corp_widget, corp_type):
         QtWidgets.QMainWindow()
         myapp = MyWindow(corp_widget, self.navigator, corp_type, self)
@@ -125,6 +196,9 @@ class MyForm(QtWidgets.QMainWindow):
         if selected_guess:
             self.navigator.select_guess(selected_guess[0].text())
 
+        # Diff the selected pair in the background while the user is looking at the first sentences
+        self.navigator.precompute_diffs()
+
         # Update spinner borders
         prev_value = self.ui.spinBox.value()
         self.ui.spinBox.setMinimum(self.navigator.min_length)
@@ -1,16 +1,103 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from PyQt5 import QtWidgets, QtSvg
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5 import QtWidgets, QtGui, QtCore
 
 from libwwnlp.nlp_canvas import NLPCanvas
+from libwwnlp.model.nlp_instance import RenderType
+from libwwnlp.render.backends.qpainter_writer import QPainterRenderer
+from libwwnlp.render.renderers.alignment_matrix_renderer import AlignmentMatrixRenderer
+from libwwnlp.render.renderers.alignment_renderer import AlignmentRenderer
+from libwwnlp.render.renderers.single_sentence_renderer import SingleSentenceRenderer
+from libwwnlp.render.renderers.window_renderer import WindowRenderer
+
+
+class PictureItem(QtWidgets.QGraphicsItem):
+    """A QGraphicsItem that replays a QPicture, so the scene and the item can be reused for every picture."""
+    def __init__(self):
+        super().__init__()
+        self._picture = QtGui.QPicture()
+
+    def set_picture(self, picture):
+        self.prepareGeometryChange()
+        self._picture = picture
+        self.update()
+
+    def boundingRect(self):
+        return QtCore.QRectF(self._picture.boundingRect())
+
+    def paint(self, painter, option, widget=None):
+        painter.drawPicture(0, 0, self._picture)
+
+
+class HoverFilter(QtCore.QObject):
+    """Forwards the mouse movements over the graphics view to the canvas for edge inspection."""
+    def __init__(self, canvas):
+        super().__init__()
+        self._canvas = canvas
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.MouseMove:
+            self._canvas.hover(self._canvas.ui.graphicsView.mapToScene(event.pos()), event.globalPos())
+        elif event.type() == QtCore.QEvent.Leave:
+            self._canvas.hover(None, None)
+        return False
 
 
 class Qt5NLPCanvas(NLPCanvas):
-    def __init__(self, ui):
+    """An NLPCanvas that shows the rendered instance in the main window's graphics view.
+
+    The instance is drawn natively with QPainter (see QPainterRenderer) into a QPicture, which is shown in one
+    reused QGraphicsScene. The SVGWrite backend (renderer_backend) is still used for exporting to files.
+
+    Hovering over an edge highlights it and shows its details in a tooltip. The edge is looked up in the spatial
+    indexes of the layouts (see NLPCanvas#edge_at), so no linear scan is needed over the shapes.
+
+    Instances longer than window_threshold tokens (e.g. whole documents) are laid out only once and just the window
+    around the visible part is drawn, which is redrawn when the view is scrolled (see NLPCanvas#global_layout).
+
+    Rendered images are cached by (instance, filter state, renderer and its parameters). The neighbours of the
+    current sentence can be rendered in the background into the same cache (see prefetch), so stepping to them shows
+    the image immediately.
+
+    Attributes:
+        prefetch_distance (int): How many sentences to prefetch before and after the current one.
+        window_threshold (int): The number of tokens above which only the visible window is drawn.
+    """
+    def __init__(self, ui, prefetch_distance: int=2, cache_size: int=32, window_threshold: int=200):
         self.ui = ui
         self.listeners = set()
         super().__init__()
+        self.screen_backend = QPainterRenderer()
+        self.renderer_backends['QPainter'] = self.screen_backend
+        self._picture_item = PictureItem()
+        self._scene = QtWidgets.QGraphicsScene(self.ui.graphicsView)
+        self._scene.addItem(self._picture_item)
+        self.ui.graphicsView.setScene(self._scene)
+        self._highlighted_edge = None
+        self._highlight_items = []
+        self._hover_filter = HoverFilter(self)
+        self.ui.graphicsView.setMouseTracking(True)
+        self.ui.graphicsView.viewport().installEventFilter(self._hover_filter)
+        self.prefetch_distance = prefetch_distance
+        self.window_threshold = window_threshold
+        self._drawn_window = None  # The (left, right) part of the global layout in the picture, if windowed
+        self.ui.graphicsView.horizontalScrollBar().valueChanged.connect(self._update_window)
+        self._cache_size = cache_size
+        # {(NLPInstance, filter state key, renderer key, renderer params): (QPicture, shape indexes)} in LRU order
+        self._render_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # One worker is enough: the layouts of its renderers are stateful, so they can not be shared
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=1)
+        self._prefetch_futures = {}  # {index: Future}
+        self._prefetch_renderers = {RenderType.single: SingleSentenceRenderer(),
+                                    RenderType.alignment: AlignmentRenderer(),
+                                    'alignment_matrix': AlignmentMatrixRenderer()}
 
     def fire_instance_changed(self):
         """
@@ -19,6 +106,61 @@ class Qt5NLPCanvas(NLPCanvas):
         for l in self.listeners:
             l.instance_changed()
 
+    def _get_cached(self, key):
+        with self._cache_lock:
+            rendered = self._render_cache.get(key)
+            if rendered is not None:
+                self._render_cache.move_to_end(key)
+            return rendered
+
+    def _store_cached(self, key, rendered):
+        with self._cache_lock:
+            self._render_cache[key] = rendered
+            self._render_cache.move_to_end(key)
+            while len(self._render_cache) > self._cache_size:
+                self._render_cache.popitem(last=False)
+
+    def prefetch(self, get_instance, indexes):
+        """Renders the instances at the given indexes in the background into the render cache.
+
+        Pending renders of indexes not in the new list are cancelled, as they are not the neighbours any more.
+
+        Args:
+            get_instance (callable): Returns the instance for an index (e.g. CorpusNavigator#get_instance).
+            indexes (list): The indexes to render in order of priority.
+        """
+        for index, future in self._prefetch_futures.items():
+            if index not in indexes:
+                future.cancel()
+        # The worker gets a snapshot, so later changes of the filter and the renderer parameters do not affect it
+        filter_snapshot = copy.deepcopy(self.filter)
+        params = {key: copy.deepcopy(renderer.params) for key, renderer in self.renderers.items()}
+        self._prefetch_futures = {index: self._prefetch_pool.submit(self._prefetch_worker, get_instance, index,
+                                                                    filter_snapshot, params)
+                                  for index in indexes}
+
+    def cancel_prefetch(self):
+        """Cancels the pending background renders (e.g. because they were queued with an outdated filter)."""
+        for future in self._prefetch_futures.values():
+            future.cancel()
+        self._prefetch_futures = {}
+
+    def _prefetch_worker(self, get_instance, index, filter_snapshot, params):
+        instance = get_instance(index)
+        if self._is_windowed(instance):  # Long instances are drawn by windows, a whole picture would not be used
+            return
+        curr_filter = copy.deepcopy(filter_snapshot)
+        # Mirror set_nlp_instance(), which allows all edge types of the new instance
+        curr_filter.allowed_edge_types = {edge.edge_type for edge in instance.get_edges()}
+        renderer_key = self.renderer_key(instance)
+        key = (instance, curr_filter.state_key(), renderer_key, repr(params[renderer_key]))
+        if self._get_cached(key) is None:
+            renderer = self._prefetch_renderers[renderer_key]
+            renderer.params = params[renderer_key]
+            renderer.backend = self.screen_backend
+            picture = self.screen_backend.render_nlpgraphics(renderer, curr_filter.filter(instance))
+            self._store_cached(key, (picture, renderer.shape_indexes()))
+
     def update_nlp_graphics(self):
         """Updates the current graph.
 
@@ -26,10 +168,83 @@ class Qt5NLPCanvas(NLPCanvas):
         drawing parameters.
         """
         # print('NLPCanvas#updateNLPGraphics')
-        scene = QtWidgets.QGraphicsScene()
-        self.ui.graphicsView.setScene(scene)
-        br = QtSvg.QGraphicsSvgItem()
-        rr = QtSvg.QSvgRenderer(self.render_nlpgraphics())
-        br.setSharedRenderer(rr)
-        scene.addItem(br)
+        self._set_highlight(None)
+        if self._is_windowed(self.nlp_instance):
+            display_list = self.global_layout(self.screen_backend)
+            self.shape_indexes = display_list.shape_indexes  # The picture is placed in the global coordinates
+            self._scene.setSceneRect(0, 0, display_list.width, display_list.height)
+            self._drawn_window = None
+            self._update_window()
+            self.ui.graphicsView.show()
+            return
+
+        self._drawn_window = None
+        key = (self.nlp_instance, self.filter.state_key(), self.renderer_key(self.nlp_instance),
+               repr(self.renderer.params))
+        rendered = self._get_cached(key)
+        if rendered is None:
+            self.renderer.backend = self.screen_backend
+            rendered = (self.screen_backend.render_nlpgraphics(self.renderer, self.filter_instance()),
+                        self.renderer.shape_indexes())
+            self._store_cached(key, rendered)
+
+        picture, self.shape_indexes = rendered
+        self._picture_item.setPos(0, 0)
+        self._picture_item.set_picture(picture)
+        self._scene.setSceneRect(self._picture_item.boundingRect())
         self.ui.graphicsView.show()
+
+    def _is_windowed(self, instance):
+        return instance.render_type == RenderType.single and len(instance.tokens) > self.window_threshold
+
+    def _update_window(self):
+        """Draws the tokens around the visible part of the global layout, if it is not drawn yet.
+
+        The window spans one view width more on both sides, so scrolling needs a redraw only at every view width.
+        """
+        if self.nlp_instance is None or not self._is_windowed(self.nlp_instance):
+            return
+        display_list = self.global_layout(self.screen_backend)
+        view = self.ui.graphicsView
+        visible = view.mapToScene(view.viewport().rect()).boundingRect()
+        left, right = max(visible.left(), 0), min(visible.right(), display_list.width)
+        if self._drawn_window is not None and self._drawn_window[0] <= left and right <= self._drawn_window[1]:
+            return
+        margin = right - left
+        renderer = WindowRenderer(display_list, *display_list.tokens_between(left - margin, right + margin))
+        self._drawn_window = renderer.window()
+        self._picture_item.set_picture(self.screen_backend.render_nlpgraphics(renderer, self.nlp_instance))
+        self._picture_item.setPos(self._drawn_window[0], 0)
+
+    def _set_highlight(self, edge):
+        for item in self._highlight_items:
+            self._scene.removeItem(item)
+        self._highlight_items = []
+        self._highlighted_edge = edge
+        if edge is not None:
+            for x, y, width, height in self.edge_bounds(edge):
+                item = self._scene.addRect(x, y, width, height, QtGui.QPen(QtCore.Qt.NoPen),
+                                           QtGui.QBrush(QtGui.QColor(255, 200, 0, 80)))
+                self._highlight_items.append(item)
+
+    def hover(self, scene_pos, global_pos):
+        """Highlights the edge under the mouse and shows its details in a tooltip.
+
+        Args:
+            scene_pos (QPointF): The position of the mouse in scene coordinates or None if the mouse left the view.
+            global_pos (QPoint): The position of the mouse in screen coordinates.
+        """
+        edge = None if scene_pos is None else self.edge_at((scene_pos.x(), scene_pos.y()))
+        if edge is self._highlighted_edge:
+            return
+        self._set_highlight(edge)
+        if edge is None:
+            QtWidgets.QToolTip.hideText()
+        else:
+            text = '{0} ({1}): {2} -> {3}'.format(edge.get_label_with_note(), edge.edge_type, edge.start.index,
+                                                  edge.end.index)
+            if edge.description is not None:
+                text += '\n{0}'.format(edge.description)
+            if len(edge.properties) > 0:
+                text += '\n{0}'.format(', '.join(sorted(edge.properties)))
+            QtWidgets.QToolTip.showText(global_pos, text, self.ui.graphicsView)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import multiprocessing
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from ioformats.corpus_format import Monitor, create_corpus_file
+from ioformats.format_registry import known_corpus_formats
+from ioformats.format_sniffer import detect_format
+from ioformats.tab_processor import TabFormat
+
+"""
+ * Headless conversion of corpora between the supported formats (see CorpusFormat#write()), e.g. from CoNLL 2009 to
+ * MaltTab. The input formats with iter_instances() (the tab formats, JSONL, Giza and thebeast) are streamed, so the
+ * memory use does not depend on the size of the corpus. The other ones (Lisp S-expr, Gale and BioNLP 2009) are loaded
+ * whole before writing:
+ *
+ *     whatswrong.py convert corpus.conll09.gz corpus.malt --from-format CoNLL2009 --to-format MaltTab --workers 4
+ *
+ * With workers the tab formats are parsed and serialized in a process pool: the main process only splits the input
+ * into chunks of sentence rows and writes the converted chunks in order. At most two chunks per worker are in flight.
+"""
+
+
+def _convert_chunk(input_format: TabFormat, output_format, chunk: list) -> str:
+    """
+     * Parses the rows of the sentences of the chunk and serializes them in the output format (in a worker process).
+    """
+    return ''.join(output_format.format_instance(input_format.create(rows)) for rows in chunk)
+
+
+def _check_properties(output_format, instance) -> bool:
+    """
+     * Checks that the tokens have the properties that the output format writes (see TabSchema#missing_properties()),
+     * e.g. the tokens of Gale alignments have no Word for MaltTab. The missing words are an error, the other missing
+     * properties are only reported, as they are written as '_'.
+     *
+     * @return False if the instance has no tokens to check.
+     * @throws ValueError if the tokens have no words.
+    """
+    schema = getattr(output_format, 'schema', None)
+    if schema is None or len(instance.tokens) == 0:
+        return schema is None
+    missing = schema.missing_properties(instance)
+    if 'Word' in missing:
+        raise ValueError('The tokens have no Word property to write in {0} (only {1})'.
+                         format(output_format.name, ', '.join(sorted({name for token in instance.tokens
+                                                                      for name in token.token_properties}))))
+    if len(missing) > 0:
+        print('The tokens have no {0}, written as \'_\' in {1}'.format(', '.join(missing), output_format.name),
+              file=sys.stderr)
+    return True
+
+
+def _checked(items, output_format, create=None):
+    """
+     * Checks the first instance with tokens by _check_properties() before anything is written.
+     *
+     * @param items         the instances, or the sentences that create() makes instances of (e.g. rows).
+     * @param output_format the CorpusFormat of the output.
+     * @param create        the function that creates the instance of an item, None if the items are instances.
+     * @return an iterator of all the items.
+    """
+    iterator = iter(items)
+    head = []
+    for item in iterator:
+        head.append(item)
+        if _check_properties(output_format, item if create is None else create(item)):
+            break
+    return chain(head, iterator)
+
+
+def _chunks(iterable, chunk_size: int):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, chunk_size))
+    while len(chunk) > 0:
+        yield chunk
+        chunk = list(islice(iterator, chunk_size))
+
+
+def convert_corpus(input_file: str, input_format, output_file: str, output_format, from_sent_nr: int=0,
+                   to_sent_nr: int=sys.maxsize, workers: int=None, chunk_size: int=256, monitor: Monitor=None) -> int:
+    """
+     * Converts the given range of sentences of the input file into the output format.
+     *
+     * @param input_file    the corpus to convert.
+     * @param input_format  the CorpusFormat of the input.
+     * @param output_file   the file to write (compressed if it has a compression suffix).
+     * @param output_format the CorpusFormat of the output (it must support writing, see CorpusFormat#write()).
+     * @param from_sent_nr  the first sentence to convert.
+     * @param to_sent_nr    the end of the sentences to convert (exclusive).
+     * @param workers       the number of parser processes, None or 0 to convert in this process. Only the tab formats
+     *                      without an open track are converted in parallel, the others are converted in this process
+     *                      (streamed if the format has iter_instances()).
+     * @param chunk_size    the number of sentences sent to a worker at once.
+     * @param monitor       the monitor to notify about the progress (after every chunk with workers).
+     * @return the number of the converted sentences.
+     * @throws LoadCancelled if the monitor was cancelled.
+     * @throws ValueError if the tokens of the input have no words for the output format (nothing is written then).
+    """
+    if not workers or not isinstance(input_format, TabFormat) or input_format._supports_open:
+        if hasattr(input_format, 'iter_instances'):
+            instances = input_format.iter_instances(input_file, from_sent_nr, to_sent_nr)
+        else:
+            instances = input_format.load(input_file, from_sent_nr, to_sent_nr)
+        try:
+            return output_format.write(output_file, _checked(instances, output_format), monitor)
+        finally:
+            if hasattr(instances, 'close'):
+                instances.close()
+
+    monitor = Monitor() if monitor is None else monitor
+    instance_nr = 0
+    rows = input_format.iter_rows(input_file, from_sent_nr, to_sent_nr)
+    try:
+        sentences = _checked(rows, output_format, input_format.create)
+    except ValueError:
+        rows.close()
+        raise
+    # Spawned as the BioNLP 2009 parsers (see BioNLP2009SharedTaskFormat#load()): convert_corpus() may be called from a
+    # thread, and forking a multithreaded process is unsafe
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    with pool, create_corpus_file(output_file) as writer:
+        pending = deque()  # [(Future, number of sentences)] in the order of the input
+        try:
+            for chunk in _chunks(sentences, chunk_size):
+                pending.append((pool.submit(_convert_chunk, input_format, output_format, chunk), len(chunk)))
+                while len(pending) > 0 and (len(pending) >= 2 * workers or pending[0][0].done()):
+                    instance_nr = _write_converted(writer, pending.popleft(), instance_nr, monitor)
+            while len(pending) > 0:
+                instance_nr = _write_converted(writer, pending.popleft(), instance_nr, monitor)
+        finally:
+            rows.close()
+            for future, _ in pending:
+                future.cancel()
+    return instance_nr
+
+
+def _write_converted(writer, pending_chunk, instance_nr: int, monitor: Monitor) -> int:
+    future, chunk_length = pending_chunk
+    writer.write(future.result())
+    instance_nr += chunk_length
+    monitor.progressed(instance_nr)
+    return instance_nr
+
+
+def main(argv: list) -> int:
+    """
+     * The convert command of whatswrong.py.
+     *
+     * @param argv the command line arguments after 'convert'.
+     * @return the exit status.
+    """
+    formats = known_corpus_formats()
+    parser = argparse.ArgumentParser(prog='whatswrong.py convert',
+                                     description='Converts a corpus into an other format (with bounded memory if the '
+                                                 'input format can be streamed).')
+    parser.add_argument('input', help='the corpus to convert (may be compressed)')
+    parser.add_argument('output', help='the file to write (compressed if it ends in .gz, .bz2, .xz, .lzma or .zst)')
+    parser.add_argument('--from-format', choices=sorted(formats), help='the input format (detected if not given)')
+    parser.add_argument('--to-format', choices=sorted(formats), required=True, help='the output format')
+    parser.add_argument('--first', type=int, default=0, help='the first sentence to convert (counted from 0)')
+    parser.add_argument('--last', type=int, default=sys.maxsize, help='the sentence to stop before')
+    parser.add_argument('--workers', type=int, default=0, help='the number of parser processes (default: none)')
+    parser.add_argument('--chunk-size', type=int, default=256, help='the number of sentences sent to a worker at once')
+    args = parser.parse_args(argv)
+
+    input_format = args.from_format
+    if input_format is None:
+        input_format = detect_format(args.input, formats)
+        if input_format is None:
+            print('Could not detect the format of {0}, use --from-format'.format(args.input), file=sys.stderr)
+            return 1
+    try:
+        instance_nr = convert_corpus(args.input, formats[input_format], args.output, formats[args.to_format],
+                                     args.first, args.last, args.workers, args.chunk_size)
+    except (NotImplementedError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    print('Converted {0} sentences from {1} to {2}'.format(instance_nr, input_format, args.to_format), file=sys.stderr)
+    return 0
@@ -1,34 +1,221 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+try:  # Optional dependency: zstd compressed corpora can only be read if it is installed
+    import zstandard
+except ImportError:
+    zstandard = None
+
 from libwwnlp.model.nlp_instance import NLPInstance
 
 """
- * The CorpusFormat interface describes objects that can load a list of NLPInstances from a file. The Corpus can also
- * provide a GUI element that allows the user to configure how the file is to be loaded.
+ * The CorpusFormat interface describes objects that can load a list of NLPInstances from a file (and write them back
+ * if the format supports it, see CorpusFormat#write()). The Corpus can also provide a GUI element that allows the user
+ * to configure how the file is to be loaded.
  *
  * @author Sebastian Riedel
 """
 
 
+def _zstd_open(file_name: str, mode: str='rb'):
+    if zstandard is None:
+        raise ImportError('The zstandard package is needed to read and write {0}'.format(file_name))
+    if 'w' in mode:
+        return zstandard.ZstdCompressor().stream_writer(open(file_name, mode))
+    return zstandard.ZstdDecompressor().stream_reader(open(file_name, mode))
+
+
+"""
+ * The supported compressions as (file name suffix, magic bytes, binary open function) triples.
+"""
+COMPRESSIONS = (('.gz', b'\x1f\x8b', gzip.open),
+                ('.bz2', b'BZh', bz2.open),
+                ('.xz', b'\xfd7zXZ\x00', lzma.open),
+                ('.lzma', b'\x5d\x00\x00', lzma.open),
+                ('.zst', b'\x28\xb5\x2f\xfd', _zstd_open))
+
+
+def split_compression_suffix(file_name: str) -> tuple:
+    """
+     * Splits the compression suffix (e.g. '.gz') from the file name.
+     *
+     * @param file_name the name of the (possibly compressed) file.
+     * @return the file name without the compression suffix and the suffix ('' if the name has none).
+    """
+    for suffix, _, __ in COMPRESSIONS:
+        if file_name.endswith(suffix):
+            return file_name[:-len(suffix)], suffix
+    return file_name, ''
+
+
+def find_corpus_file(file_name: str) -> str:
+    """
+     * Finds the file itself or a compressed version of it (e.g. 'corpus.conll' or 'corpus.conll.gz').
+     *
+     * @param file_name the name of the uncompressed file.
+     * @return the name of the existing file or None if there is no such file.
+    """
+    for suffix in ('',) + tuple(suffix for suffix, _, __ in COMPRESSIONS):
+        if os.path.exists(file_name + suffix):
+            return file_name + suffix
+    return None
+
+
+def open_corpus_file(file_name: str, encoding: str='UTF-8'):
+    """
+     * Opens a corpus file for reading as text, decompressing it on the fly. The compression is recognised by the file
+     * name suffix (.gz, .bz2, .xz, .lzma, .zst) or else by the magic bytes at the start of the file. The file is
+     * streamed, so even multi-GB files can be read without extracting them first.
+     *
+     * @param file_name the name of the (possibly compressed) file.
+     * @param encoding  the encoding of the text.
+     * @return a text file object, which can be used in a with statement and iterated by lines.
+    """
+    open_fun = None
+    for suffix, _, compressed_open in COMPRESSIONS:
+        if file_name.endswith(suffix):
+            open_fun = compressed_open
+            break
+    else:
+        with open(file_name, 'rb') as raw:
+            head = raw.read(6)
+        for _, magic, compressed_open in COMPRESSIONS:
+            if head.startswith(magic):
+                open_fun = compressed_open
+                break
+    if open_fun is None:
+        return open(file_name, encoding=encoding)
+    return io.TextIOWrapper(open_fun(file_name, 'rb'), encoding=encoding)
+
+
+def create_corpus_file(file_name: str, encoding: str='UTF-8'):
+    """
+     * Creates (or overwrites) a corpus file for writing as text, compressing it on the fly if the file name has a
+     * compression suffix (.gz, .bz2, .xz, .lzma, .zst).
+     *
+     * @param file_name the name of the file.
+     * @param encoding  the encoding of the text.
+     * @return a text file object, which can be used in a with statement.
+    """
+    for suffix, _, compressed_open in COMPRESSIONS:
+        if file_name.endswith(suffix):
+            return io.TextIOWrapper(compressed_open(file_name, 'wb'), encoding=encoding)
+    return open(file_name, 'w', encoding=encoding)
+
+
+class LoadCancelled(Exception):
+    """
+     * Raised from Monitor#progressed() to abort a CorpusFormat#load() that was cancelled.
+    """
+    pass
+
+
+class Monitor:
+    """
+     * A Monitor is notified by CorpusFormat#load() after each instance that was processed. Subclasses can report the
+     * progress to the user (e.g. with a progress bar). Loading can be cancelled from an other thread by calling
+     * Monitor#cancel(): the next progressed() call raises LoadCancelled.
+    """
+    def __init__(self):
+        self.cancelled = False
+
+    def progressed(self, instance_nr: int):
+        """
+         * Called after each instance that was processed.
+         *
+         * @param instance_nr the number of instances processed so far.
+         * @throws LoadCancelled if the loading was cancelled.
+        """
+        if self.cancelled:
+            raise LoadCancelled
+
+    def cancel(self):
+        """
+         * Requests the loading to be stopped at the next instance.
+        """
+        self.cancelled = True
+
+
 class CorpusFormat:
     def __init__(self):
         self.name = 'Not Set'
+        self.loads_range = True  # Does load() honour the sentence range (so the number of instances is bounded)?
 
     def __str__(self):
         return self.name
 
     """
      * Loads a corpus from a file, starting at instance <code>from</code> and ending at instance <code>to</code>
-     * (exclusive). This method is required to call {@link com.googlecode.whatswrong.ioformats.CorpusFormat.Monitor#
-     progressed(int)}
-     * after each instance that was processed.
+     * (exclusive). This method is required to call Monitor#progressed() after each instance that was processed.
      *
      * @param file the file to load the corpus from.
      * @param from the starting instance index.
      * @param to   the end instance index.
+     * @param monitor the monitor to notify about the progress (optional).
      * @return a list of NLP instances loaded from the given file in the given interval.
      * @throws IOException if I/O goes wrong.
+     * @throws LoadCancelled if the monitor was cancelled.
     """
-    def load(self, file_name: str, from_sentence_nr: int, to_sentence_nr: int) -> [NLPInstance]:
+    def load(self, file_name: str, from_sentence_nr: int, to_sentence_nr: int, monitor: Monitor=None) -> [NLPInstance]:
         raise NotImplementedError
+
+    """
+     * Loads the complete instances appended to the file after the given byte offset (follow mode, for files that are
+     * still being written, e.g. by a running parser). An incomplete instance at the end of the file is left for the
+     * next call.
+     *
+     * @param file_name the file to load the instances from.
+     * @param offset the byte offset where the previous call stopped (0 for the first call).
+     * @param monitor the monitor to notify about the progress (optional).
+     * @return the new instances and the byte offset to continue from.
+     * @throws LoadCancelled if the monitor was cancelled.
+    """
+    def load_appended(self, file_name: str, offset: int, monitor: Monitor=None) -> ([NLPInstance], int):
+        raise NotImplementedError('{0} files can not be followed'.format(self.name))
+
+    """
+     * Writes the instances into a file in this format. The instances are written one by one as they come, so they can
+     * be streamed (e.g. from a generator of diffed or filtered instances) without holding the corpus in memory. The
+     * file is compressed if its name has a compression suffix (see create_corpus_file()).
+     *
+     * @param file_name the file to write the corpus to.
+     * @param instances an iterable of the NLPInstances to write.
+     * @param monitor the monitor to notify about the progress (optional).
+     * @return the number of the written instances.
+     * @throws LoadCancelled if the monitor was cancelled (the instances written so far remain in the file).
+    """
+    def write(self, file_name: str, instances, monitor: Monitor=None) -> int:
+        monitor = Monitor() if monitor is None else monitor
+        instance_nr = 0
+        with create_corpus_file(file_name) as writer:
+            for instance in instances:
+                writer.write(self.format_instance(instance))
+                instance_nr += 1
+                monitor.progressed(instance_nr)
+        return instance_nr
+
+    """
+     * Serializes one instance in this format (see write()).
+     *
+     * @param instance the instance to serialize.
+     * @return the text of the instance including its separator (e.g. the empty line after a CoNLL sentence).
+    """
+    def format_instance(self, instance: NLPInstance) -> str:
+        raise NotImplementedError('{0} files can not be written'.format(self.name))
+
+    """
+     * Scores how likely it is that the file is in this format, looking only at the head of the file (see
+     * ioformats.format_sniffer). It must be fast and must not raise on foreign input.
+     *
+     * @param file_name the file (or directory) to load the corpus from.
+     * @param head the first lines of the file (empty for directories), the last line is complete.
+     * @return a score from 0.0 (surely not this format) to 1.0 (surely this format).
+    """
+    def sniff(self, file_name: str, head: [str]) -> float:
+        return 0.0
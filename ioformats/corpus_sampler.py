@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import sys
+from bisect import bisect_right
+
+from ioformats.corpus_format import Monitor
+from ioformats.tab_processor import TabFormat
+
+"""
+ * Single pass sampling of sentences from corpora that are too large to be loaded (see CorpusFormat#load(), which can
+ * only load a range from the beginning of the file). The samples keep the indexes of the sentences in the file, so the
+ * same sentences can be loaded from an other corpus (e.g. the guess corpus of a sampled gold corpus, see
+ * load_indexes()).
+ *
+ * For the tab formats the sampling works on the raw rows of the sentences and only the sampled ones are parsed. The
+ * other formats are parsed sentence by sentence (with iter_instances() if the format has it).
+"""
+
+
+def _iter_candidates(corpus_format, file_name: str):
+    """
+     * @return a generator of (index, raw sentence, length) triples, where the raw sentence is the rows of a tab format
+     *         sentence or the instance itself (see _materialize()).
+    """
+    if isinstance(corpus_format, TabFormat) and not corpus_format._supports_open:
+        rows = corpus_format.iter_rows(file_name, 0, sys.maxsize)
+        try:
+            for index, sentence_rows in enumerate(rows):
+                yield index, sentence_rows, len(sentence_rows)
+        finally:
+            rows.close()
+        return
+    if hasattr(corpus_format, 'iter_instances'):
+        instances = corpus_format.iter_instances(file_name, 0, sys.maxsize)
+    else:
+        instances = corpus_format.load(file_name, 0, sys.maxsize)
+    try:
+        for index, instance in enumerate(instances):
+            yield index, instance, len(instance.token_map)
+    finally:
+        if hasattr(instances, 'close'):
+            instances.close()
+
+
+def _materialize(corpus_format, raw):
+    if isinstance(raw, list):
+        return corpus_format.create(raw)
+    return raw
+
+
+def _has_label(corpus_format, raw, label: str, edge_type: str=None):
+    """
+     * @return the instance of the raw sentence if it has an edge with the given label (and type), None otherwise.
+    """
+    if isinstance(raw, list):
+        # Cheap test before parsing: the label must be in a column (the argument part of 'sense:A0' labels at least)
+        label_part = label.rpartition(':')[2]
+        if not any(label_part in column for row in raw for column in row):
+            return None
+    instance = _materialize(corpus_format, raw)
+    if any(edge.label == label and (edge_type is None or edge.edge_type == edge_type) for edge in instance.edges):
+        return instance
+    return None
+
+
+def sample_corpus(corpus_format, file_name: str, sample_size: int, length_bins: tuple=None,
+                  allocation: str='proportional', label: str=None, edge_type: str=None, seed=None,
+                  monitor: Monitor=None) -> list:
+    """
+     * Draws a uniform random sample of the sentences of a corpus in one pass (reservoir sampling), keeping only the
+     * sampled sentences in memory.
+     *
+     * @param corpus_format the CorpusFormat of the file.
+     * @param file_name     the corpus to sample.
+     * @param sample_size   the number of sentences to draw (all of them if the corpus, or the stratum, is smaller).
+     * @param length_bins   if given, the sample is stratified by the sentence length (number of tokens): the sorted
+     *                      bin boundaries, e.g. (10, 20, 40) for the strata 0-9, 10-19, 20-39 and 40- tokens.
+     * @param allocation    how the sample size is divided among the strata: 'proportional' to the size of the strata
+     *                      or 'equal'.
+     * @param label         if given, only the sentences with an edge with this label are sampled.
+     * @param edge_type     if given with label, the edge must also have this type.
+     * @param seed          the seed of the random generator (for reproducible samples).
+     * @param monitor       the monitor to notify about the progress (after every sentence read).
+     * @return the sampled (index in the file, NLPInstance) pairs in the order of the file.
+     * @throws LoadCancelled if the monitor was cancelled.
+    """
+    if allocation not in ('proportional', 'equal'):
+        raise ValueError('Unknown allocation: {0}'.format(allocation))
+    monitor = Monitor() if monitor is None else monitor
+    rng = random.Random(seed)
+    bins = () if length_bins is None else tuple(sorted(length_bins))
+    reservoirs = [[] for _ in range(len(bins) + 1)]  # [[(index, raw sentence or instance)]] for every stratum
+    seen = [0] * len(reservoirs)  # The number of sentences in the strata so far
+
+    for index, raw, length in _iter_candidates(corpus_format, file_name):
+        monitor.progressed(index + 1)
+        if label is not None:
+            raw = _has_label(corpus_format, raw, label, edge_type)
+            if raw is None:
+                continue
+        stratum = bisect_right(bins, length)
+        seen[stratum] += 1
+        reservoir = reservoirs[stratum]
+        if len(reservoir) < sample_size:
+            reservoir.append((index, raw))
+        else:
+            replaced = rng.randrange(seen[stratum])  # Algorithm R: the sentence is kept with sample_size/seen odds
+            if replaced < sample_size:
+                reservoir[replaced] = (index, raw)
+
+    sample = []
+    for reservoir, size in zip(reservoirs, _allocate(sample_size, seen, allocation)):
+        sample.extend(rng.sample(reservoir, size) if size < len(reservoir) else reservoir)
+    sample.sort(key=lambda index_raw: index_raw[0])
+    return [(index, _materialize(corpus_format, raw)) for index, raw in sample]
+
+
+def _allocate(sample_size: int, seen: list, allocation: str) -> list:
+    """
+     * Divides the sample size among the strata of the given sizes (by the largest remainder method for 'proportional').
+     * The places that a stratum can not fill go to the others, so the sample has min(sample_size, sum(seen))
+     * sentences.
+     *
+     * @return the sample sizes of the strata.
+    """
+    if len(seen) == 1:
+        return [min(sample_size, seen[0])]
+    total = sum(seen)
+    if total == 0:
+        return [0] * len(seen)
+    if allocation == 'equal':
+        sizes = [min(sample_size // len(seen), size) for size in seen]
+        # The remaining places (the remainder and the shares of the small strata) are dealt out one by one to the
+        # strata that still have sentences, the larger ones first
+        larger_first = sorted(range(len(seen)), key=lambda nr: seen[nr], reverse=True)
+        while sum(sizes) < min(sample_size, total):
+            for stratum in larger_first:
+                if sizes[stratum] < seen[stratum] and sum(sizes) < min(sample_size, total):
+                    sizes[stratum] += 1
+    else:
+        quotas = [sample_size * size / total for size in seen]
+        sizes = [min(int(quota), size) for quota, size in zip(quotas, seen)]
+        # The remaining places go to the strata with the largest remainders that still have sentences
+        for stratum in sorted(range(len(seen)), key=lambda nr: quotas[nr] - int(quotas[nr]), reverse=True):
+            if sum(sizes) >= min(sample_size, total):
+                break
+            if sizes[stratum] < seen[stratum]:
+                sizes[stratum] += 1
+    return sizes
+
+
+def load_indexes(corpus_format, file_name: str, indexes, monitor: Monitor=None) -> list:
+    """
+     * Loads the sentences with the given indexes in one pass (e.g. the guess sentences of a sampled gold corpus). The
+     * reading stops after the last index.
+     *
+     * @return the (index, NLPInstance) pairs in the order of the file (the indexes missing from the file are skipped).
+    """
+    monitor = Monitor() if monitor is None else monitor
+    wanted = set(indexes)
+    last_index = max(wanted, default=-1)
+    result = []
+    candidates = _iter_candidates(corpus_format, file_name)
+    try:
+        for index, raw, _ in candidates:
+            if index > last_index:
+                break
+            if index in wanted:
+                result.append((index, _materialize(corpus_format, raw)))
+                monitor.progressed(len(result))
+    finally:
+        candidates.close()
+    return result
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from ioformats.tab_processor import CoNLL2000, CoNLL2002, CoNLL2003, CoNLL2004, CoNLL2005, CoNLL2006, CoNLL2008, \
+    CoNLL2009, CoNLLU, MaltTab
+from ioformats.other_formats import GizaAlignmentFormat, GaleAlignmentFormat, LispSExprFormat, \
+    BioNLP2009SharedTaskFormat, TheBeastFormat
+from ioformats.jsonl_format import JSONLFormat
+
+"""
+ * The registry of the supported corpus formats by their names, shared by the GUI (see CorpusNavigator) and the headless
+ * tools (see corpus_converter).
+"""
+
+
+def known_corpus_formats() -> dict:
+    """
+     * @return a new {name: CorpusFormat} dict of the supported formats (the formats are configurable, so every client
+     *         gets its own instances).
+    """
+    return {'CoNLL2000': CoNLL2000(),
+            'CoNLL2002': CoNLL2002(),
+            'CoNLL2003': CoNLL2003(),
+            'CoNLL2004': CoNLL2004(),
+            'CoNLL2005': CoNLL2005(),
+            'CoNLL2006': CoNLL2006(),
+            'CoNLL2008': CoNLL2008(),
+            'CoNLL2009': CoNLL2009(),
+            'CoNLLU': CoNLLU(),
+            'MaltTab': MaltTab(),
+            'Giza Alingment Format': GizaAlignmentFormat(),
+            'Gale Alingment Format': GaleAlignmentFormat(),
+            'The Beast Format': TheBeastFormat(),
+            'Lisp S-expr Format': LispSExprFormat(),
+            'BioNLP2009 Shared Task Format': BioNLP2009SharedTaskFormat(),
+            'JSONL': JSONLFormat()
+            }
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+from ioformats.corpus_format import open_corpus_file
+
+"""
+ * The format sniffer guesses the format of a corpus file from its first few kilobytes, so the user does not have to
+ * pick the format and a wrong pick does not cost a full failing load. Every CorpusFormat scores the head of the file
+ * (see CorpusFormat#sniff()) and the best scoring format is chosen.
+"""
+
+SNIFF_SIZE = 8192  # The number of characters to look at
+
+
+def read_head(file_name: str, size: int=SNIFF_SIZE) -> [str]:
+    """
+     * Reads the first lines of a (possibly compressed) file.
+     *
+     * @param file_name the file to read, for directories nothing is read.
+     * @param size      the number of characters to read at most.
+     * @return the complete lines (without line endings) found in the first size characters.
+    """
+    if os.path.isdir(file_name):
+        return []
+    try:
+        with open_corpus_file(file_name) as reader:
+            text = reader.read(size)
+    except (OSError, UnicodeDecodeError, EOFError):  # Binary or broken files do not match any format
+        return []
+    lines = text.splitlines()
+    if len(text) == size and len(lines) > 1:
+        lines.pop()  # The last line is probably cut
+    return lines
+
+
+def sniff_formats(file_name: str, formats: dict) -> [(float, str)]:
+    """
+     * Scores every format for the given file.
+     *
+     * @param file_name the file (or directory) of the corpus.
+     * @param formats   the known formats by their names (e.g. CorpusNavigator#known_corpus_formats).
+     * @return the (score, format name) pairs in descending order of the scores.
+    """
+    head = read_head(file_name)
+    return sorted(((corpus_format.sniff(file_name, head), name) for name, corpus_format in formats.items()),
+                  key=lambda score_name: (-score_name[0], score_name[1]))
+
+
+def detect_format(file_name: str, formats: dict, threshold: float=0.5) -> str:
+    """
+     * Picks the format of the given file.
+     *
+     * @param file_name the file (or directory) of the corpus.
+     * @param formats   the known formats by their names (e.g. CorpusNavigator#known_corpus_formats).
+     * @param threshold the minimal score to accept a format.
+     * @return the name of the best scoring format or None if no format scores at least threshold.
+    """
+    scores = sniff_formats(file_name, formats)
+    if len(scores) == 0 or scores[0][0] < threshold:
+        return None
+    return scores[0][1]
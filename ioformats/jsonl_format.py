@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+
+from ioformats.corpus_format import CorpusFormat, Monitor, open_corpus_file, split_compression_suffix
+from libwwnlp.model.edge import Edge, EdgeRenderType
+from libwwnlp.model.nlp_instance import NLPInstance, LazyNLPInstance, RenderType
+from libwwnlp.model.token import Token
+
+"""
+ * The JSONL interchange format holds one instance per line as a JSON object, so corpora can be streamed through other
+ * tools (e.g. jq) and read back without any loss, including the diff properties of the edges (e.g. eval_status_FN):
+ *
+ *     {"render_type": "single", "split_point": -1,
+ *      "tokens": [{"index": 0, "properties": {"Word": [0, "Hi"]}}, ...],
+ *      "edges": [{"start": 1, "end": 0, "label": "SBJ", "type": "dep", "render_type": "dependency", "note": "",
+ *                 "description": null, "properties": ["eval_status_FN"]}, ...]}
+"""
+
+
+def instance_to_dict(instance: NLPInstance) -> dict:
+    """
+     * @return the JSON serializable representation of the instance.
+    """
+    return {'render_type': instance.render_type.name,
+            'split_point': instance.split_point,
+            'tokens': [{'index': token.index,
+                        'properties': {name: [level, value] for name, (level, value) in token.token_properties.items()}}
+                       for token in instance.tokens],
+            'edges': [{'start': edge.start.index, 'end': edge.end.index, 'label': edge.label, 'type': edge.edge_type,
+                       'render_type': edge.render_type.name, 'note': edge.note, 'description': edge.description,
+                       'properties': sorted(edge.properties)}
+                      for edge in instance.edges]}
+
+
+def instance_from_dict(data: dict) -> NLPInstance:
+    """
+     * @return the instance of the given representation (see instance_to_dict()).
+     * @throws KeyError if an edge refers to a missing token or a key is missing.
+    """
+    instance = NLPInstance(render_type=RenderType[data.get('render_type', 'single')],
+                           split_point=data.get('split_point', -1))
+    token_map = instance.token_map
+    for token_data in data['tokens']:
+        token = Token(token_data['index'])
+        token.token_properties = {name: (level, value) for name, (level, value) in token_data['properties'].items()}
+        token_map[token.index] = token
+    instance.edges = [Edge(token_map[edge['start']], token_map[edge['end']], edge.get('label'), edge.get('type'),
+                           edge.get('note'), EdgeRenderType[edge.get('render_type', 'dependency')],
+                           edge.get('description'), set(edge.get('properties', ())))
+                      for edge in data['edges']]
+    return instance
+
+
+def instance_from_line(line: str or bytes) -> NLPInstance:
+    """
+     * @return the instance of the given JSONL line (see instance_from_dict()).
+    """
+    return instance_from_dict(json.loads(line))
+
+
+class JSONLFormat(CorpusFormat):
+    """
+     * Loads and writes the JSONL interchange format (see instance_to_dict()).
+    """
+    def __init__(self):
+        super().__init__()
+        self.name = 'JSONL'
+
+    def load(self, file_name: str, from_sent_nr: int, to_sent_nr: int, monitor: Monitor=None):
+        monitor = Monitor() if monitor is None else monitor
+        result = []
+        instances = self.iter_instances(file_name, from_sent_nr, to_sent_nr)
+        try:
+            for instance in instances:
+                result.append(instance)
+                monitor.progressed(len(result))
+        finally:
+            instances.close()
+        return result
+
+    @staticmethod
+    def iter_instances(file_name: str, from_sent_nr: int, to_sent_nr: int):
+        """
+         * Streams the instances of the given range one by one. The lines before the range are not parsed, the lines
+         * in the range are parsed at the first use of their instances (see LazyNLPInstance).
+        """
+        with open_corpus_file(file_name) as reader:
+            instance_nr = 0
+            for line in reader:
+                if instance_nr >= to_sent_nr:
+                    break
+                if len(line.strip()) == 0:
+                    continue
+                if instance_nr >= from_sent_nr:
+                    yield LazyNLPInstance(line, instance_from_line)
+                instance_nr += 1
+
+    def load_appended(self, file_name: str, offset: int, monitor: Monitor=None):
+        """
+         * An instance is complete when its line ends.
+        """
+        if split_compression_suffix(file_name)[1] != '':
+            raise ValueError('Compressed files can not be followed: {0}'.format(file_name))
+        monitor = Monitor() if monitor is None else monitor
+        corpus = []
+        with open(file_name, 'rb') as reader:
+            reader.seek(offset)
+            for line in reader:
+                if not line.endswith(b'\n'):
+                    break  # The line is still being written
+                offset += len(line)
+                if len(line.strip()) > 0:
+                    corpus.append(LazyNLPInstance(line.decode('UTF-8'), instance_from_line))
+                    monitor.progressed(len(corpus))
+        return corpus, offset
+
+    def format_instance(self, instance: NLPInstance) -> str:
+        return json.dumps(instance_to_dict(instance), ensure_ascii=False) + '\n'
+
+    def sniff(self, file_name: str, head: [str]) -> float:
+        """
+         * Every non empty line is a JSON object with tokens and edges.
+        """
+        lines = [line for line in head if len(line.strip()) > 0]
+        if len(lines) == 0 or not lines[0].lstrip().startswith('{'):
+            return 0.0
+        try:
+            data = json.loads(lines[0])
+        except ValueError:  # A long first line is cut in the head
+            return 0.5 if '"tokens": [' in lines[0] else 0.0
+        return 1.0 if isinstance(data, dict) and 'tokens' in data and 'edges' in data else 0.0
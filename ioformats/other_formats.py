@@ -1,13 +1,31 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import functools
+import bisect
 import glob
+import multiprocessing
 import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
-from ioformats.corpus_format import CorpusFormat
-from libwwnlp.model.edge import EdgeRenderType
+try:  # Optional dependency: the alignment matrices are parsed in bulk if it is installed
+    import numpy
+except ImportError:
+    numpy = None
+
+from ioformats.corpus_format import CorpusFormat, Monitor, open_corpus_file, find_corpus_file, COMPRESSIONS, \
+    split_compression_suffix
+from libwwnlp.model.document_splitter import split_document
+from libwwnlp.model.edge import Edge, EdgeRenderType
 from libwwnlp.model.nlp_instance import NLPInstance, RenderType
+from libwwnlp.model.token import Token
+
+
+_BIONLP_TOKEN = re.compile('[^ \n]+')  # Only spaces and newlines separate tokens (as in the shared task tools)
+_GIZA_ALIGNED_TOKEN = re.compile(r'(\S+) \(\{([^}]*)\}\)')  # A target token and its aligned source indices
+_SEXPR_TOKEN = re.compile(r'[()]|[^\s()]+')  # Brackets, labels and words of S-expressions
+_BEAST_FIELD = re.compile(r'"[^"]*"|\S+')  # The fields of thebeast rows, quoted strings may contain spaces
+_BEAST_SEPARATOR = re.compile(rb'^>>', re.MULTILINE)  # The start of a thebeast instance
 
 
 def check_eof(line):
@@ -16,7 +34,37 @@ def check_eof(line):
     return line
 
 
+def _matrix_links(lines: [str], width: int) -> [(int, int)]:
+    """
+     * Finds the cells of a 0/1 matrix that are 1.
+     *
+     * @param lines the rows of the matrix, the cells are separated by white-space.
+     * @param width the number of the columns.
+     * @return the (row, column) indices of the 1 cells in row-major order.
+    """
+    if numpy is not None:
+        chars = numpy.frombuffer(''.join(lines).encode('ascii', 'replace'), dtype=numpy.uint8)
+        digits = (chars == ord('0')) | (chars == ord('1'))
+        spaces = (chars == ord(' ')) | (chars == ord('\t')) | (chars == ord('\n')) | (chars == ord('\r'))
+        # The bulk parsing needs one digit cells, anything else is parsed by splitting
+        if (digits | spaces).all() and not (digits[1:] & digits[:-1]).any() and \
+                digits.sum() == len(lines) * width:
+            rows, columns = numpy.nonzero(chars[digits].reshape(len(lines), width) == ord('1'))
+            return list(zip(rows.tolist(), columns.tolist()))
+    return [(row, column) for row, line in enumerate(lines) for column, cell in enumerate(line.split())
+            if cell == '1']
+
+
 class GizaAlignmentFormat(CorpusFormat):
+    """
+     * Loads GIZA++ alignment files (A3 files): three lines per sentence pair, a '# Sentence pair' comment, the source
+     * sentence and the target tokens each followed by the 1-based indices of the source tokens aligned to it, e.g.:
+     *
+     * NULL ({ 2 }) customization ({ 1 }) of ({ }) tasks ({ 3 4 })
+     *
+     * If symmetrization is set, the alignments of the opposite direction are read from reverse_file_name in lockstep
+     * and each pair is loaded as the symmetrized alignment (see symmetrize_alignment()).
+    """
     def __init__(self):
         super().__init__()
         self.name = 'Giza Alignment'
@@ -28,104 +76,147 @@ class GizaAlignmentFormat(CorpusFormat):
          or the other (but not both) should be read in in reverse.
         """
         self._reverseCheckBox = False  # JCheckBox
+        self.symmetrization = None  # None, 'intersection', 'union' or 'grow-diag-final'
+        self.reverse_file_name = None  # The tgt-to-src alignments of the same corpus for symmetrization
 
-    def load(self, file_name: str, from_sentence_nr: int, to_sentence_nr: int):
-        with open(file_name, encoding='UTF-8') as reader:
-            """
-             * Skip past the next aligned segment pair in the given reader.
-             *
-             * @throws EndOfInputException if there was no aligned segment pair to skip because we're
-             *         already at the end of the given reader
-            """
-            # There are three lines per segment pair.
-            for _ in range(3 * from_sentence_nr):
-                try:
-                    check_eof(reader.readline())
-                except EOFError:
-                    break
+    def sniff(self, file_name: str, head: [str]) -> float:
+        """
+         * Giza files consist of three line blocks starting with a '# Sentence pair' comment.
+        """
+        lines = [line for line in head if len(line.strip()) > 0]
+        if len(lines) > 0 and lines[0].startswith('# Sentence pair'):
+            return 1.0
+        return 0.5 if any('({' in line and '})' in line for line in lines) else 0.0
 
-            result = []  # ArrayList<NLPInstance>
-            for i in range(from_sentence_nr, to_sentence_nr):
-                try:
-                    """
-                     * @return the next aligned segment pair, loaded from the given reader
-                     *
-                     * @throws EndOfInputException if no aligned segment pair could be loaded because we're already
-                     *         at the end of the given reader
-                    """
-                    """
-                     There are three lines per segment pair.
-
-                     The first line gives the segment index, source and target lengths (which we can count
-                     ourselves), and an alignment score. Skip this line (or throw an exception if there are no
-                     more lines).
-                    """
-                    check_eof(reader.readline())
-
-                    tokens = []
-                    """
-                     * a list of one-based {source-token-index, target-token-index} pairs
-                    """
-                    alignment_edges = []  # [(int, int)]
-
-                    # String line;
-
-                    # The second line contains the source segment, tokenized, with no adornment.
-                    tokens.append(check_eof(reader.readline()).strip().split())
-                    tokens.append([])
-
-                    """
-                     The third line contains the tokens of the target segment, starting with the pseudo-token
-                     "NULL", with each token followed by a whitespace-delimited list (in curly braces nested
-                     in parentheses) of the 1-based indices of the source tokens aligned to it, e.g.:
-
-                     NULL ({ 2 }) customization ({ 1 }) of ({ }) tasks ({ 3 4 })
-                    """
-                    # Strip newline and space and reappend space for later regex
-                    line = check_eof(reader.readline()).rstrip() + ' '
-
-                    # start from index 1 to skip the NULL token and empty string at the EOL
-                    for ind, token_with_aligned_indices in enumerate(line.split(' }) ')[1:-1], start=1):
-                        splitted1, splitted2 = token_with_aligned_indices.split(' ({')
-                        tokens[1].append(splitted1)
-                        aligned_index_list_as_string = splitted2.strip()
-
-                        """
-                         we need to handle the empty list specially, because the split method on the empty
-                         string returns a singleton array containing the empty string, but here an empty
-                         array is what we want
-                        """
-                        aligned_indices_as_strings = []
-                        if len(aligned_index_list_as_string) > 0:
-                            aligned_indices_as_strings = aligned_index_list_as_string.split(' ')
-
-                        for aligned_index_as_string in aligned_indices_as_strings:
-                            alignment_edges.append((int(aligned_index_as_string), ind))
-
-                    # now we're ready to make the NLPInstance
-                    instance = NLPInstance(render_type=RenderType.alignment)
-                    if self._reverseCheckBox:
-                        self.make_instance(instance, tokens[1], tokens[0], ((e2, e1) for e1, e2 in alignment_edges))
-                    else:
-                        self.make_instance(instance, tokens[0], tokens[1], alignment_edges)
+    def load(self, file_name: str, from_sentence_nr: int, to_sentence_nr: int, monitor: Monitor=None):
+        monitor = Monitor() if monitor is None else monitor
+        result = []
+        instances = self.iter_instances(file_name, from_sentence_nr, to_sentence_nr)
+        try:
+            for instance in instances:
+                result.append(instance)
+                monitor.progressed(len(result))
+        finally:
+            instances.close()
+        return result
 
-                    result.append(instance)
-                except EOFError:
-                    break
+    def iter_instances(self, file_name: str, from_sentence_nr: int, to_sentence_nr: int):
+        """
+         * Streams the instances of the given range of sentence pairs one by one.
+        """
+        pairs = self._iter_pairs(file_name, from_sentence_nr, to_sentence_nr)
+        if self.symmetrization is None:
+            for source, target, links in pairs:
+                instance = NLPInstance(render_type=RenderType.alignment)
+                if self._reverseCheckBox:
+                    self.make_instance(instance, target, source, ((tgt, src) for src, tgt in links))
+                else:
+                    self.make_instance(instance, source, target, links)
+                yield instance
+            return
+
+        reverse_pairs = self._iter_pairs(self.reverse_file_name, from_sentence_nr, to_sentence_nr)
+        try:
+            for (source, target, links), (reverse_source, reverse_target, reverse_links) in zip(pairs, reverse_pairs):
+                if len(source) != len(reverse_target) or len(target) != len(reverse_source):
+                    raise ValueError('The sentence pairs of {0} and {1} do not match: {2} and {3}'.
+                                     format(file_name, self.reverse_file_name, source, reverse_target))
+                instance = NLPInstance(render_type=RenderType.alignment)
+                self.make_instance(instance, source, target,
+                                   sorted(symmetrize_alignment(set(links), {(src, tgt) for tgt, src in reverse_links},
+                                                               self.symmetrization)))
+                yield instance
+        finally:
+            pairs.close()
+            reverse_pairs.close()
 
-        return result
+    @staticmethod
+    def _iter_pairs(file_name: str, from_sentence_nr: int, to_sentence_nr: int):
+        """
+         * Reads the sentence pairs of the given range.
+         *
+         * @return a generator of (source tokens, target tokens, 1-based (source index, target index) links) triples.
+        """
+        with open_corpus_file(file_name) as reader:
+            # There are three lines per segment pair.
+            for _ in range(3 * from_sentence_nr):
+                if len(reader.readline()) == 0:
+                    return
+            for _ in range(from_sentence_nr, to_sentence_nr):
+                """
+                 The first line gives the segment index, source and target lengths (which we can count ourselves), and
+                 an alignment score. The second line contains the source segment, tokenized, with no adornment. The
+                 third line contains the target tokens starting with the pseudo-token "NULL" (see the class comment).
+                """
+                header, source_line, target_line = reader.readline(), reader.readline(), reader.readline()
+                if len(target_line) == 0:  # The end of the file (or an incomplete pair)
+                    return
+                source = source_line.split()
+                aligned_tokens = _GIZA_ALIGNED_TOKEN.findall(target_line)[1:]  # Skip the NULL token
+                target = [token for token, _ in aligned_tokens]
+                links = [(int(src), tgt) for tgt, (_, sources) in enumerate(aligned_tokens, start=1)
+                         for src in sources.split()]
+                yield source, target, links
 
     @staticmethod
     def make_instance(instance, tokens1, tokens2, alignment_edges):
-        for token in tokens1:
-            instance.add_token().add_property('word', token)
-        instance.split_point = len(instance.tokens)
-        for token in tokens2:
-            instance.add_token().add_property('word', token)
-        for alignmentEdge1, alignmentEdge2 in alignment_edges:
-            from_edge = alignmentEdge1 - 1
-            to_edge = len(tokens1) + alignmentEdge2 - 1
-            instance.add_edge(from_edge, to_edge, 'align', 'align')
+        tokens = instance.token_map
+        for index, word in enumerate(tokens1 + tokens2, start=len(tokens)):
+            token = Token(index)
+            token.token_properties['word'] = (0, word)
+            tokens[index] = token
+        instance.split_point = len(tokens) - len(tokens2)
+        instance.add_edges([Edge(tokens[alignment_edge1 - 1], tokens[len(tokens1) + alignment_edge2 - 1], 'align',
+                                 'align', None, None, None, None)
+                            for alignment_edge1, alignment_edge2 in alignment_edges])
+
+
+_NEIGHBOURS = ((-1, 0), (0, -1), (1, 0), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+def symmetrize_alignment(forward: set, backward: set, method: str) -> set:
+    """
+     * Combines the alignments of the two directions of the same sentence pair.
+     *
+     * 'grow-diag-final' (Koehn et al., 2003) starts from the intersection, grows it with the neighbouring (also
+     * diagonal) links of the union that align a yet unaligned source or target token, then adds the remaining links of
+     * the two directions (in this order) that align a yet unaligned token.
+     *
+     * @param forward  the (source index, target index) links of the source-to-target alignment.
+     * @param backward the (source index, target index) links of the target-to-source alignment.
+     * @param method   'intersection', 'union' or 'grow-diag-final'.
+     * @return the (source index, target index) links of the symmetrized alignment.
+    """
+    if method == 'intersection':
+        return forward & backward
+    if method == 'union':
+        return forward | backward
+    if method != 'grow-diag-final':
+        raise ValueError('Unknown symmetrization: {0}'.format(method))
+
+    union = forward | backward
+    alignment = forward & backward
+    aligned_sources = {src for src, _ in alignment}
+    aligned_targets = {tgt for _, tgt in alignment}
+    grown = True
+    while grown:
+        grown = False
+        for src, tgt in sorted(alignment):
+            for d_src, d_tgt in _NEIGHBOURS:
+                link = (src + d_src, tgt + d_tgt)
+                if link in union and link not in alignment and \
+                        (link[0] not in aligned_sources or link[1] not in aligned_targets):
+                    alignment.add(link)
+                    aligned_sources.add(link[0])
+                    aligned_targets.add(link[1])
+                    grown = True
+    for links in (forward, backward):
+        for src, tgt in sorted(links - alignment):
+            if src not in aligned_sources or tgt not in aligned_targets:
+                alignment.add((src, tgt))
+                aligned_sources.add(src)
+                aligned_targets.add(tgt)
+    return alignment
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -172,22 +263,30 @@ class GaleAlignmentFormat(CorpusFormat):
     def __init__(self):
         super().__init__()
         self.name = 'Gale Alignment'
+        self.loads_range = False  # The whole file is loaded
 
-    def load(self, file_name: str, _, __):
+    def sniff(self, file_name: str, head: [str]) -> float:
+        """
+         * Gale files consist of <seg> elements with <source>, <translation> and <matrix> children.
+        """
+        tags = {tag for tag in ('<seg', '<source>', '<translation>', '<matrix>') if any(tag in line for line in head)}
+        return len(tags) / 4
+
+    def load(self, file_name: str, _, __, monitor: Monitor=None):
         """
          * Loads a corpus from a file, starting at instance <code>from</code> and ending at instance <code>to</code>
-         * (exclusive). This method is required to call
-         * {@link com.googlecode.whatswrong.io.CorpusFormat.Monitor#progressed(int)}
-         * after each instance that was processed.
+         * (exclusive). This method is required to call Monitor#progressed() after each instance that was processed.
          *
          * @param file the file to load the corpus from.
          * @param from the starting instance index.
          * @param to   the end instance index.
+         * @param monitor the monitor to notify about the progress (optional).
          * @return a list of NLP instances loaded from the given file in the given interval.
          * @throws java.io.IOException if I/O goes wrong.
         """
+        monitor = Monitor() if monitor is None else monitor
         result = []
-        with open(file_name, encoding='UTF-8') as reader:
+        with open_corpus_file(file_name) as reader:
             instance = None
             source_length = -1
             target_length = -1
@@ -198,7 +297,7 @@ class GaleAlignmentFormat(CorpusFormat):
                     for token in content.split():
                         instance.add_token().add_property('word', token)
 
-                    source_length = len(instance.tokens)
+                    source_length = len(instance.token_map)
                     instance.split_point = source_length
                 elif line.startswith('<seg'):
                     instance = NLPInstance(render_type=RenderType.alignment)
@@ -207,122 +306,24 @@ class GaleAlignmentFormat(CorpusFormat):
                     for token in content.split():
                         instance.add_token().add_property('word', token)
 
-                    target_length = len(instance.tokens) - source_length
+                    target_length = len(instance.token_map) - source_length
                 elif line.startswith('<matrix>'):
-                    check_eof(reader.readline())
-                    for tgt in range(target_length):
-                        line = check_eof(reader.readline()).strip()
-                        col = line.split()
-                        for src in range(1, len(col)):
-                            if col[src] == '1':
-                                instance.add_edge(src - 1, tgt + source_length, 'align', 'align')
+                    check_eof(reader.readline())  # The null alignments of the target tokens
+                    rows = [check_eof(reader.readline()) for _ in range(target_length)]
+                    tokens = instance.token_map
+                    # The first column holds the null alignments of the source tokens
+                    instance.add_edges([Edge(tokens[src - 1], tokens[source_length + tgt], 'align', 'align', None,
+                                             None, None, None)
+                                        for tgt, src in _matrix_links(rows, source_length + 1) if src > 0])
 
                     result.append(instance)
+                    monitor.progressed(len(result))
 
         return result
 
 # ----------------------------------------------------------------------------------------------------------------------
 
 
-class Tree:
-    def __init__(self, label: str):
-        self.children = []
-        self.label = label
-
-    def __str__(self):
-        return '{0}{1}'.format(self.label, self.children)
-
-    def write_spans(self, label_type: str, tag_type: str, instance: NLPInstance):
-        if self.is_tag():
-            span_type = tag_type
-        else:
-            span_type = label_type
-        instance.add_span(self.get_from(), self.get_to(), self.label, span_type)
-        for tree in self.children:
-            tree.write_spans(label_type, tag_type, instance)
-
-    def write_tokens(self, word_type: str, tag_type: str, instance: NLPInstance):
-        for tree in self.children:
-            tree.write_tokens(word_type, tag_type, instance)
-
-    # process from '(S ...' to closing '...)'
-    @staticmethod
-    def consume(tree, sexpr: str):
-        stack = [tree]
-        token = 0
-        i = 0
-        while i < len(sexpr):
-            if sexpr[i] == '(':
-                whitespace = sexpr.find(' ', i + 1)
-                open_bracket = sexpr.find('(', i + 1)
-                # label_end = whitespace
-                # print('whitespace = ' + whitespace)
-                # print('open_bracket = ' + open_bracket)
-                if open_bracket != -1 and open_bracket < whitespace:
-                    label_end = open_bracket
-                else:
-                    label_end = whitespace
-                label = sexpr[i + 1: label_end]
-                parent = Tree(label)
-                stack[-1].children.append(parent)
-                stack.append(parent)
-                i = label_end
-                if label_end == whitespace:
-                    i += 1
-            elif sexpr[i] == ')':
-                stack.pop()
-                i += 1
-            elif sexpr[i] == ' ':
-                i += 1
-            else:
-                word_end = sexpr.find(')', i)
-                word = sexpr[i: word_end]
-                stack.pop().children.append(Terminal(word, token))
-                token += 1
-                i = word_end + 1
-
-    def get_from(self):
-        return self.children[0].get_from()
-
-    def get_to(self):
-        return self.children[len(self.children) - 1].get_to()
-
-    @staticmethod
-    def is_terminal():
-        return False
-
-    def is_tag(self):
-        return self.children[0].is_terminal()
-
-
-class Terminal(Tree):
-    def __init__(self, label: str, index: int):
-        super().__init__(label)
-        self.index = index
-
-    def is_tag(self):
-        return False
-
-    def __str__(self):
-        return self.label
-
-    @staticmethod
-    def is_terminal():
-        return True
-
-    def get_from(self):
-        return self.index
-
-    def get_to(self):
-        return self.index
-
-    def write_tokens(self, word_type: str, tag_type: str, instance: NLPInstance):
-        instance.add_token().add_property(word_type, self.label).add_property('Index', str(self.index))
-
-    def write_spans(self, label_type: str, tag_type: str, instance: NLPInstance):
-        pass
-
-
 class LispSExprFormat(CorpusFormat):
     def __init__(self):
         super().__init__()
@@ -331,30 +332,94 @@ class LispSExprFormat(CorpusFormat):
         self.tag = 'pos'     # Tag .sexpr.tag
         self.phrase = 'phrase'  # Phrase .sexpr.phrase
 
-    def load(self, file_name: str, from_sent_nr: int, to_sent_nr: int):
+    def sniff(self, file_name: str, head: [str]) -> float:
+        """
+         * Every non empty line is a bracketed tree or a bracketed part of a tree (in multi-line trees).
+        """
+        lines = [line.strip() for line in head if len(line.strip()) > 0]
+        if len(lines) == 0:
+            return 0.0
+        return sum(1 for line in lines if line.startswith('(')) / len(lines)
 
+    def load(self, file_name: str, from_sent_nr: int, to_sent_nr: int, monitor: Monitor=None):
+        """
+         * Loads bracketed trees (e.g. Penn Treebank style), a tree may span several lines. Every bracket is a span
+         * over its words: a 'pos' span if it holds a word (a tag), a 'phrase' span otherwise. The outermost brackets
+         * without a label (as in '( (S ...) )') are skipped.
+        """
+        monitor = Monitor() if monitor is None else monitor
         result = []
-        instance_nr = 0
-        with open(file_name, encoding='UTF-8') as reader:
-
-            for line in reader:
-                line = line.strip()
-                if line != '':
-                    if instance_nr >= from_sent_nr:
-                        tree = Tree('[root]')
-                        tree.consume(tree, line)
-                        tree = tree.children[0]
-                        instance = NLPInstance()
-                        tree.write_tokens(self.word, self.tag, instance)
-                        tree.write_spans(self.phrase, self.tag, instance)
-                        result.append(instance)
-
-                    instance_nr += 1
-                    if instance_nr >= to_sent_nr:
-                        break
+        with open_corpus_file(file_name) as reader:
+            for instance_nr, tree in enumerate(self._iter_trees(reader)):
+                if instance_nr >= to_sent_nr:
+                    break
+                if instance_nr >= from_sent_nr:
+                    result.append(self._create(tree))
+                    monitor.progressed(len(result))
 
         return result
 
+    @staticmethod
+    def _iter_trees(reader):
+        """
+         * Splits the lines into the tokens of the complete trees (a tree ends where its first bracket is closed).
+        """
+        tree = []
+        depth = 0
+        for line in reader:
+            for token in _SEXPR_TOKEN.findall(line):
+                if token == '(':
+                    depth += 1
+                elif depth == 0:  # Garbage between the trees
+                    continue
+                tree.append(token)
+                if token == ')':
+                    depth -= 1
+                    if depth == 0:
+                        yield tree
+                        tree = []
+
+    def _create(self, tree: [str]) -> NLPInstance:
+        """
+         * Builds the instance from the tokens of a tree in one pass with an explicit stack (so deep trees do not hit
+         * the recursion limit). The spans are added in the order of their opening brackets.
+        """
+        instance = NLPInstance()
+        words = []
+        spans = []  # [[from, to, label, span type, has children]] in the order of the opening brackets
+        stack = []  # The positions of the open brackets in spans
+        expect_label = False
+        token_index = 0
+        for token in tree:
+            if token == '(':
+                if len(stack) > 0:
+                    spans[stack[-1]][4] = True
+                stack.append(len(spans))
+                spans.append([token_index, None, '', self.phrase, False])
+                expect_label = True
+            elif token == ')':
+                spans[stack.pop()][1] = token_index - 1
+                expect_label = False
+            elif expect_label:
+                spans[stack[-1]][2] = token
+                expect_label = False
+            else:  # A word: its bracket is a tag if the word is its first child
+                span = spans[stack[-1]]
+                if not span[4]:
+                    span[3] = self.tag
+                    span[4] = True
+                word = Token(token_index)
+                word.token_properties = {self.word: (0, token), 'Index': (1, str(token_index))}
+                words.append(word)
+                token_index += 1
+
+        # The tokens and spans are built directly, they are valid by construction (see NLPInstance#add_span())
+        instance.token_map = dict(enumerate(words))
+        instance.edges = [Edge(words[start], words[end], label, span_type, '', EdgeRenderType.span, None, None)
+                          for start, end, label, span_type, _ in spans
+                          if label != '' and end >= start]  # Unlabelled outermost and empty brackets are not shown
+        return instance
+
 # ----------------------------------------------------------------------------------------------------------------------
 
 
@@ -365,6 +430,10 @@ class BioNLP2009SharedTaskFormat(CorpusFormat):
      * More details on the file format can be found at the
      * <a href="http://www-tsujii.is.s.u-tokyo.ac.jp/GENIA/SharedTask/">shared task website</a>.
      * See examples: http://www.nactem.ac.uk/tsujii/GENIA/SharedTask/detail.shtml#examples
+     *
+     * The documents are split into sentences (see split_document()) unless split_sentences is False. A sentence
+     * starts after a newline or after a token ending in '.', '!' or '?' if the next token starts with a capital
+     * letter or a digit. Events crossing sentences are kept in both sentences as stubs.
     """
     def __init__(self):
         super().__init__()
@@ -372,107 +441,204 @@ class BioNLP2009SharedTaskFormat(CorpusFormat):
         self.txtExtensionField = 'txt'     # Text files .bionlp09.txt
         self.proteinExtensionField = 'a1'  # Protein files .bionlp09.protein
         self.eventExtensionField = 'a2'    # Event files .bionlp09.event
+        self.split_sentences = True        # One instance per sentence instead of one per document
+        self.workers = None                # The number of the parsing processes (None: the number of CPUs)
 
-    def load(self, file_name: str, _, __):
+    def sniff(self, file_name: str, head: [str]) -> float:
+        """
+         * A directory containing text files with their protein (.a1) and event (.a2) annotation files.
+        """
+        if not os.path.isdir(file_name):
+            return 0.0
+        txt_suffix = '.' + self.txtExtensionField.strip()
+        for txt_file_name in glob.iglob(os.path.join(file_name, '*' + txt_suffix + '*')):
+            prefix = txt_file_name[:txt_file_name.rindex(txt_suffix)]
+            if find_corpus_file('{0}.{1}'.format(prefix, self.proteinExtensionField.strip())) is not None:
+                return 1.0
+        return 0.0
+
+    def load(self, file_name: str, from_sentence_nr: int, to_sentence_nr: int, monitor: Monitor=None):
         """
          * Loads files from the given directory with the extensions specified by the text fields of the accessory.
          *
+         * The documents are taken in the order of their file names and parsed in parallel by a pool of `workers`
+         * processes. Only the documents needed for the requested interval are parsed (with split sentences the
+         * documents before the interval are parsed too, as their number of sentences is needed).
+         *
          * @param file the directory load the corpus from.
          * @param from the starting instance index.
          * @param to   the end instance index.
+         * @param monitor the monitor to notify about the progress (optional).
          * @return a list of NLP instances loaded from the given file in the given interval.
          * @throws java.io.IOException if I/O goes wrong.
         """
-        result = []
-        for txt_file_name in glob.glob(os.path.join(file_name, '*.' + self.txtExtensionField.strip())):
+        monitor = Monitor() if monitor is None else monitor
+        documents = []
+        txt_suffix = '.' + self.txtExtensionField.strip()
+        txt_file_names = set()
+        for suffix in ('',) + tuple(suffix for suffix, _, __ in COMPRESSIONS):  # The files can also be compressed
+            txt_file_names.update(glob.glob(os.path.join(file_name, '*' + txt_suffix + suffix)))
+        for txt_file_name in sorted(txt_file_names):
             filename = os.path.abspath(txt_file_name)
-            prefix = filename.rsplit('.', maxsplit=1)[0]
-            protein_file_name = '{0}.{1}'.format(prefix, self.proteinExtensionField.strip())
-            event_file_name = '{0}.{1}'.format(prefix, self.eventExtensionField.strip())
-            if os.path.exists(protein_file_name) and os.path.exists(event_file_name):
-                """
-                 * Loads all NLPInstances in the specified files. Creates one instance.
-                 *
-                 * @param txt_file_name     the text file
-                 * @param protein_file_name the file with protein annotations
-                 * @param event_file_name   the file with event annotations
-                 * @return NLPInstance that represents the given text and annotations
-                 * @throws IOException if IO goes wrong.
-                """
-                char_to_token = {}
-                instance = NLPInstance()
-                with open(txt_file_name, encoding='UTF-8') as reader:
-                    current_token = instance.add_token()
-                    current_token_content = ''
-                    for current_index, character in enumerate(iter(functools.partial(reader.read, 1), '')):
-                        char_to_token[current_index] = current_token
-                        if character == ' ' or character == '\n':
-                            if len(current_token_content) > 0:
-                                current_token.add_property('Word', current_token_content)
-                                current_token.add_property('Index', str(len(instance.tokens) - 1))
-                                current_token_content = ''
-                                current_token = instance.add_token()
-
-                        else:
-                            current_token_content += character
-
-                id2token = {}
-                with open(protein_file_name, encoding='UTF-8') as reader:
-                    for line in reader.readlines():
-                        split = line.strip().split()
-                        if split[0].startswith('T'):
-                            elem_id = split[0]
-                            elem_type = split[1]
-                            elem_from = int(split[2])
-                            elem_to = int(split[3])
-                            from_token = char_to_token[elem_from]
-                            to_token = char_to_token[elem_to]
-                            instance.add_edge(from_token.index, to_token.index, elem_type, 'protein',
-                                              EdgeRenderType.span)
-                            id2token[elem_id] = to_token
-
-                with open(event_file_name, encoding='UTF-8') as reader:
-                    # get event mentions and locations etc.
-                    for line in reader.readlines():
-                        split = line.strip().split()
-                        elem_id = split[0]
-                        if elem_id.startswith('T'):
-                            elem_type = split[1]
-                            elem_from = int(split[2])
-                            elem_to = int(split[3])
-                            from_token = char_to_token[elem_from]
-                            to_token = char_to_token[elem_to]
-                            if elem_type == 'Entity':
-                                term_class = 'entity'
-                            else:
-                                term_class = 'event'
-                            instance.add_edge(from_token.index, to_token.index, elem_type, term_class,
-                                              EdgeRenderType.span)
-                            id2token[elem_id] = to_token
-                        elif elem_id.startswith('E'):
-                            type_and_mention_id = split[1].split(':')
-                            even_token = id2token[type_and_mention_id[1]]
-                            id2token[elem_id] = even_token
-
-                with open(event_file_name, encoding='UTF-8') as reader:
-                    # now create the event roles
-                    for line in reader.readlines():
-                        split = line.split()
-                        elem_id = split[0]
-                        if elem_id.startswith('E'):
-                            even_token = id2token[elem_id]
-                            for elem in split[2:]:
-                                role_and_id = elem.split(':')
-                                arg_token = id2token.get(role_and_id[1])
-                                if arg_token is None:
-                                    raise RuntimeError(
-                                        'There seems to be no mention associated with id {0} for event {1} in'
-                                        ' file {2}'.format(role_and_id[1], elem_id, event_file_name))
-                                instance.add_edge(even_token.index, arg_token.index, role_and_id[0], 'role',
-                                                  EdgeRenderType.dependency, note=elem_id)
-                result.append(instance)
+            prefix = filename[:filename.rindex(txt_suffix)]
+            protein_file_name = find_corpus_file('{0}.{1}'.format(prefix, self.proteinExtensionField.strip()))
+            event_file_name = find_corpus_file('{0}.{1}'.format(prefix, self.eventExtensionField.strip()))
+            if protein_file_name is not None and event_file_name is not None:
+                documents.append((filename, protein_file_name, event_file_name))
+
+        instance_nr = 0  # The number of the instances in the parsed documents
+        if not self.split_sentences:  # One instance per document: the documents before the interval can be skipped
+            documents = documents[from_sentence_nr:to_sentence_nr]
+            instance_nr = from_sentence_nr
+        result = []
+        parsed_documents = self._parse_documents(documents)
+        try:
+            for instances in parsed_documents:
+                for instance in instances:
+                    if from_sentence_nr <= instance_nr < to_sentence_nr:
+                        result.append(instance)
+                        monitor.progressed(len(result))
+                    instance_nr += 1
+                if instance_nr >= to_sentence_nr:
+                    break
+        finally:
+            parsed_documents.close()  # Cancels the documents not parsed yet and stops the pool
         return result
 
+    def _parse_documents(self, documents: list):
+        """
+         * Parses the documents in batches on a process pool and yields their instances in the order of the documents.
+         * The caller can stop at any document, then the rest of the documents are not parsed.
+         *
+         * @param documents the (text, protein, event) file name triples.
+         * @return a generator of the instance lists of the documents.
+        """
+        if self.workers == 1 or len(documents) <= 1:
+            for document in documents:
+                yield self._load_document(*document)
+            return
+
+        workers = self.workers if self.workers is not None else os.cpu_count() or 1
+        # Spawned, not forked: the loading may run on a worker thread of the (multithreaded) GUI, and a forked child
+        # could inherit locks held by the other threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            batch_size = 4 * workers
+            for batch_start in range(0, len(documents), batch_size):
+                futures = [executor.submit(self._load_document, *document)
+                           for document in documents[batch_start:batch_start + batch_size]]
+                try:
+                    for future in futures:
+                        yield future.result()
+                finally:  # The caller stopped early (e.g. the interval is complete or the loading was cancelled)
+                    for future in futures:
+                        future.cancel()
+
+    def _load_document(self, txt_file_name: str, protein_file_name: str, event_file_name: str) -> [NLPInstance]:
+        """
+         * Loads all NLPInstances in the specified files. Creates one instance per document or one per sentence.
+         *
+         * @param txt_file_name     the text file
+         * @param protein_file_name the file with protein annotations
+         * @param event_file_name   the file with event annotations
+         * @return the NLPInstances that represent the given text and annotations
+         * @throws IOException if IO goes wrong.
+        """
+        instance = NLPInstance()
+        with open_corpus_file(txt_file_name) as reader:
+            token_starts, sentence_starts = self._tokenize(instance, reader.read())
+
+        def char_to_token(char_offset):
+            # The token of the last start at or before the offset (spaces belong to the preceding token)
+            return instance.get_token(max(bisect.bisect_right(token_starts, char_offset) - 1, 0))
+
+        id2token = {}
+        with open_corpus_file(protein_file_name) as reader:
+            for line in reader.readlines():
+                split = line.strip().split()
+                if split[0].startswith('T'):
+                    elem_id = split[0]
+                    elem_type = split[1]
+                    elem_from = int(split[2])
+                    elem_to = int(split[3])
+                    from_token = char_to_token(elem_from)
+                    to_token = char_to_token(elem_to)
+                    instance.add_edge(from_token.index, to_token.index, elem_type, 'protein',
+                                      EdgeRenderType.span)
+                    id2token[elem_id] = to_token
+
+        with open_corpus_file(event_file_name) as reader:
+            # get event mentions and locations etc.
+            for line in reader.readlines():
+                split = line.strip().split()
+                elem_id = split[0]
+                if elem_id.startswith('T'):
+                    elem_type = split[1]
+                    elem_from = int(split[2])
+                    elem_to = int(split[3])
+                    from_token = char_to_token(elem_from)
+                    to_token = char_to_token(elem_to)
+                    if elem_type == 'Entity':
+                        term_class = 'entity'
+                    else:
+                        term_class = 'event'
+                    instance.add_edge(from_token.index, to_token.index, elem_type, term_class,
+                                      EdgeRenderType.span)
+                    id2token[elem_id] = to_token
+                elif elem_id.startswith('E'):
+                    type_and_mention_id = split[1].split(':')
+                    even_token = id2token[type_and_mention_id[1]]
+                    id2token[elem_id] = even_token
+
+        with open_corpus_file(event_file_name) as reader:
+            # now create the event roles
+            for line in reader.readlines():
+                split = line.split()
+                elem_id = split[0]
+                if elem_id.startswith('E'):
+                    even_token = id2token[elem_id]
+                    for elem in split[2:]:
+                        role_and_id = elem.split(':')
+                        arg_token = id2token.get(role_and_id[1])
+                        if arg_token is None:
+                            raise RuntimeError(
+                                'There seems to be no mention associated with id {0} for event {1} in'
+                                ' file {2}'.format(role_and_id[1], elem_id, event_file_name))
+                        instance.add_edge(even_token.index, arg_token.index, role_and_id[0], 'role',
+                                          EdgeRenderType.dependency, note=elem_id)
+        if self.split_sentences:
+            return split_document(instance, sentence_starts)
+        return [instance]
+
+    @staticmethod
+    def _tokenize(instance: NLPInstance, text: str) -> tuple:
+        """
+         * Adds the space separated tokens of the text to the instance and finds the sentence boundaries.
+         *
+         * A token owns the characters from its first character to the space after it, the rest of the spaces
+         * belong to the next token (so the a1/a2 offsets around tokens resolve as they always did).
+         *
+         * @param instance the instance to add the tokens to.
+         * @param text     the whole text of the document.
+         * @return the sorted character offsets where the tokens start and the indexes of the first tokens of the
+         *         sentences.
+        """
+        token_starts = []
+        sentence_starts = [0]
+        prev_end = 0
+        prev_word = ''
+        for match in _BIONLP_TOKEN.finditer(text):
+            word = match.group()
+            token = instance.add_token()
+            token.add_property('Word', word)
+            token.add_property('Index', str(token.index))
+            token_starts.append(prev_end + 1 if token.index > 0 else 0)
+            if token.index > 0 and ('\n' in text[prev_end:match.start()] or
+                                    prev_word[-1] in '.!?' and (word[0].isupper() or word[0].isdigit())):
+                sentence_starts.append(token.index)
+            prev_end = match.end()
+            prev_word = word
+        return token_starts, sentence_starts
+
 # ----------------------------------------------------------------------------------------------------------------------
 
 
@@ -492,63 +658,107 @@ class TheBeastFormat(CorpusFormat):
         self.deps = ''
         self.spans = ''
 
-    def load(self, file_name: str, from_sent_nr: int, to_sent_nr: int):
-        with open(file_name, encoding='UTF-8') as reader:
-            token_preds = self._extract_predicates_from_string(self.tokens)
-            dep_preds = self._extract_predicates_from_string(self.deps)
-            span_preds = self._extract_predicates_from_string(self.spans)
-
-            instance_nr = 0
-            instance = NLPInstance()
-            as_token = None
-            as_dep = None
-            as_span = None
-            result = []  # [NLPInstance]
-            rows = {}  # {str: [[str]]}
+    def sniff(self, file_name: str, head: [str]) -> float:
+        """
+         * Instances are separated by '>>' lines and the predicates start with '>'.
+        """
+        lines = [line.strip() for line in head]
+        if '>>' not in lines:
+            return 0.0
+        return 1.0 if any(line.startswith('>') and line != '>>' for line in lines) else 0.5
 
-            self._init_rows(rows, token_preds, span_preds, dep_preds)
+    def load(self, file_name: str, from_sent_nr: int, to_sent_nr: int, monitor: Monitor=None):
+        monitor = Monitor() if monitor is None else monitor
+        result = []
+        instances = self.iter_instances(file_name, from_sent_nr, to_sent_nr)
+        try:
+            for instance in instances:
+                result.append(instance)
+                monitor.progressed(len(result))
+        finally:
+            instances.close()
+        return result
 
-            while instance_nr < to_sent_nr:
-                try:
-                    line = check_eof(reader.readline()).strip()
-                    if line.startswith('>>'):
-                        # monitor.progressed(instanceNr)
-                        instance_nr += 1
-                        if instance_nr > from_sent_nr and instance_nr > 1:
-                            self._add_edges(instance, rows, token_preds, dep_preds, span_preds)
-
-                            result.append(instance)
-                            instance = NLPInstance()
-                            rows.clear()
-                            self._init_rows(rows, token_preds, span_preds, dep_preds)
-
-                    elif line.startswith('>') and instance_nr > from_sent_nr:
-                        pred = line[1:]
-                        as_token = token_preds.get(pred)
-                        as_dep = dep_preds.get(pred)
-                        as_span = span_preds.get(pred)
-                    else:
-                        line = line.strip()
-                        if line != '' and instance_nr > from_sent_nr:
-                            row = line.split('\t')
-                            if as_token is not None:
-                                rows[as_token].add(row)
-                            if as_dep is not None:
-                                rows[as_dep].add(row)
-                            if as_span is not None:
-                                rows[as_span].add(row)
-
-                except EOFError:
-                    break
+    def iter_instances(self, file_name: str, from_sent_nr: int, to_sent_nr: int):
+        """
+         * Streams the instances of the given range one by one. The file is read in one pass and only the rows of the
+         * configured predicates in the range are split, so large dumps of inference runs need memory only for the
+         * instance at hand. The reading stops at the end of the range.
+        """
+        token_preds, dep_preds, span_preds = self._predicates()
+        with open_corpus_file(file_name) as reader:
+            for sections in self._iter_sections(reader, from_sent_nr, to_sent_nr,
+                                                token_preds.keys() | dep_preds.keys() | span_preds.keys()):
+                yield self._create(sections, token_preds, dep_preds, span_preds)
 
-            self._add_edges(instance, rows, token_preds, dep_preds, span_preds)
+    def load_appended(self, file_name: str, offset: int, monitor: Monitor=None):
+        """
+         * An instance is complete when the '>>' line of the next instance is written.
+        """
+        if split_compression_suffix(file_name)[1] != '':
+            raise ValueError('Compressed files can not be followed: {0}'.format(file_name))
+        monitor = Monitor() if monitor is None else monitor
+        with open(file_name, 'rb') as reader:
+            reader.seek(offset)
+            data = reader.read()
+        last_separator = None
+        for last_separator in _BEAST_SEPARATOR.finditer(data):
+            pass
+        if last_separator is None or last_separator.start() == 0:
+            return [], offset
+
+        token_preds, dep_preds, span_preds = self._predicates()
+        corpus = []
+        for sections in self._iter_sections(data[:last_separator.start()].decode('UTF-8').splitlines(), 0,
+                                            sys.maxsize, token_preds.keys() | dep_preds.keys() | span_preds.keys()):
+            corpus.append(self._create(sections, token_preds, dep_preds, span_preds))
+            monitor.progressed(len(corpus))
+        return corpus, offset + last_separator.start()
+
+    def _predicates(self):
+        """
+         * @return the {predicate: name} dicts of the token, dependency and span predicates set in the GUI.
+        """
+        return (self._extract_predicates_from_string(self.tokens), self._extract_predicates_from_string(self.deps),
+                self._extract_predicates_from_string(self.spans))
 
-            result.append(instance)
-            return result
+    @staticmethod
+    def _iter_sections(lines, from_sent_nr: int, to_sent_nr: int, preds):
+        """
+         * Groups the rows of the given predicates by instances. Every instance starts with a '>>' line and the rows of
+         * a predicate follow its '>predicate' line. A row is split into fields at whitespace, quoted strings are kept
+         * whole.
+         *
+         * @return a generator of {predicate: [row]} dicts for the instances of the given range.
+        """
+        instance_nr = -1  # The lines before the first '>>' belong to no instance
+        sections = None
+        rows = None
+        for line in lines:
+            if line.startswith('>'):
+                if line.startswith('>>'):
+                    if sections is not None:
+                        yield sections
+                    instance_nr += 1
+                    if instance_nr >= to_sent_nr:
+                        return
+                    sections = {} if instance_nr >= from_sent_nr else None
+                    rows = None
+                elif sections is not None:
+                    pred = line[1:].strip()
+                    rows = sections.setdefault(pred, []) if pred in preds else None
+            elif rows is not None:  # The rows of other predicates and outside of the range are not split
+                fields = _BEAST_FIELD.findall(line)
+                if len(fields) > 0:
+                    rows.append(fields)
+        if sections is not None:
+            yield sections
 
     @staticmethod
     def _unquote(string):
-        return string[1: len(string) - 1]
+        if len(string) > 1 and string[0] == string[-1] == '"':
+            return string[1:-1]
+        return string
 
     @staticmethod
     def _extract_predicates_from_string(text):
@@ -565,45 +775,46 @@ class TheBeastFormat(CorpusFormat):
 
         return preds
 
-    def _add_edges(self, instance, rows, token_preds, dep_preds, span_preds):
-        for pred in token_preds.values():
-            # add_tokens
-            for row in rows:
+    def _desc(self, row):
+        if len(row) == 4:
+            return self._unquote(row[3].replace('-BR-', '\n\t'))
+        return None
+
+    def _create(self, sections, token_preds, dep_preds, span_preds):
+        """
+         * Creates an instance from the rows of the predicates: the token predicates give token properties (token id and
+         * value), the dependency predicates give dependencies (head, dependent, label and optional description) and the
+         * span predicates give spans (from, to, label and optional description, or token and label).
+        """
+        instance = NLPInstance()
+        token_map = instance.token_map
+        for pred, name in token_preds.items():
+            for row in sections.get(pred, ()):
                 try:
-                    instance.add_token(int(row[0])).add_property(pred, self._unquote(row[1]))
-                except ValueError:
-                    print('Could not load tokens from row {0} of rows {1}, skipping this row.'.format(row, rows),
+                    index, value = int(row[0]), self._unquote(row[1])
+                except (ValueError, IndexError):
+                    print('Could not load tokens from row {0} of predicate {1}, skipping this row.'.format(row, pred),
                           file=sys.stderr)
-                    # raise RuntimeError('Could not load tokens from row {0} of rows {1}, skipping this row.'.
-                    #                    format(row, rows))
-        # instance.consistify()
-        for pred in dep_preds.values():
-            # add_deps
-            for row in rows:
-                if len(row) == 4:
-                    desc = self._unquote(row[3].replace('-BR-', '\n\t'))
-                else:
-                    desc = None
-                instance.add_dependency(int(row[0]), int(row[1]), self._unquote(row[2]), pred, desc)
-        for pred in span_preds.values():
-            # add_spans
-            for row in rows:
-                # default len(row) == 3
-                token = int(row[1])
-                desc = None
-
-                if len(row) == 2:
-                    token = int(row[0])
-                elif len(row) == 4:
-                    desc = self._unquote(row[3].replace('-BR-', '\n\t'))
-
-                instance.add_span(int(row[0]), token, self._unquote(row[2]), pred, desc)
-
-    @staticmethod
-    def _init_rows(rows, token_preds, span_preds, dep_preds):
-        for pred in token_preds.values():
-            rows[pred] = []
-        for pred in span_preds.values():
-            rows[pred] = []
-        for pred in dep_preds.values():
-            rows[pred] = []
+                    continue
+                token = token_map.get(index)
+                if token is None:
+                    token = token_map[index] = Token(index)
+                token.add_property(name, value)
+        for pred, name in dep_preds.items():
+            for row in sections.get(pred, ()):
+                try:
+                    instance.add_dependency(int(row[0]), int(row[1]), self._unquote(row[2]), name, self._desc(row))
+                except (ValueError, IndexError, KeyError):
+                    print('Could not load dependency from row {0} of predicate {1}, skipping this row.'.
+                          format(row, pred), file=sys.stderr)
+        for pred, name in span_preds.items():
+            for row in sections.get(pred, ()):
+                try:
+                    if len(row) == 2:  # A one token span
+                        instance.add_span(int(row[0]), int(row[0]), self._unquote(row[1]), name)
+                    else:
+                        instance.add_span(int(row[0]), int(row[1]), self._unquote(row[2]), name, self._desc(row))
+                except (ValueError, IndexError, KeyError):
+                    print('Could not load span from row {0} of predicate {1}, skipping this row.'.format(row, pred),
+                          file=sys.stderr)
+        return instance
@@ -2,12 +2,54 @@
 # -*- coding: utf-8 -*-
 
 # This file implements TabFormat and all classes inherited from it: TabFormat, CoNLL2000, CoNLL2002, CoNLL2003,
-#  CoNLL2004, CoNLL2005, CoNLL2006, CoNLL2008, CoNLL2009 CoNLL2009, Malt-TAB and CCG classes...
+#  CoNLL2004, CoNLL2005, CoNLL2006, CoNLL2008, CoNLL2009 CoNLL2009, CoNLL-U, Malt-TAB and CCG classes...
+# The formats declare their columns with a TabSchema (see tab_schema.py), only CCG parses its rows by hand.
 
+import os
+import re
 import sys
 
-from libwwnlp.model.nlp_instance import NLPInstance
-from ioformats.corpus_format import CorpusFormat
+from libwwnlp.model.nlp_instance import NLPInstance, LazyNLPInstance
+from ioformats.corpus_format import CorpusFormat, Monitor, open_corpus_file, find_corpus_file, split_compression_suffix
+from ioformats.tab_schema import TabSchema, Prop, TagSpan, Sense, SenseFlag, Placeholder, Dependency, PredicateArgs, \
+    BIOSpans, PropBankBrackets
+
+_SENTENCE_END = r'<\s>'  # The closing marker of the sentences in CCG files (a literal backslash, as in the original)
+_PROP_COLUMN = re.compile(r'^(\([^()*]+)?\*[^()*]*\)?$')  # SRL argument brackets, e.g. (A0*, *, *), (V*)
+_UPOS_TAGS = {'ADJ', 'ADP', 'ADV', 'AUX', 'CCONJ', 'DET', 'INTJ', 'NOUN', 'NUM', 'PART', 'PRON', 'PROPN', 'PUNCT',
+              'SCONJ', 'SYM', 'VERB', 'X', '_'}  # The universal PoS tags of CoNLL-U
+
+
+def _row_check(schemas: tuple) -> tuple:
+    """
+     * @return the minimal width of the token rows and the comment prefix of the given schemas (None ones are skipped).
+    """
+    schemas = [schema for schema in schemas if schema is not None]
+    return (max((schema.min_width() for schema in schemas), default=0),
+            next((schema.comment_prefix for schema in schemas if schema.comment_prefix is not None), None))
+
+
+def _check_row(row: [str], width: int, comment_prefix: str, file_name: str, line_nr: int=None):
+    """
+     * @throws ValueError if the row is a token row (not a comment) with fewer columns than width.
+    """
+    if len(row) < width and (comment_prefix is None or not row[0].startswith(comment_prefix)):
+        position = file_name if line_nr is None else '{0}:{1}'.format(file_name, line_nr)
+        raise ValueError('{0}: {1} columns instead of at least {2}: {3}'.
+                         format(position, len(row), width, ' '.join(row)))
+
+
+def _is_int(value: str) -> bool:
+    return value.isdigit()
+
+
+def _is_bio(value: str) -> bool:
+    return value == 'O' or value[:2] in ('B-', 'I-')
+
+
+def _is_prop(value: str) -> bool:
+    return _PROP_COLUMN.match(value) is not None
+
 
 """
  * A TabFormat loads data from text files where token properties are represented as white-space/tab separated values.
@@ -26,55 +68,190 @@ from ioformats.corpus_format import CorpusFormat
 class TabFormat(CorpusFormat):
     """
      This is a helper class that contain all common features of TabFormats corresponding to the CorpusFormat interface
+     The subclasses declare their columns in the schema class attribute, which is compiled into the row parser of
+     create() at its first use (and the open track columns in open_schema for create_open()).
+     Formats with both gold and predicted columns (e.g. CoNLL 2009) also declare a gold_schema and a predicted_schema
+     for load_gold_and_predicted().
     """
+    schema = None  # TabSchema
+    open_schema = None  # TabSchema
+    gold_schema = None  # TabSchema
+    predicted_schema = None  # TabSchema
+
     def __init__(self):
         """
-         * @see TabProcessor#_supports_open()
+         * @see TabProcessor#supports_open()
          * Does this processor support loading of open datasets (as in 'CoNLL Open Track').
          *
          * @return true iff the processor supports loading of open datasets.
         """
         super().__init__()
-        self._support_open = False
+        self._supports_open = False
 
-    def load(self, file_name: str, from_sent_nr: int, to_sent_nr: int):
-        result = self._load_tabs(file_name, from_sent_nr, to_sent_nr, self.create)
+    def load(self, file_name: str, from_sent_nr: int, to_sent_nr: int, monitor: Monitor=None):
+        return self._load_tabs(self.iter_instances(file_name, from_sent_nr, to_sent_nr), monitor)
 
-        if self._support_open:
-            file_name_open = file_name[0:file_name.rfind('.')] + '.open'
-            open_corpus = self._load_tabs(file_name_open, from_sent_nr, to_sent_nr, self.create_open)
-            for i, oc_elem in enumerate(open_corpus):
-                result[i].merge(oc_elem)
+    def iter_instances(self, file_name: str, from_sent_nr: int, to_sent_nr: int):
+        """
+         * Streams the instances of the given range of sentences one by one, without keeping the corpus in memory.
+         * The instances are lazy (see create_lazy()): only the rows of the sentences are split, they are parsed at
+         * their first use.
+         *
+         * With open dataset support the matching '.open' file (compressed or not) is read in lockstep and each of its
+         * sentences is merged into the sentence of the main file at the same position. Without such a file (or if the
+         * file is the open track itself) the sentences are not merged.
+         *
+         * @return a generator of the NLPInstances (close it to release the files before the end).
+        """
+        file_name_open = self._find_open_file(file_name) if self._supports_open else None
+        if file_name_open is None:
+            return self._iter_tabs(file_name, from_sent_nr, to_sent_nr, self.create_lazy, (self.schema,))
+        return self._merge_open(self._iter_tabs(file_name, from_sent_nr, to_sent_nr, list, (self.schema,)),
+                                self._iter_tabs(file_name_open, from_sent_nr, to_sent_nr, list, (self.open_schema,)))
 
-        return result
+    def iter_rows(self, file_name: str, from_sent_nr: int, to_sent_nr: int):
+        """
+         * Streams the rows of the given range of sentences without parsing them (see create()), e.g. to parse them in
+         * other processes. The open dataset is not read.
+         *
+         * @return a generator of the rows (lists of column values) of the sentences.
+        """
+        return self._iter_tabs(file_name, from_sent_nr, to_sent_nr, list, (self.schema,))
+
+    @staticmethod
+    def _find_open_file(file_name: str):
+        """
+         * @return the name of the existing open track file of the given file or None.
+        """
+        base_name = split_compression_suffix(file_name)[0]
+        file_name_open = find_corpus_file(base_name[0:base_name.rfind('.')] + '.open')
+        if file_name_open is None or os.path.abspath(file_name_open) == os.path.abspath(file_name):
+            return None
+        return file_name_open
+
+    def _merge_open(self, rows, open_rows):
+        try:
+            for sentence_rows in rows:
+                # The open file may be shorter
+                yield LazyNLPInstance((sentence_rows, next(open_rows, None)), self._create_with_open)
+        finally:
+            rows.close()
+            open_rows.close()
+
+    def _create_with_open(self, rows_and_open_rows):
+        rows, open_rows = rows_and_open_rows
+        instance = self.create(rows)
+        if open_rows is not None:
+            instance.merge(self.create_open(open_rows))
+        return instance
 
     @staticmethod
-    def _load_tabs(file_name, from_sent_nr: int, to_sent_nr: int, open_fun):
+    def _load_tabs(instances, monitor: Monitor=None):
+        monitor = Monitor() if monitor is None else monitor
         corpus = []
+        try:
+            for instance in instances:
+                corpus.append(instance)
+                monitor.progressed(len(corpus))
+        finally:
+            instances.close()
+        return corpus
+
+    @staticmethod
+    def _iter_tabs(file_name, from_sent_nr: int, to_sent_nr: int, open_fun, schemas: tuple=()):
+        """
+         * Splits the sentences of the given range into rows and passes them to open_fun. The token rows are checked
+         * against the given schemas (see _check_row()), so a malformed file fails here and not at the first use of the
+         * (lazy) instances.
+         *
+         * @throws ValueError if a row has fewer columns than the schemas need.
+        """
+        width, comment_prefix = _row_check(schemas)
         rows = []
         instance_nr = 0
-        with open(file_name, encoding='UTF-8') as reader:
-            for line in reader:
+        with open_corpus_file(file_name) as reader:
+            for line_nr, line in enumerate(reader, start=1):
                 if instance_nr >= to_sent_nr:
                     break
                 line = line.strip()
-                if line == '' or line.split()[0] == '<\s>':
+                if line == '' or line.split()[0] == _SENTENCE_END:
                     instance_nr += 1
                     if instance_nr > from_sent_nr:
                         instance = open_fun(rows)
-                        corpus.append(instance)
-                        rows.clear()
+                        rows = []
+                        yield instance
                 else:
                     if instance_nr >= from_sent_nr:
-                        rows.append(line.split())
+                        row = line.split()
+                        _check_row(row, width, comment_prefix, file_name, line_nr)
+                        rows.append(row)
 
             if len(rows) > 0:
-                corpus.append(open_fun(rows))
+                yield open_fun(rows)
 
-        return corpus
+    def load_appended(self, file_name: str, offset: int, monitor: Monitor=None):
+        """
+         * A sentence is complete when its closing empty line is written. The open dataset is not followed.
+        """
+        if split_compression_suffix(file_name)[1] != '':
+            raise ValueError('Compressed files can not be followed: {0}'.format(file_name))
+        monitor = Monitor() if monitor is None else monitor
+        width, comment_prefix = _row_check((self.schema,))
+        corpus = []
+        rows = []
+        with open(file_name, 'rb') as reader:
+            reader.seek(offset)
+            position = offset
+            for line in reader:
+                if not line.endswith(b'\n'):
+                    break  # The line is still being written
+                position += len(line)
+                line = line.decode('UTF-8').strip()
+                if line == '' or line.split()[0] == _SENTENCE_END:
+                    corpus.append(self.create_lazy(rows))
+                    rows = []
+                    offset = position
+                    monitor.progressed(len(corpus))
+                else:
+                    row = line.split()
+                    _check_row(row, width, comment_prefix, file_name)
+                    rows.append(row)
+        return corpus, offset
+
+    def load_gold_and_predicted(self, file_name: str, from_sent_nr: int, to_sent_nr: int, monitor: Monitor=None):
+        """
+         * Loads a gold and a predicted corpus from the gold and the predicted columns of the same file, so the file is
+         * read and split into rows only once. The corpora are aligned sentence by sentence, ready for nlp_diff().
+         *
+         * @return the gold and the predicted corpus.
+        """
+        if self.gold_schema is None or self.predicted_schema is None:
+            raise NotImplementedError('{0} has no predicted columns'.format(self.name))
+        gold_schema, predicted_schema = self.gold_schema, self.predicted_schema
+        pairs = self._load_tabs(self._iter_tabs(file_name, from_sent_nr, to_sent_nr,
+                                                lambda rows: (LazyNLPInstance(rows, gold_schema.parse),
+                                                              LazyNLPInstance(rows, predicted_schema.parse)),
+                                                (gold_schema, predicted_schema)),
+                                monitor)
+        return [gold for gold, _ in pairs], [predicted for _, predicted in pairs]
+
+    def sniff(self, file_name: str, head: [str]) -> float:
+        """
+         * The score is the ratio of the token rows in the head accepted by _sniff_row().
+        """
+        rows = [line.split() for line in head if len(line.strip()) > 0 and line.split()[0] != _SENTENCE_END]
+        if len(rows) == 0:
+            return 0.0
+        return sum(1 for row in rows if self._sniff_row(row)) / len(rows)
 
     @staticmethod
-    def create_open(_):
+    def _sniff_row(row: [str]) -> bool:
+        """
+         * Is the row (the split columns of a line) a plausible token row in this format?
+        """
+        return False
+
+    def create_open(self, rows):
         """
          * @see TabProcessor#create_open(List<? extends List<String>>)
          * Create an NLPInstance from the given table (list of rows) of strings, assuming that the passed rows are from
@@ -83,7 +260,28 @@ class TabFormat(CorpusFormat):
          * @param rows the rows that represent the column separated values in Tab format files.
          * @return an NLPInstance that represents the given rows.
         """
-        return None
+        if self.open_schema is None:
+            raise NotImplementedError
+        return self.open_schema.parse(rows)
+
+    def format_instance(self, instance: NLPInstance) -> str:
+        """
+         * Writes the instance in the columns of the schema (see TabSchema#format_rows()), one token per line, followed
+         * by an empty line. Only the main file is written, the open track columns are not.
+        """
+        if self.schema is None:
+            raise NotImplementedError('{0} files can not be written'.format(self.name))
+        return ''.join('\t'.join(row) + '\n' for row in self.schema.format_rows(instance)) + '\n'
+
+    def create_lazy(self, rows):
+        """
+         * Create an NLPInstance that keeps the given rows and parses them with create() at its first use (see
+         * LazyNLPInstance), so the sentences that are never looked at are never parsed.
+         *
+         * @param rows the rows that represent the column separated values in Tab format files.
+         * @return a LazyNLPInstance of the given rows.
+        """
+        return LazyNLPInstance(rows, self.create)
 
     def create(self, rows):
         """
@@ -93,7 +291,9 @@ class TabFormat(CorpusFormat):
          * @param rows the rows that represent the column separated values in Tab format files.
          * @return an NLPInstance that represents the given rows.
         """
-        raise NotImplementedError
+        if self.schema is None:
+            raise NotImplementedError
+        return self.schema.parse(rows)
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -102,45 +302,16 @@ class CoNLL2000(TabFormat):
     """
      * Loads CoNLL 2000 chunk data.
     """
+    schema = TabSchema(Prop('Word', 0), Prop('Index'),
+                       TagSpan(1, 'pos'), TagSpan(2, 'chunk (BIO)'), BIOSpans(2, 'chunk'))
 
     def __init__(self):
         super().__init__()
         self.name = 'CoNLL 2000'
 
-    def create(self, rows):
-        instance = NLPInstance()
-        for index, row in enumerate(rows):
-            instance.add_token().\
-                add_property(name='Word', value=row[0]).\
-                add_property(name='Index', value=str(index))
-
-            instance.add_span(index, index, row[1], 'pos')
-            instance.add_span(index, index, row[2], 'chunk (BIO)')
-
-        self._extract_span00_02(rows=rows, column=2, field_type='chunk', instance=instance)
-
-        return instance
-
     @staticmethod
-    def _extract_span00_02(rows: list, column: int, field_type: str, instance: NLPInstance):
-        in_chunk = False
-        begin = 0
-        current_chunk = ''
-        for index, row in enumerate(rows):
-            chunk = row[column]
-            minus = chunk.find('-')
-            if minus != -1:
-                bio = chunk[0:minus]
-                label = chunk[minus+1:]
-                if 'B' == bio:
-                    if in_chunk:
-                        instance.add_span(begin, index - 1, current_chunk, field_type)
-                    begin = index
-                    current_chunk = label
-                    in_chunk = True
-            elif in_chunk:
-                    instance.add_span(begin, index - 1, current_chunk, field_type)
-                    in_chunk = False
+    def _sniff_row(row: [str]) -> bool:
+        return len(row) == 3 and _is_bio(row[2]) and not _is_bio(row[1])
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -149,23 +320,16 @@ class CoNLL2002(CoNLL2000):
     """
      * Loads CoNLL 2002 NER data.
     """
+    schema = TabSchema(Prop('Word', 0), Prop('Index'),
+                       TagSpan(1, 'ner (BIO)'), BIOSpans(1, 'ner'))
 
     def __init__(self):
         super().__init__()
         self.name = 'CoNLL 2002'
 
-    def create(self, rows):
-        instance = NLPInstance()
-        for index, row in enumerate(rows):
-            instance.add_token().\
-                add_property(name='Word', value=row[0]).\
-                add_property(name='Index', value=str(index))
-
-            instance.add_span(index, index, row[1], 'ner (BIO)')
-
-        self._extract_span00_02(rows=rows, column=1, field_type='ner', instance=instance)
-
-        return instance
+    @staticmethod
+    def _sniff_row(row: [str]) -> bool:
+        return len(row) == 2 and _is_bio(row[1])
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -174,54 +338,17 @@ class CoNLL2003(TabFormat):
     """
      * Loads CoNLL 2003 chunk and NER data.
     """
+    schema = TabSchema(Prop('Word', 0), Prop('Index'),
+                       TagSpan(1, 'pos'), TagSpan(2, 'chunk (BIO)'), TagSpan(3, 'ner (BIO)'),
+                       BIOSpans(2, 'chunk', iob1=True), BIOSpans(3, 'ner', iob1=True))
 
     def __init__(self):
         super().__init__()
         self.name = 'CoNLL 2003'
 
-    def create(self, rows):
-        instance = NLPInstance()
-        for index, row in enumerate(rows):
-            instance.add_token().\
-                add_property(name='Word', value=row[0]).\
-                add_property(name='Index', value=str(index))
-
-            instance.add_span(index, index, row[1], 'pos')
-            instance.add_span(index, index, row[2], 'chunk (BIO')
-            instance.add_span(index, index, row[3], 'ner (BIO)')
-
-        self._extract_span03(rows=rows, column=2, field_type='chunk', instance=instance)
-        self._extract_span03(rows=rows, column=3, field_type='ner', instance=instance)
-
-        return instance
-
     @staticmethod
-    def _extract_span03(rows: list, column: int, field_type: str, instance: NLPInstance):
-        in_chunk = False
-        begin = 0
-        current_chunk = ''
-        index = 0
-        for index, row in enumerate(rows):
-            chunk = row[column]
-            minus = chunk.find('-')
-            if minus != -1:
-                bio = chunk[0:minus]
-                label = chunk[minus+1:]
-                if in_chunk:
-                    # start a new chunk and finish old one
-                    if 'B' == bio or 'I' == bio and label != current_chunk:
-                        instance.add_span(begin, index - 1, current_chunk, field_type)
-                        begin = index
-                        current_chunk = label
-                else:
-                    in_chunk = True
-                    begin = index
-                    current_chunk = label
-            elif in_chunk:
-                    instance.add_span(begin, index - 1, current_chunk, field_type)
-                    in_chunk = False
-        if in_chunk:
-            instance.add_span(begin, index - 1, current_chunk, field_type)
+    def _sniff_row(row: [str]) -> bool:
+        return len(row) == 4 and _is_bio(row[2]) and _is_bio(row[3])
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -230,41 +357,18 @@ class CoNLL2004(TabFormat):
     """
      * Loads CoNLL 2004 SRL data.
     """
+    schema = TabSchema(Prop('Word', 0), Prop('Index'),
+                       PropBankBrackets(marker_column=1, sense_columns=(1,), first_column=2))
 
     def __init__(self):
         super().__init__()
         self.name = 'CoNLL 2004'
 
-    def create(self, rows):
-        instance = NLPInstance()
-        for index, row in enumerate(rows):
-            instance.add_token().\
-                add_property(name='Word', value=row[0]).\
-                add_property(name='Index', value=str(index))
-
-        predicate_count = 0
-        for index, row in enumerate(rows):
-            if row[1] != '-':
-                sense = row[1]
-                instance.add_span(index, index, sense, 'sense')
-
-                self._extract_span04_05(rows, 2 + predicate_count, 'role', sense + ':', instance)
-
-                predicate_count += 1
-        return instance
-
     @staticmethod
-    def _extract_span04_05(rows: list, column: int, field_type: str, prefix: str, instance: NLPInstance):
-        begin = 0
-        current_chunk = ''
-        for index, row in enumerate(rows):
-            chunk = row[column]
-            if chunk.startswith('('):
-                end = chunk.index('*')  # To get ValueError when not found instead of find's -1
-                current_chunk = chunk[1:end]
-                begin = index
-            if chunk.endswith(')'):
-                instance.add_span(begin, index, prefix + current_chunk, field_type)
+    def _sniff_row(row: [str]) -> bool:
+        if len(row) == 2:  # A sentence without predicates
+            return row[1] == '-'
+        return 3 <= len(row) < 11 and all(_is_prop(column) for column in row[2:])
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -273,33 +377,16 @@ class CoNLL2005(CoNLL2004):
     """
      * Loads CoNLL 2005 SRL data.
     """
+    schema = TabSchema(Prop('Word', 0), Prop('Index'),
+                       PropBankBrackets(marker_column=9, sense_columns=(10, 9), first_column=11))
 
     def __init__(self):
         super().__init__()
         self.name = 'CoNLL 2005'
 
-    def create(self, rows):
-        instance = NLPInstance()
-        for index, row in enumerate(rows):
-            instance.add_token().\
-                add_property(name='Word', value=row[0]).\
-                add_property(name='Index', value=str(index))
-
-        predicate_count = 0
-        for index, row in enumerate(rows):
-            try:
-                if row[9] != '-':
-                    sense = row[10] + '.' + row[9]
-                    instance.add_span(index, index, sense, 'sense')
-
-                    self._extract_span04_05(rows, 11 + predicate_count, 'role', sense + ':', instance)
-
-                    predicate_count += 1
-            except IndexError:
-                print('Can\'t parse file: not enough (10) column in row {0}'.format(row), file=sys.stderr)
-                sys.exit(1)
-
-        return instance
+    @staticmethod
+    def _sniff_row(row: [str]) -> bool:
+        return len(row) >= 11 and (row[9] == '-' or _is_int(row[9])) and all(_is_prop(column) for column in row[11:])
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -308,33 +395,18 @@ class CoNLL2006(TabFormat):
     """
      * Loads CoNLL 2006 Dependency data.
     """
+    schema = TabSchema(Prop('Word', 1), Prop('Index', 0), Prop('Lemma', 2), Prop('CPos', 3), Prop('Pos', 4),
+                       Prop('Feats', 5),
+                       Dependency(head=6, label=7, edge_type='dep', on_error='mark'), Placeholder(8), Placeholder(9),
+                       root=True)
 
     def __init__(self):
         super().__init__()
         self.name = 'CoNLL 2006'
 
-    def create(self, rows):
-        instance = NLPInstance()
-        instance.add_token().add_property('Word', '-Root-')
-        for row in rows:
-            instance.add_token().\
-                add_property(name='Word', value=row[1]).\
-                add_property(name='Index', value=row[0]).\
-                add_property(name='Lemma', value=row[2]).\
-                add_property(name='CPos', value=row[3]).\
-                add_property(name='Pos', value=row[4]).\
-                add_property(name='Feats', value=row[5])
-
-        for row in rows:
-            # dependency
-            mod = int(row[0])
-            try:
-                instance.add_dependency(start=int(row[6]), end=mod, label=row[7], edge_type='dep')
-            except (ValueError, IndexError, KeyError):
-                print('Can\'t parse dependency', file=sys.stderr)
-                instance.tokens[mod].add_property('DepMissing', 'missing')
-            # role
-        return instance
+    @staticmethod
+    def _sniff_row(row: [str]) -> bool:
+        return len(row) == 10 and _is_int(row[0]) and _is_int(row[6])
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -343,59 +415,23 @@ class CoNLL2008(TabFormat):
     """
      * Loads CoNLL 2008 Joint SRL and Dependency data.
     """
+    schema = TabSchema(Prop('Word', 1), Prop('Index', 0), Prop('Lemma', 2), Prop('Pos', 3), Prop('Split Form', 5),
+                       Prop('Split Lemma', 6), Prop('Split PoS', 7), Sense(10),
+                       Dependency(head=8, label=9, edge_type='dep', empty='_'), PredicateArgs(11, note=None),
+                       root=True)
+    open_schema = TabSchema(Prop('Named Entity', 0, level=10), Prop('NamedEntity BBN', 1, level=11),
+                            Prop('WordNet', 2, level=12), Dependency(head=3, label=4, edge_type='malt'),
+                            root=True)
 
     def __init__(self):
         super().__init__()
         self.name = 'CoNLL 2008'
         self._supports_open = True
 
-    def create(self, rows):
-        instance = NLPInstance()
-        instance.add_token().add_property('Word', '-Root-')
-        predicates = []  # ArrayList<Integer>()
-        for row in rows:
-            instance.add_token().\
-                add_property(name='Word', value=row[1]).\
-                add_property(name='Index', value=row[0]).\
-                add_property(name='Lemma', value=row[2]).\
-                add_property(name='Pos', value=row[3]).\
-                add_property(name='Split Form', value=row[5]).\
-                add_property(name='Split Lemma', value=row[6]).\
-                add_property(name='Split PoS', value=row[7])
-            if row[10] != '_':
-                index = int(row[0])
-                predicates.append(index)
-                instance.add_span(index, index, row[10], 'sense')
-
-        for row in rows:
-            # dependency
-            if row[8] != '_':
-                instance.add_dependency(int(row[8]), int(row[0]), row[9], 'dep')
-            # role
-            for col in range(11, len(row)):
-                label = row[col]
-                if label != '_':
-                    pred = predicates[col-11]
-                    arg = int(row[0])
-                    # if arg != pred
-                    instance.add_edge(start=pred, end=arg, label=label, edge_type='role')
-        return instance
-
     @staticmethod
-    def create_open(rows):
-        instance = NLPInstance()
-        instance.add_token()
-        for row in rows:
-            instance.add_token(). \
-                add_property('Named Entity', row[0], 10). \
-                add_property('NamedEntity BBN', row[1], 11). \
-                add_property('WordNet', row[2], 12)
-
-        index = 1
-        for index, row in enumerate(rows, start=1):
-            # dependency
-            instance.add_edge(start=int(row[3]), end=index, label=row[4], edge_type='malt')
-        return index
+    def _sniff_row(row: [str]) -> bool:
+        return len(row) >= 11 and _is_int(row[0]) and _is_int(row[8]) and not _is_int(row[9]) and \
+            not CoNLL2009._sniff_row(row)
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -404,45 +440,55 @@ class CoNLL2009(TabFormat):
     """
      * Loads CoNLL 2009 Joint SRL and Dependency data.
     """
+    schema = TabSchema(Prop('Word', 1), Prop('Index', 0), Prop('Lemma', 2), Prop('PLemma', 3), Prop('PoS', 4),
+                       Prop('PPoS', 5), Prop('Feat', 6), Prop('PFeat', 7), SenseFlag(12), Sense(13),
+                       Dependency(head=8, label=10, edge_type='dep', empty='_'),
+                       Dependency(head=9, label=11, edge_type='pdep', empty='_'), PredicateArgs(14),
+                       root=True)
+    # The gold and the predicted (P*) columns as two corpora with the same properties and edge types to diff them.
+    # Only the syntax is predicted, the senses and roles are in both.
+    gold_schema = TabSchema(Prop('Word', 1), Prop('Index', 0), Prop('Lemma', 2), Prop('PoS', 4), Prop('Feat', 6),
+                            TagSpan(4, 'pos'), Sense(13), Dependency(head=8, label=10, edge_type='dep', empty='_'),
+                            PredicateArgs(14),
+                            root=True)
+    predicted_schema = TabSchema(Prop('Word', 1), Prop('Index', 0), Prop('Lemma', 3), Prop('PoS', 5), Prop('Feat', 7),
+                                 TagSpan(5, 'pos'), Sense(13), Dependency(head=9, label=11, edge_type='dep', empty='_'),
+                                 PredicateArgs(14),
+                                 root=True)
 
     def __init__(self):
         super().__init__()
         self.name = 'CoNLL 2009'
 
-    def create(self, rows):
-        instance = NLPInstance()
-        instance.add_token().add_property(name='Word', value='-Root-')
-        predicates = []
-        for row in rows:
-            instance.add_token().\
-                add_property(name='Word', value=row[1]).\
-                add_property(name='Index', value=row[0]).\
-                add_property(name='Lemma', value=row[2]).\
-                add_property(name='PLemma', value=row[3]).\
-                add_property(name='PoS', value=row[4]).\
-                add_property(name='PPoS', value=row[5]).\
-                add_property(name='Feat', value=row[6]).\
-                add_property(name='PFeat', value=row[7])
-            if row[13] != '_':
-                index = int(row[0])
-                predicates.append(index)
-                instance.add_span(index, index, row[13], 'sense')
+    @staticmethod
+    def _sniff_row(row: [str]) -> bool:
+        # PHEAD is '_' in the files written from instances without predicted dependencies (e.g. converted ones)
+        return len(row) >= 14 and _is_int(row[0]) and _is_int(row[8]) and (_is_int(row[9]) or row[9] == '_') and \
+            row[12] in ('Y', '_')
 
-        for row in rows:
-            # dependency
-            if row[8] != '_':
-                instance.add_dependency(start=int(row[8]), end=int(row[0]), label=row[10], edge_type='dep')
-            if row[9] != '_':
-                instance.add_dependency(start=int(row[9]), end=int(row[0]), label=row[11], edge_type='pdep')
-            # role
-            for col in range(14, len(row)):
-                label = row[col]
-                if label != '_':
-                    pred = predicates[col-14]
-                    arg = int(row[0])
-                    # if arg != pred:
-                    instance.add_dependency(start=pred, end=arg, label=label, edge_type='role')
-        return instance
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class CoNLLU(TabFormat):
+    """
+     * Loads CoNLL-U (Universal Dependencies) data. Multiword token ranges (e.g. 1-2) and empty nodes (e.g. 5.1) are
+     * skipped, the basic dependencies are shown.
+    """
+    schema = TabSchema(Prop('Word', 1), Prop('Index', 0), Prop('Lemma', 2), Prop('UPoS', 3), Prop('XPoS', 4),
+                       Prop('Feats', 5), Prop('Deps', 8), Prop('Misc', 9),
+                       Dependency(head=6, label=7, edge_type='dep', on_error='mark'),
+                       root=True, id_column=0, comment_prefix='#')
+
+    def __init__(self):
+        super().__init__()
+        self.name = 'CoNLL-U'
+
+    @staticmethod
+    def _sniff_row(row: [str]) -> bool:
+        if row[0].startswith('#'):  # Sentence level comments (e.g. sent_id, text)
+            return True
+        return len(row) == 10 and (_is_int(row[0]) or _is_int(row[0].replace('-', '').replace('.', ''))) and \
+            row[3] in _UPOS_TAGS
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -451,28 +497,17 @@ class MaltTab(TabFormat):
     """
      * Loads Malt-TAB dependencies.
     """
+    schema = TabSchema(Prop('Word', 0), Prop('Index'), Prop('Pos', 1),
+                       Dependency(head=2, label=3, edge_type='dep', on_error='mark'),
+                       root=True)
 
     def __init__(self):
         super().__init__()
         self.name = 'Malt-TAB'
 
-    def create(self, rows):
-        instance = NLPInstance()
-        instance.add_token().add_property(name='Word', value='-Root-')
-        for index, row in enumerate(rows, start=1):
-            instance.add_token().\
-                add_property(name='Word', value=row[0]).\
-                add_property(name='Index', value=str(index)).\
-                add_property(name='Pos', value=row[1])
-
-        for mod, row in enumerate(rows, start=1):
-            # dependency
-            try:
-                instance.add_dependency(start=int(row[2]), end=mod, label=row[3], edge_type='dep')
-            except (ValueError, IndexError, KeyError):
-                print('Can\'t parse dependency', file=sys.stderr)
-                instance.tokens[mod].add_property('DepMissing', 'missing')  # role
-        return instance
+    @staticmethod
+    def _sniff_row(row: [str]) -> bool:
+        return len(row) == 4 and _is_int(row[2]) and not _is_int(row[0])
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -486,6 +521,10 @@ class CCG(TabFormat):
         super().__init__()
         self.name = 'CCG'
 
+    @staticmethod
+    def _sniff_row(row: [str]) -> bool:
+        return row[0] == '<s>' or len(row) >= 4 and _is_int(row[0]) and _is_int(row[1])
+
     def create(self, rows):
         instance = NLPInstance()
         sentence = rows[0]
@@ -501,7 +540,7 @@ class CCG(TabFormat):
 
         mod = 1
         for row in rows:
-            if row[0] != '<s>' and row[0] != '<\s>':
+            if row[0] != '<s>' and row[0] != _SENTENCE_END:
                 # dependency
                 try:
                     instance.add_dependency(start=int(row[1]), end=int(row[0]), label=row[2] + '_' + row[3],
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+
+from libwwnlp.model.edge import Edge, EdgeRenderType
+from libwwnlp.model.nlp_instance import NLPInstance
+from libwwnlp.model.token import Token
+
+"""
+ * A TabSchema declares how the columns of a tab format make up an NLPInstance, instead of hand-coding it in
+ * TabFormat#create(). The schema is compiled once into a row parser (see TabSchema#compile()) which builds the tokens
+ * and edges directly, without the per call checks and lookups of NLPInstance#add_token() and NLPInstance#add_edge().
+ *
+ * The column specifications are applied in three passes over the rows of a sentence:
+ *  1. per row: the token (Prop), one token spans (TagSpan) and predicates (Sense),
+ *  2. per row: dependencies (Dependency) and predicate-argument columns (PredicateArgs),
+ *  3. per column: spans over several rows (BIOSpans, PropBankBrackets).
+ * Within a pass the specifications are applied in the order of their declaration. The SenseFlag and Placeholder
+ * columns are not read, they are only filled in the written rows (see TabSchema#format_rows()).
+ *
+ * For example the CoNLL-U format is declared as:
+ *
+ *     TabSchema(Prop('Word', 1), Prop('Index', 0), ..., Dependency(head=6, label=7, edge_type='dep'),
+ *               root=True, id_column=0, comment_prefix='#')
+"""
+
+
+"""
+ * The names of the same token property in the different formats, tried in order when writing a property the instance
+ * does not have (e.g. the 'PoS' of CoNLL 2009 is written as the 'Pos' of CoNLL 2006 and MaltTab).
+"""
+PROPERTY_ALIASES = {'Pos': ('PoS', 'XPoS', 'CPos', 'UPoS'),
+                    'PoS': ('Pos', 'XPoS', 'CPos', 'UPoS'),
+                    'XPoS': ('Pos', 'PoS'),
+                    'CPos': ('UPoS', 'Pos', 'PoS'),
+                    'UPoS': ('CPos',),
+                    'Feats': ('Feat',),
+                    'Feat': ('Feats',)}
+
+
+def _label(edge) -> str:
+    return '_' if edge.label is None else edge.label
+
+
+def _property_value(token, name: str):
+    """
+     * @return the value of the property of the token or of its first alias that the token has (see PROPERTY_ALIASES),
+     *         None if it has none of them.
+    """
+    value = token.get_property_value(name)
+    for alias in PROPERTY_ALIASES.get(name, ()):
+        if value is not None:
+            break
+        value = token.get_property_value(alias)
+    return value
+
+
+class Prop:
+    """
+     * A token property from a column, or the position of the token (counted from 1 if there is a root token) if the
+     * column is None.
+    """
+    def __init__(self, name: str, column: int=None, level: int=None):
+        self.name = name
+        self.column = column
+        self.level = level
+
+
+class TagSpan:
+    """
+     * A one token span for every row, labelled with the value of the column (e.g. PoS tags).
+    """
+    def __init__(self, column: int, edge_type: str):
+        self.column = column
+        self.edge_type = edge_type
+
+
+class Sense:
+    """
+     * A predicate: a one token 'sense' span labelled with the value of the column, unless it is the empty value. The
+     * predicates are numbered in the order of the rows for PredicateArgs.
+    """
+    def __init__(self, column: int, edge_type: str='sense', empty: str='_'):
+        self.column = column
+        self.edge_type = edge_type
+        self.empty = empty
+
+
+class SenseFlag:
+    """
+     * A column that only marks the predicates (e.g. the FILLPRED column of CoNLL 2009): it is not read, but written as
+     * flag in the rows of the tokens with a 'sense' span (see Sense) and as empty in the other rows.
+    """
+    def __init__(self, column: int, edge_type: str='sense', flag: str='Y', empty: str='_'):
+        self.column = column
+        self.edge_type = edge_type
+        self.flag = flag
+        self.empty = empty
+
+
+class Placeholder:
+    """
+     * A column that is not read, but must be present in the written rows (e.g. PHEAD and PDEPREL of CoNLL 2006): it is
+     * written as the empty value.
+    """
+    def __init__(self, column: int, empty: str='_'):
+        self.column = column
+        self.empty = empty
+
+
+class Dependency:
+    """
+     * A dependency from the token in the head column to the token of the row, labelled by the label column.
+     *
+     * Rows with the empty value (if given) in the head column have no dependency. If on_error is 'mark', the rows with
+     * unparsable or dangling heads get a 'DepMissing' property instead of raising an error.
+    """
+    def __init__(self, head: int, label: int, edge_type: str, empty: str=None, on_error: str=None):
+        self.head = head
+        self.label = label
+        self.edge_type = edge_type
+        self.empty = empty
+        self.on_error = on_error
+
+
+class PredicateArgs:
+    """
+     * The columns from first_column on belong to the predicates (see Sense) in order: a non empty value in the i-th
+     * column is the role of the token of the row for the i-th predicate.
+    """
+    def __init__(self, first_column: int, edge_type: str='role', empty: str='_', note: str=''):
+        self.first_column = first_column
+        self.edge_type = edge_type
+        self.empty = empty
+        self.note = note
+
+
+class BIOSpans:
+    """
+     * Spans from the BIO encoded labels of a column (e.g. B-NP I-NP O).
+     *
+     * With iob1 an I- label after O or with a different label also starts a span (IOB1 encoding, as in CoNLL 2003),
+     * otherwise only B- labels start spans.
+    """
+    def __init__(self, column: int, edge_type: str, iob1: bool=False):
+        self.column = column
+        self.edge_type = edge_type
+        self.iob1 = iob1
+
+
+class PropBankBrackets:
+    """
+     * PropBank style predicate-argument structure (CoNLL 2004, 2005): every row with a non empty marker column is a
+     * predicate (its sense label is the values of sense_columns joined by '.') and the columns from first_column on
+     * hold the bracketed arguments of the predicates in order, e.g. (A0* * *) for a three token A0 argument.
+    """
+    def __init__(self, marker_column: int, sense_columns: tuple, first_column: int, empty: str='-',
+                 edge_type: str='role'):
+        self.marker_column = marker_column
+        self.sense_columns = sense_columns
+        self.first_column = first_column
+        self.empty = empty
+        self.edge_type = edge_type
+
+
+class TabSchema:
+    """
+     * The declaration of a tab format: the column specifications and how the rows map to tokens.
+     *
+     * @param columns        the column specifications (Prop, TagSpan, Sense, SenseFlag, Placeholder, Dependency,
+     *                       PredicateArgs, BIOSpans, PropBankBrackets).
+     * @param root           whether a '-Root-' token is added before the tokens (for dependency heads of 0).
+     * @param id_column      if given, only the rows with an integer id in this column are tokens (e.g. CoNLL-U
+     *                       multiword ranges and empty nodes are skipped).
+     * @param comment_prefix if given, the rows starting with it are skipped.
+    """
+    def __init__(self, *columns, root: bool=False, id_column: int=None, comment_prefix: str=None):
+        self.columns = columns
+        self.root = root
+        self.id_column = id_column
+        self.comment_prefix = comment_prefix
+        self._parser = None
+
+    def spec(self, spec_type) -> list:
+        """
+         * @return the column specifications of the given type in the order of declaration.
+        """
+        return [spec for spec in self.columns if isinstance(spec, spec_type)]
+
+    def parse(self, rows: list) -> NLPInstance:
+        """
+         * Creates an NLPInstance from the rows of a sentence (the parser is compiled at the first call).
+        """
+        if self._parser is None:
+            self._parser = self.compile()
+        return self._parser(rows)
+
+    def min_width(self) -> int:
+        """
+         * @return the number of columns that every token row has at least (the predicate columns are not counted).
+        """
+        return max(column for spec in self.columns for column in self._spec_columns(spec)) + 1
+
+    def compile(self):
+        """
+         * Compiles the schema into a row parser: the specifications are resolved once into closures, so parsing a
+         * sentence only runs the steps that the format needs.
+         *
+         * @return a function that creates an NLPInstance from the rows of a sentence.
+        """
+        props = [(prop.name, prop.column, prop.level if prop.level is not None else level)
+                 for level, prop in enumerate(self.spec(Prop))]
+        root = self.root
+        first_position = 1 if root else 0
+        row_filter = self._compile_row_filter()
+        row_steps = [self._compile_row_step(spec) for spec in self.columns if isinstance(spec, (TagSpan, Sense))]
+        edge_steps = [self._compile_row_step(spec) for spec in self.columns
+                      if isinstance(spec, (Dependency, PredicateArgs))]
+        column_steps = [self._compile_column_step(spec) for spec in self.columns
+                        if isinstance(spec, (BIOSpans, PropBankBrackets))]
+
+        def parse(rows):
+            if row_filter is not None:
+                rows = [row for row in rows if row_filter(row)]
+            instance = NLPInstance()
+            token_map = instance.token_map
+            edges = instance.edges
+            predicates = []
+            if root:
+                root_token = Token(0)
+                root_token.token_properties['Word'] = (0, '-Root-')
+                token_map[0] = root_token
+            for position, row in enumerate(rows, start=first_position):
+                token = Token(position)
+                token.token_properties = {name: (level, row[column] if column is not None else str(position))
+                                          for name, column, level in props}
+                token_map[position] = token
+                for step in row_steps:
+                    step(position, row, token_map, edges, predicates)
+            for position, row in enumerate(rows, start=first_position):
+                for step in edge_steps:
+                    step(position, row, token_map, edges, predicates)
+            for step in column_steps:
+                step(rows, first_position, token_map, edges)
+            return instance
+
+        return parse
+
+    def missing_properties(self, instance: NLPInstance) -> list:
+        """
+         * The properties of the schema (or their aliases) that none of the tokens of the instance has, so format_rows()
+         * would write them as '_' in every row (e.g. the Word of the tokens of an alignment).
+         *
+         * @return the names of the missing properties in the order of declaration.
+        """
+        tokens = self._written_tokens(instance)
+        return [prop.name for prop in self.spec(Prop) if prop.column is not None and prop.name != 'Index' and
+                all(_property_value(token, prop.name) is None for token in tokens)]
+
+    def _written_tokens(self, instance: NLPInstance) -> list:
+        """
+         * @return the tokens that have rows: all of them except the root token (index 0) if the schema has one.
+        """
+        tokens = instance.tokens
+        if self.root and len(tokens) > 0 and tokens[0].index == 0:
+            tokens = tokens[1:]
+        return tokens
+
+    def format_rows(self, instance: NLPInstance) -> list:
+        """
+         * The inverse of parse(): lays out the tokens and edges of an instance in the columns of the schema. The
+         * columns that no specification covers are '_'. The Index property is always written as the position of the
+         * token (the heads refer to the positions), so filtered instances stay consistent. With a root token it is the
+         * token with index 0 and it has no row. Missing properties are looked up by their aliases (see
+         * PROPERTY_ALIASES), so the instances of an other format can be written too.
+         *
+         * A column declared by a TagSpan and a BIOSpans (e.g. CoNLL 2000 chunks) is written from the TagSpan edges if
+         * the instance has them. The arguments of PropBankBrackets are matched to the predicates by their sense labels,
+         * if several predicates have the same sense, the nearest one gets the argument. A cell holds one edge, so of
+         * the competing edges of a diff (a false negative and a false positive head) only one is kept.
+         *
+         * @return the rows (lists of column values) of the tokens.
+        """
+        tokens = self._written_tokens(instance)
+        first_position = 1 if self.root else 0
+        positions = {token.index: position for position, token in enumerate(tokens, start=first_position)}
+        if self.root:
+            positions[0] = 0
+        edges = {}  # {(render type, edge type): [Edge]}
+        for edge in instance.edges:
+            edges.setdefault((edge.render_type, edge.edge_type), []).append(edge)
+
+        rows = [['_'] * self.min_width() for _ in tokens]
+        # Backwards, so where two specifications share a column the first declared one wins if it has data
+        for spec in reversed(self.columns):
+            self._format_column(spec, tokens, positions, first_position, edges, rows)
+        return rows
+
+    @staticmethod
+    def _spec_columns(spec) -> tuple:
+        """
+         * @return the fixed columns of the specification (the predicate columns are added by _format_column()).
+        """
+        if isinstance(spec, Prop):
+            return () if spec.column is None else (spec.column,)
+        if isinstance(spec, Dependency):
+            return spec.head, spec.label
+        if isinstance(spec, PredicateArgs):
+            return spec.first_column - 1,
+        if isinstance(spec, PropBankBrackets):
+            return (spec.marker_column, spec.first_column - 1) + tuple(spec.sense_columns)
+        return spec.column,
+
+    def _format_column(self, spec, tokens, positions, first_position, edges, rows):
+        span, dependency = EdgeRenderType.span, EdgeRenderType.dependency
+        if isinstance(spec, Prop):
+            if spec.column is not None:
+                for position, (token, row) in enumerate(zip(tokens, rows), start=first_position):
+                    value = str(position) if spec.name == 'Index' else _property_value(token, spec.name)
+                    row[spec.column] = '_' if value is None else value
+
+        elif isinstance(spec, TagSpan):
+            for edge in edges.get((span, spec.edge_type), ()):
+                if edge.start.index == edge.end.index and edge.start.index in positions:
+                    rows[positions[edge.start.index] - first_position][spec.column] = _label(edge)
+
+        elif isinstance(spec, Sense):
+            for row in rows:
+                row[spec.column] = spec.empty
+            for edge in edges.get((span, spec.edge_type), ()):
+                if edge.start.index in positions:
+                    rows[positions[edge.start.index] - first_position][spec.column] = _label(edge)
+
+        elif isinstance(spec, SenseFlag):
+            for row in rows:
+                row[spec.column] = spec.empty
+            for edge in edges.get((span, spec.edge_type), ()):
+                if edge.start.index in positions and edge.label not in (None, '', '_'):
+                    rows[positions[edge.start.index] - first_position][spec.column] = spec.flag
+
+        elif isinstance(spec, Placeholder):
+            for row in rows:
+                row[spec.column] = spec.empty
+
+        elif isinstance(spec, Dependency):
+            for row in rows:
+                row[spec.head] = '_' if spec.empty is None else spec.empty
+                row[spec.label] = '_'
+            for edge in edges.get((dependency, spec.edge_type), ()):
+                if edge.start.index in positions and edge.end.index in positions:
+                    row = rows[positions[edge.end.index] - first_position]
+                    row[spec.head] = str(positions[edge.start.index])
+                    row[spec.label] = _label(edge)
+
+        elif isinstance(spec, PredicateArgs):
+            sense_types = {sense.edge_type for sense in self.spec(Sense)}
+            predicates = sorted({positions[edge.start.index] for sense_type in sense_types
+                                 for edge in edges.get((span, sense_type), ()) if edge.start.index in positions})
+            predicate_nrs = {position: predicate_nr for predicate_nr, position in enumerate(predicates)}
+            for row in rows:
+                del row[spec.first_column:]
+                row.extend([spec.empty] * len(predicates))
+            for edge in edges.get((dependency, spec.edge_type), ()):
+                predicate_nr = predicate_nrs.get(positions.get(edge.start.index))
+                if predicate_nr is not None and edge.end.index in positions:
+                    rows[positions[edge.end.index] - first_position][spec.first_column + predicate_nr] = \
+                        _label(edge)
+
+        elif isinstance(spec, BIOSpans):
+            for row in rows:
+                row[spec.column] = 'O'
+            for edge in sorted(edges.get((span, spec.edge_type), ()), key=lambda e: e.start.index):
+                if edge.start.index not in positions or edge.end.index not in positions:
+                    continue
+                begin, end = positions[edge.start.index] - first_position, positions[edge.end.index] - first_position
+                label = _label(edge)
+                # In IOB1 only a chunk right after an other one with the same label starts with B-
+                previous = rows[begin - 1][spec.column] if begin > 0 else 'O'
+                starts_chunk = not spec.iob1 or previous in ('B-' + label, 'I-' + label)
+                rows[begin][spec.column] = ('B-' if starts_chunk else 'I-') + label
+                for row in rows[begin + 1:end + 1]:
+                    row[spec.column] = 'I-' + label
+
+        elif isinstance(spec, PropBankBrackets):
+            self._format_propbank(spec, positions, first_position, edges, rows)
+
+    @staticmethod
+    def _format_propbank(spec, positions, first_position, edges, rows):
+        span = EdgeRenderType.span
+        predicates = sorted((positions[edge.start.index], _label(edge)) for edge in edges.get((span, 'sense'), ())
+                            if edge.start.index in positions)
+        for row in rows:
+            for column in (spec.marker_column,) + tuple(spec.sense_columns):
+                row[column] = spec.empty
+            del row[spec.first_column:]
+            row.extend(['*'] * len(predicates))
+        for position, sense in predicates:
+            values = sense.split('.', maxsplit=len(spec.sense_columns) - 1)
+            values += [spec.empty] * (len(spec.sense_columns) - len(values))
+            row = rows[position - first_position]
+            for column, value in zip(spec.sense_columns, values):
+                row[column] = value
+            if row[spec.marker_column] == spec.empty:
+                row[spec.marker_column] = sense
+
+        for edge in edges.get((span, spec.edge_type), ()):
+            if edge.start.index not in positions or edge.end.index not in positions:
+                continue
+            begin, end = positions[edge.start.index], positions[edge.end.index]
+            label = _label(edge)
+            candidates = [(abs(position - begin), predicate_nr, len(sense) + 1) for predicate_nr, (position, sense)
+                          in enumerate(predicates) if label.startswith(sense + ':')]
+            if len(candidates) == 0:
+                continue
+            _, predicate_nr, prefix_length = min(candidates)
+            argument = label[prefix_length:]
+            column = spec.first_column + predicate_nr
+            begin_row, end_row = rows[begin - first_position], rows[end - first_position]
+            begin_row[column] = '(' + argument + begin_row[column]
+            end_row[column] += ')'
+
+    def _compile_row_filter(self):
+        comment_prefix = self.comment_prefix
+        id_column = self.id_column
+        if comment_prefix is None and id_column is None:
+            return None
+
+        def row_filter(row):
+            if comment_prefix is not None and row[0].startswith(comment_prefix):
+                return False
+            return id_column is None or row[id_column].isdigit()
+        return row_filter
+
+    @staticmethod
+    def _compile_row_step(spec):
+        span, dependency = EdgeRenderType.span, EdgeRenderType.dependency
+        if isinstance(spec, TagSpan):
+            column, edge_type = spec.column, spec.edge_type
+
+            def tag_span(position, row, token_map, edges, _):
+                token = token_map[position]
+                edges.append(Edge(token, token, row[column], edge_type, '', span, None, None))
+            return tag_span
+
+        if isinstance(spec, Sense):
+            column, edge_type, empty = spec.column, spec.edge_type, spec.empty
+
+            def sense(position, row, token_map, edges, predicates):
+                if row[column] != empty:
+                    token = token_map[position]
+                    predicates.append(token)
+                    edges.append(Edge(token, token, row[column], edge_type, '', span, None, None))
+            return sense
+
+        if isinstance(spec, Dependency):
+            head, label, edge_type, empty, mark = spec.head, spec.label, spec.edge_type, spec.empty, \
+                                                  spec.on_error == 'mark'
+
+            def dependency_edge(position, row, token_map, edges, _):
+                try:
+                    if row[head] != empty:
+                        edges.append(Edge(token_map[int(row[head])], token_map[position], row[label], edge_type, '',
+                                          dependency, None, None))
+                except (ValueError, IndexError, KeyError):
+                    if not mark:
+                        raise
+                    print('Can\'t parse dependency', file=sys.stderr)
+                    token_map[position].add_property('DepMissing', 'missing')
+            return dependency_edge
+
+        if isinstance(spec, PredicateArgs):
+            first_column, edge_type, empty, note = spec.first_column, spec.edge_type, spec.empty, spec.note
+
+            def predicate_args(position, row, token_map, edges, predicates):
+                for predicate_nr, label in enumerate(row[first_column:]):
+                    if label != empty:  # IndexError if there are more arguments than predicates
+                        edges.append(Edge(predicates[predicate_nr], token_map[position], label, edge_type, note,
+                                          dependency, None, None))
+            return predicate_args
+
+        raise TypeError('Unknown column specification: {0}'.format(spec))
+
+    @staticmethod
+    def _compile_column_step(spec):
+        span = EdgeRenderType.span
+        if isinstance(spec, BIOSpans):
+            column, edge_type, iob1 = spec.column, spec.edge_type, spec.iob1
+
+            def bio_spans(rows, first_position, token_map, edges):
+                begin = None
+                current_chunk = ''
+                for position, row in enumerate(rows, start=first_position):
+                    bio, minus, label = row[column].partition('-')
+                    if minus == '':  # Outside of the chunks
+                        if begin is not None:
+                            edges.append(Edge(token_map[begin], token_map[position - 1], current_chunk, edge_type,
+                                              '', span, None, None))
+                            begin = None
+                    elif bio == 'B' or iob1 and (begin is None or label != current_chunk):
+                        if begin is not None:
+                            edges.append(Edge(token_map[begin], token_map[position - 1], current_chunk, edge_type,
+                                              '', span, None, None))
+                        begin = position
+                        current_chunk = label
+                if begin is not None:
+                    edges.append(Edge(token_map[begin], token_map[first_position + len(rows) - 1], current_chunk,
+                                      edge_type, '', span, None, None))
+            return bio_spans
+
+        if isinstance(spec, PropBankBrackets):
+            marker_column, sense_columns, first_column, empty, edge_type = \
+                spec.marker_column, spec.sense_columns, spec.first_column, spec.empty, spec.edge_type
+
+            def propbank_brackets(rows, first_position, token_map, edges):
+                column = first_column
+                for position, row in enumerate(rows, start=first_position):
+                    if len(row) <= marker_column:
+                        raise ValueError('Can\'t parse file: not enough ({0}) column in row {1}'.
+                                         format(marker_column + 1, row))
+                    if row[marker_column] == empty:
+                        continue
+                    sense = '.'.join(row[sense_column] for sense_column in sense_columns)
+                    token = token_map[position]
+                    edges.append(Edge(token, token, sense, 'sense', '', span, None, None))
+                    begin = first_position
+                    current_chunk = ''
+                    for arg_position, arg_row in enumerate(rows, start=first_position):
+                        chunk = arg_row[column]
+                        if chunk.startswith('('):
+                            current_chunk = chunk[1:chunk.index('*')]  # ValueError instead of find's -1
+                            begin = arg_position
+                        if chunk.endswith(')'):
+                            edges.append(Edge(token_map[begin], token_map[arg_position], sense + ':' + current_chunk,
+                                              edge_type, '', span, None, None))
+                    column += 1
+            return propbank_brackets
+
+        raise TypeError('Unknown column specification: {0}'.format(spec))
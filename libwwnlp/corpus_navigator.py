@@ -2,13 +2,16 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
+import threading
+from collections import OrderedDict
 
-from ioformats.tab_processor import CoNLL2000, CoNLL2002, CoNLL2003, CoNLL2004, CoNLL2005, CoNLL2006, CoNLL2008, \
-    CoNLL2009, MaltTab
-from ioformats.other_formats import GizaAlignmentFormat, GaleAlignmentFormat, LispSExprFormat,\
-    BioNLP2009SharedTaskFormat, TheBeastFormat
+from ioformats.corpus_format import Monitor
+from ioformats.corpus_sampler import sample_corpus, load_indexes
+from ioformats.format_sniffer import sniff_formats, detect_format
+from ioformats.format_registry import known_corpus_formats
 from libwwnlp.nlp_canvas import NLPCanvas
-from libwwnlp.model.nlp_instance import NLPInstance, nlp_diff
+from libwwnlp.model.nlp_instance import NLPInstance, LazyNLPInstance, nlp_diff
 
 
 class CorpusNavigator:
@@ -18,15 +21,33 @@ class CorpusNavigator:
       search a corpus for keywords. The instances that match the user's query are presented in a list and one of them
        can then be picked to be rendered.
       The CorpusNavigator handles also a spinner panel that allows to go through this corpus by index.
+
+      Diffed instances are memoized in a bounded LRU cache keyed by (gold corpus, guess corpus, index), so stepping
+       back and forth or searching the same pair again does not call nlp_diff repeatedly. The cache can also be filled
+       in the background for a window of the selected pair (see precompute_diffs).
     """
-    def __init__(self, canvas: NLPCanvas=NLPCanvas()):
-        """Creates a new CorpusNavigator."""
+    def __init__(self, canvas: NLPCanvas=NLPCanvas(), diff_cache_size: int=1000):
+        """Creates a new CorpusNavigator.
+
+        Args:
+            canvas (NLPCanvas): The canvas to draw the selected instances on.
+            diff_cache_size (int): The maximal number of diffed instances kept in the cache.
+        """
         self._gold_corpora = {}
         self._guess_corpora = {}
 
         self._selected_gold = None
         self._selected_guess = None
 
+        self._followed = {}  # {(corpus type, corpus name): [corpus path, corpus format, byte offset]}
+        self._sample_indexes = {}  # {(corpus type, corpus name): [index in the file]} of the sampled corpora
+
+        self._diff_cache = OrderedDict()  # {(gold name, guess name, index): NLPInstance} in LRU order
+        self._diff_cache_size = diff_cache_size
+        self._diff_cache_lock = threading.Lock()
+        self._precompute_thread = None
+        self._precompute_stop = threading.Event()
+
         self.min_length = 0
         self.max_length = 0
 
@@ -34,35 +55,163 @@ class CorpusNavigator:
 
         self.canvas.renderer.params['span.orders'] = {'pos': 0, 'chunk (BIO)': 1, 'chunk': 2, 'ner (BIO)': 2, 'ner': 3,
                                                       'sense': 4, 'role': 5, 'phase': 5}
-        self.known_corpus_formats = {'CoNLL2000': CoNLL2000(),
-                                     'CoNLL2002': CoNLL2002(),
-                                     'CoNLL2003': CoNLL2003(),
-                                     'CoNLL2004': CoNLL2004(),
-                                     'CoNLL2005': CoNLL2005(),
-                                     'CoNLL2006': CoNLL2006(),
-                                     'CoNLL2008': CoNLL2008(),
-                                     'CoNLL2009': CoNLL2009(),
-                                     'MaltTab': MaltTab(),
-                                     'Giza Alingment Format': GizaAlignmentFormat(),
-                                     'Gale Alingment Format': GaleAlignmentFormat(),
-                                     'The Beast Format': TheBeastFormat(),
-                                     'Lisp S-expr Format': LispSExprFormat(),
-                                     'BioNLP2009 Shared Task Format': BioNLP2009SharedTaskFormat()
-                                     }
-
-    def add_corpus(self, corpus_path: str, corpus_format: str, corpus_type: str, min_sent=0, max_sent=200):
-        """Adds the corpus to the corresponding internal set of corpora."""
+        self.known_corpus_formats = known_corpus_formats()
+
+    def suggest_formats(self, corpus_path: str) -> list:
+        """Scores the known formats for the given corpus by looking at the head of the file only.
+
+        Returns:
+            list: The (score, format name) pairs in descending order of the scores (see format_sniffer).
+        """
+        return sniff_formats(corpus_path, self.known_corpus_formats)
+
+    def add_corpus(self, corpus_path: str, corpus_format: str, corpus_type: str, min_sent=0, max_sent=200,
+                   monitor: Monitor=None, follow: bool=False):
+        """Adds the corpus to the corresponding internal set of corpora.
+
+        If corpus_format is None, the format is detected from the head of the file (see format_sniffer).
+        The optional monitor is notified after each loaded instance and can cancel the loading (see Monitor).
+        If follow is True, the whole file is loaded (the sentence range is ignored) and the sentences appended to it
+        later are added by poll_followed().
+
+        This is load_corpus() followed by insert_corpus(). Load on a worker thread with load_corpus() and insert the
+        result on the thread that uses the navigator, as the loading does not touch the state of the navigator.
+        """
+        if corpus_type not in ('gold', 'guess'):
+            raise ValueError
+        loaded = self.load_corpus(corpus_path, corpus_format, min_sent, max_sent, monitor, follow)
+        self.insert_corpus(corpus_path, corpus_type, *loaded)
+
+    def load_corpus(self, corpus_path: str, corpus_format: str, min_sent=0, max_sent=200, monitor: Monitor=None,
+                    follow: bool=False) -> tuple:
+        """Loads a corpus without adding it (see add_corpus), so it can be called from any thread.
+
+        Returns:
+            tuple: The (detected) format name, the list of instances and the byte offset to follow the file from
+            (None if not followed), to be passed to insert_corpus().
+        """
+        if corpus_format is None:
+            corpus_format = detect_format(corpus_path, self.known_corpus_formats)
+            if corpus_format is None:
+                raise ValueError('Could not detect the format of {0}'.format(corpus_path))
+        if follow:
+            corpus, offset = self.known_corpus_formats[corpus_format].load_appended(corpus_path, 0, monitor)
+        else:
+            corpus = self.known_corpus_formats[corpus_format].load(corpus_path, min_sent, max_sent, monitor)
+            offset = None
+        return corpus_format, corpus, offset
+
+    def insert_corpus(self, corpus_path: str, corpus_type: str, corpus_format: str, corpus: list, offset: int=None):
+        """Adds a corpus loaded by load_corpus() (nothing happens if a corpus of the same name is already added).
+
+        Args:
+            corpus_path (str): The path of the corpus file, the corpus is named after it.
+            corpus_type (str): 'gold' or 'guess'.
+            corpus_format (str): The name of the format of the corpus.
+            corpus (list): The instances.
+            offset (int): If not None, the file is followed from this byte offset (see poll_followed).
+        """
         if corpus_type == 'gold':
             corp_type_dict = self._gold_corpora
         elif corpus_type == 'guess':
             corp_type_dict = self._guess_corpora
         else:
             raise ValueError
-        corpus = self.known_corpus_formats[corpus_format].load(corpus_path, min_sent, max_sent)
         corp_name = os.path.basename(corpus_path)
-
         if corp_name not in corp_type_dict:
-            corp_type_dict[os.path.basename(corpus_path)] = corpus
+            self._invalidate_diffs(corpus_type, corp_name)
+            corp_type_dict[corp_name] = corpus
+            if offset is not None:
+                self._followed[(corpus_type, corp_name)] = [corpus_path, corpus_format, offset]
+
+    def add_sampled_corpus(self, corpus_path: str, corpus_format: str, corpus_type: str, sample_size: int=200,
+                           seed=None, length_bins: tuple=None, label: str=None, edge_type: str=None,
+                           indexes_of: tuple=None, monitor: Monitor=None):
+        """Adds a random sample of the sentences of a corpus that is too large to be loaded (see corpus_sampler).
+
+        The file is read once and only the sampled sentences are kept. Their indexes in the file are kept as well (see
+        sample_indexes), so the same sentences of the guess file can be added by passing the type and name of the
+        sampled gold corpus as indexes_of (the sampling arguments are not used then) and the pairs stay aligned.
+
+        Args:
+            sample_size (int): The number of sentences to draw.
+            seed: The seed of the random generator (for reproducible samples).
+            length_bins (tuple): If given, the sample is stratified by sentence length with these bin boundaries.
+            label (str): If given, only the sentences with an edge with this label are sampled.
+            edge_type (str): If given with label, the edge must also have this type.
+            indexes_of (tuple): The (corpus type, corpus name) of a sampled corpus whose sentences are to be loaded.
+            monitor (Monitor): Notified after each read sentence, can cancel the sampling.
+        """
+        if corpus_type == 'gold':
+            corp_type_dict = self._gold_corpora
+        elif corpus_type == 'guess':
+            corp_type_dict = self._guess_corpora
+        else:
+            raise ValueError
+        if corpus_format is None:
+            corpus_format = detect_format(corpus_path, self.known_corpus_formats)
+            if corpus_format is None:
+                raise ValueError('Could not detect the format of {0}'.format(corpus_path))
+        corp_name = os.path.basename(corpus_path)
+        if corp_name in corp_type_dict:
+            return
+        if indexes_of is not None:
+            sample = load_indexes(self.known_corpus_formats[corpus_format], corpus_path,
+                                  self._sample_indexes[indexes_of], monitor)
+        else:
+            sample = sample_corpus(self.known_corpus_formats[corpus_format], corpus_path, sample_size, length_bins,
+                                   label=label, edge_type=edge_type, seed=seed, monitor=monitor)
+
+        self._invalidate_diffs(corpus_type, corp_name)
+        corp_type_dict[corp_name] = [instance for _, instance in sample]
+        self._sample_indexes[(corpus_type, corp_name)] = [index for index, _ in sample]
+
+    def sample_indexes(self, corpus_type: str, corpus_name: str) -> list:
+        """Returns the indexes in the file of the sentences of a sampled corpus (None if it was not sampled)."""
+        return self._sample_indexes.get((corpus_type, corpus_name))
+
+    def poll_followed(self) -> bool:
+        """Adds the sentences appended to the followed corpus files since the last poll (see add_corpus).
+
+        Only the new bytes of the files are read, the corpora are extended in place.
+
+        Returns:
+            bool: True iff any corpus got new sentences (the lengths are updated then).
+        """
+        changed = False
+        for (corpus_type, corp_name), followed in list(self._followed.items()):
+            corpus_path, corpus_format, offset = followed
+            try:
+                if os.path.getsize(corpus_path) <= offset:  # Nothing new (or the file was truncated)
+                    continue
+            except OSError:  # The file was moved away, the corpus stays as it is
+                continue
+            instances, followed[2] = self.known_corpus_formats[corpus_format].load_appended(corpus_path, offset)
+            corp_type_dict = self._gold_corpora if corpus_type == 'gold' else self._guess_corpora
+            corp_type_dict[corp_name].extend(instances)
+            changed = changed or len(instances) > 0
+        if changed:
+            self.update_length()
+        return changed
+
+    def add_gold_and_predicted(self, corpus_path: str, corpus_format: str, min_sent=0, max_sent=200,
+                               monitor: Monitor=None):
+        """Adds the gold and the predicted columns of one file as a gold and a guess corpus (e.g. CoNLL 2009).
+
+        The file is read only once (see TabFormat#load_gold_and_predicted). Both corpora are named after the file.
+        """
+        if corpus_format is None:
+            corpus_format = detect_format(corpus_path, self.known_corpus_formats)
+            if corpus_format is None:
+                raise ValueError('Could not detect the format of {0}'.format(corpus_path))
+        gold, guess = self.known_corpus_formats[corpus_format].load_gold_and_predicted(corpus_path, min_sent, max_sent,
+                                                                                       monitor)
+        corp_name = os.path.basename(corpus_path)
+        for corpus_type, corp_type_dict, corpus in (('gold', self._gold_corpora, gold),
+                                                    ('guess', self._guess_corpora, guess)):
+            if corp_name not in corp_type_dict:
+                self._invalidate_diffs(corpus_type, corp_name)
+                corp_type_dict[corp_name] = corpus
 
     def remove_corpus(self, corpus_type: str, corpus_name: str):
         """Removes the corpus and all diff corpora that compare the given corpus"""
@@ -75,10 +224,15 @@ class CorpusNavigator:
         else:
             raise ValueError
 
+        self._invalidate_diffs(corpus_type, corpus_name)
         del corp_type_dict[corpus_name]
+        self._followed.pop((corpus_type, corpus_name), None)
+        self._sample_indexes.pop((corpus_type, corpus_name), None)
 
     def select_gold(self, corp_name: str):
         if corp_name in self._gold_corpora:
+            if corp_name != self._selected_gold:
+                self.stop_precompute()
             self._selected_gold = corp_name
             self.update_length()
         else:
@@ -86,6 +240,8 @@ class CorpusNavigator:
 
     def select_guess(self, corp_name: str):
         if corp_name in self._guess_corpora:
+            if corp_name != self._selected_guess:
+                self.stop_precompute()
             self._selected_guess = corp_name
             self.update_length()
         else:
@@ -104,6 +260,119 @@ class CorpusNavigator:
         if self.max_length > 0:
             self.min_length = 1
 
+    def _invalidate_diffs(self, corpus_type: str, corpus_name: str):
+        """Stops the background diffing and drops every cached diff that was computed from the given corpus."""
+        self.stop_precompute()
+        key_pos = 0 if corpus_type == 'gold' else 1
+        with self._diff_cache_lock:
+            for key in [key for key in self._diff_cache if key[key_pos] == corpus_name]:
+                del self._diff_cache[key]
+
+    def _get_diff(self, gold_name: str, guess_name: str, index: int, stop: threading.Event=None) -> NLPInstance:
+        """Returns the diff of the index-th gold and guess instances, computing and caching it if needed.
+
+        The diff is not cached if the stop event (of a background pass) is set meanwhile, as the corpora may have been
+        changed since (see _invalidate_diffs).
+        """
+        key = (gold_name, guess_name, index)
+        with self._diff_cache_lock:
+            instance = self._diff_cache.get(key)
+            if instance is not None:
+                self._diff_cache.move_to_end(key)
+                return instance
+
+        instance = nlp_diff(self._gold_corpora[gold_name][index], self._guess_corpora[guess_name][index],
+                            'eval_status_Match', 'eval_status_FN', 'eval_status_FP')
+
+        with self._diff_cache_lock:
+            if stop is not None and stop.is_set():
+                return instance
+            self._diff_cache[key] = instance
+            self._diff_cache.move_to_end(key)
+            while len(self._diff_cache) > self._diff_cache_size:
+                self._diff_cache.popitem(last=False)
+        return instance
+
+    def get_instance(self, index: int) -> NLPInstance:
+        """Returns the index-th instance of the selected gold corpus, diffed with the selected guess corpus if any.
+
+        Args:
+            index (int): The (zero based) index of the instance.
+
+        Returns:
+            NLPInstance: The (diffed) instance, or an instance with the error message if it could not be parsed.
+        """
+        if self._selected_gold is None:
+            raise ValueError  # No gold corpora given
+        instance = self._gold_corpora[self._selected_gold][index]
+        if self._selected_guess is not None and index >= len(self._guess_corpora[self._selected_guess]):
+            raise IndexError('No guess instance at {0}'.format(index))
+        try:
+            if self._selected_guess is not None:
+                return self._get_diff(self._selected_gold, self._selected_guess, index)
+            if isinstance(instance, LazyNLPInstance):
+                instance.parse()
+        except Exception as error:  # One malformed sentence must not take down the navigation (or the GUI)
+            return self._error_instance(index, error)
+        return instance
+
+    @staticmethod
+    def _error_instance(index: int, error: Exception) -> NLPInstance:
+        """Reports the error of the index-th instance and returns an instance that shows it on the canvas."""
+        message = 'Sentence {0} could not be parsed: {1}: {2}'.format(index + 1, type(error).__name__, error)
+        print(message, file=sys.stderr)
+        instance = NLPInstance()
+        instance.add_token().add_property('Word', '[{0}]'.format(message))
+        return instance
+
+    def precompute_diffs(self, center: int=0, radius: int=None):
+        """Starts diffing the instances around the given index of the selected gold and guess pair in a background
+        thread.
+
+        Only a window of the corpora is diffed: the lazy instances (see LazyNLPInstance) are parsed by the diffing,
+        so a pass over the whole pair would parse every sentence of both corpora. The results go to the diff cache.
+        The pass stops when the selection changes or either corpus is removed.
+
+        Args:
+            center (int): The (zero based) index of the instance the user is looking at.
+            radius (int): The number of instances to diff after and before the center, defaults to a quarter of the
+                diff cache size (so the window does not evict the recently viewed diffs).
+        """
+        self.stop_precompute()
+        if self._selected_gold is None or self._selected_guess is None:
+            return
+        radius = self._diff_cache_size // 4 if radius is None else radius
+        # The following instances first as the user is more likely to step forward
+        indexes = list(range(center, min(center + radius + 1, self.max_length))) + \
+            list(range(center - 1, max(center - radius - 1, -1), -1))
+        self._precompute_stop = threading.Event()
+        self._precompute_thread = threading.Thread(target=self._precompute_worker,
+                                                   args=(self._selected_gold, self._selected_guess, indexes,
+                                                         self._precompute_stop),
+                                                   daemon=True)
+        self._precompute_thread.start()
+
+    def _precompute_worker(self, gold_name: str, guess_name: str, indexes: list, stop: threading.Event):
+        for index in indexes:
+            if stop.is_set():
+                break
+            try:
+                self._get_diff(gold_name, guess_name, index, stop)
+            except Exception as error:  # A failing instance is reported, the others are still diffed
+                if not stop.is_set():  # Not the corpus removed under the pass
+                    print('Could not diff sentence {0}: {1}: {2}'.format(index + 1, type(error).__name__, error),
+                          file=sys.stderr)
+
+    def stop_precompute(self):
+        """Stops the background diffing started by precompute_diffs (if any).
+
+        The thread is not waited for (it is called from the GUI thread): it stops after the current instance and the
+        diffs it computes after the stop are not cached.
+        """
+        if self._precompute_thread is not None:
+            self._precompute_stop.set()
+            self._precompute_thread = None
+
     def iter_gold(self):
         if self._selected_gold is not None and self._selected_gold in self._gold_corpora:
             return iter(self._gold_corpora[self._selected_gold])
@@ -120,26 +389,13 @@ class CorpusNavigator:
         """
         ret = {}
         if len(text) > 0:
-            gold = None
-            guess = None
-            if self._selected_gold is not None:
-                gold = self._gold_corpora[self._selected_gold]
-            if self._selected_guess is not None:
-                guess = self._guess_corpora[self._selected_guess]
-
-            if gold is not None and guess is not None:
-                def to_search(ind):
-                    return nlp_diff(gold[ind], guess[ind], 'eval_status_Match', 'eval_status_FN', 'eval_status_FP')
-            elif gold is not None:
-                def to_search(ind):
-                    return gold[ind]
-            else:
+            if self._selected_gold is None:
                 raise ValueError  # No gold corpora given
 
             counter = 1
             ret = {}
             for index in range(self.min_length-1, self.max_length):
-                sentence = ' '.join(token.get_property_value('Word') for token in to_search(index).tokens)
+                sentence = ' '.join(token.get_property_value('Word') for token in self.get_instance(index).tokens)
                 if text in sentence:
                     ret[counter] = (index + 1, sentence)
                     counter += 1
@@ -148,13 +404,7 @@ class CorpusNavigator:
     def update_canvas(self, curr_sent_index: int):
         """ Updates the canvas based on the current state of the navigator."""
         if self._selected_gold is not None:
-            if self._selected_guess is not None:
-                instance = nlp_diff(self._gold_corpora[self._selected_gold][curr_sent_index],
-                                    self._guess_corpora[self._selected_guess][curr_sent_index],
-                                    'eval_status_Match',  'eval_status_FN', 'eval_status_FP')
-            else:
-                instance = self._gold_corpora[self._selected_gold][curr_sent_index]
-            self.canvas.set_nlp_instance(instance)
+            self.canvas.set_nlp_instance(self.get_instance(curr_sent_index))
         else:
 
             example = NLPInstance()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_right
+
+from libwwnlp.model.edge import Edge, EdgeRenderType
+from libwwnlp.model.nlp_instance import NLPInstance
+from libwwnlp.model.token import Token
+
+
+def split_document(document: NLPInstance, sentence_starts: list) -> [NLPInstance]:
+    """Split a document instance into one instance per sentence.
+
+    The tokens of every sentence are re-indexed from zero (their properties are
+    kept, so e.g. an 'Index' property still tells the position in the
+    document). Edges inside a sentence are copied. Edges between sentences are
+    kept as stubs in both sentences they connect: a dependency becomes a loop
+    on its token in the sentence and a span is cut at the sentence boundary
+    (the sentences in between get the span over all of their tokens). The
+    note of a stub tells where the other end is (e.g. '->S2:5' means token 5
+    of sentence 2, '<-S0:3' token 3 of sentence 0, '<-S0:3 ->S2:5' both).
+
+    Args:
+        document (NLPInstance): The instance of the whole document.
+        sentence_starts (list): The sorted indexes of the first tokens of the
+            sentences.
+
+    Returns:
+        list: The instances of the sentences in document order.
+    """
+    tokens = document.tokens
+    starts = sorted({0, *(start for start in sentence_starts if 0 < start < len(tokens))})
+    sentences = [NLPInstance(render_type=document.render_type) for _ in starts]
+
+    old2new = {}  # {Token: (sentence number, Token)}
+    for token in tokens:
+        sentence_nr = bisect_right(starts, token.index) - 1
+        new_tok = Token(token.index - starts[sentence_nr])
+        new_tok.merge(token)
+        sentences[sentence_nr].add_tokens([new_tok])
+        old2new[token] = (sentence_nr, new_tok)
+
+    for edge in document.edges:
+        start_nr, start = old2new[edge.start]
+        end_nr, end = old2new[edge.end]
+        if start_nr == end_nr:
+            sentences[start_nr].edges.append(_copy_edge(edge, start, end, edge.note))
+            continue
+        if edge.render_type == EdgeRenderType.span:
+            start_stub = (start, sentences[start_nr].tokens[-1])
+            end_stub = (sentences[end_nr].tokens[0], end)
+        else:
+            start_stub = (start, start)
+            end_stub = (end, end)
+        sentences[start_nr].edges.append(_copy_edge(edge, *start_stub, _stub_note(edge.note, '->', end_nr, end)))
+        sentences[end_nr].edges.append(_copy_edge(edge, *end_stub, _stub_note(edge.note, '<-', start_nr, start)))
+        if edge.render_type == EdgeRenderType.span:
+            note = _stub_note(_stub_note(edge.note, '<-', start_nr, start), '->', end_nr, end)
+            for sentence in sentences[start_nr + 1:end_nr]:
+                sentence_tokens = sentence.tokens
+                sentence.edges.append(_copy_edge(edge, sentence_tokens[0], sentence_tokens[-1], note))
+    return sentences
+
+
+def _copy_edge(edge: Edge, start: Token, end: Token, note: str) -> Edge:
+    return Edge(start=start, end=end, label=edge.label, note=note, edge_type=edge.edge_type,
+                render_type=edge.render_type, description=edge.description, properties=edge.properties)
+
+
+def _stub_note(note: str, direction: str, sentence_nr: int, token: Token) -> str:
+    stub = '{0}S{1}:{2}'.format(direction, sentence_nr, token.index)
+    if note is not None and len(note) > 0:
+        return '{0} {1}'.format(note, stub)
+    return stub
@@ -269,6 +269,20 @@ class Filter:
         return NLPInstance(tokens=updated_tokens, edges=updated_edges, render_type=original.render_type,
                            split_point=updated_split_point)
 
+    def state_key(self) -> tuple:
+        """Return a hashable snapshot of the filter settings.
+
+        Two filters with equal state keys filter every instance the same way,
+        so the key can be used to cache the rendered results.
+
+        Returns:
+            tuple: The snapshot of the settings.
+        """
+        return (frozenset(self.forbidden_token_properties), frozenset(self.allowed_token_propvals), self.use_path,
+                self.collapse, self.propvals_whole_word, frozenset(self.allowed_edge_types),
+                frozenset(self.allowed_edge_properties), frozenset(self.allowed_labels), self.tok_propvals_whole_word,
+                frozenset(self.tok_allowed_token_propvals))
+
     @staticmethod
     def parse_interval(text, prop_set):
         prop_set.clear()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import threading
 from enum import Enum
 
 from libwwnlp.model.token import Token
@@ -154,7 +155,7 @@ class NLPInstance:
             edges (tuple): The edges to add.
         """
         for edge in edges:
-            if not self.is_valid_edge(edge.start, edge.end):
+            if not self.is_valid_edge(edge.start.index, edge.end.index):
                 raise KeyError('Couldn\'t add edge {}: no token at positions {} and {}.'.format(edge, edge.start,
                                                                                                 edge.end))
         self.edges.extend(edges)
@@ -236,6 +237,96 @@ class NLPInstance:
                                  ', '.join(str(edge) for edge in self.edges))
 
 
+class LazyNLPInstance(NLPInstance):
+    """An NLPInstance that is parsed from its raw data (e.g. the rows of a tab format sentence) at its first use.
+
+    Most sentences of a large corpus are never looked at, so the loaders keep only the raw data and the parser of
+    each sentence, and the tokens and edges are built when any of token_map, edges, render_type or split_point (and
+    so tokens, get_edges, etc.) is first accessed. Then the raw data is dropped and the instance behaves as an
+    ordinary NLPInstance.
+
+    Every instance has its own lock, so an instance used from a background thread too (e.g. by the precomputing of
+    the diffs) is parsed only once, while other instances can be parsed in parallel. If the parser fails, the raw
+    data is kept and the error is raised again at the next access.
+
+    Attributes:
+        is_parsed (bool): Whether the tokens and edges were already built.
+    """
+
+    def __init__(self, raw, parser):
+        """Create a LazyNLPInstance.
+
+        Args:
+            raw: The raw data of the instance (e.g. a list of rows).
+            parser (callable): Creates the NLPInstance from the raw data (e.g. TabFormat#create).
+        """
+        self._raw = raw
+        self._parser = parser
+        self._lock = threading.Lock()
+        self.is_parsed = False
+
+    def parse(self):
+        """Build the tokens and edges now (e.g. to report the errors of the parser at a known place)."""
+        with self._lock:
+            if not self.is_parsed:
+                instance = self._parser(self._raw)
+                self._token_map = instance.token_map
+                self._edges = instance.edges
+                self._render_type = instance.render_type
+                self._split_point = instance.split_point
+                self._raw = None
+                self._parser = None
+                self.is_parsed = True
+
+    @property
+    def token_map(self):
+        if not self.is_parsed:
+            self.parse()
+        return self._token_map
+
+    @token_map.setter
+    def token_map(self, token_map):
+        if not self.is_parsed:
+            self.parse()
+        self._token_map = token_map
+
+    @property
+    def edges(self):
+        if not self.is_parsed:
+            self.parse()
+        return self._edges
+
+    @edges.setter
+    def edges(self, edges):
+        if not self.is_parsed:
+            self.parse()
+        self._edges = edges
+
+    @property
+    def render_type(self):
+        if not self.is_parsed:
+            self.parse()
+        return self._render_type
+
+    @render_type.setter
+    def render_type(self, render_type):
+        if not self.is_parsed:
+            self.parse()
+        self._render_type = render_type
+
+    @property
+    def split_point(self):
+        if not self.is_parsed:
+            self.parse()
+        return self._split_point
+
+    @split_point.setter
+    def split_point(self, split_point):
+        if not self.is_parsed:
+            self.parse()
+        self._split_point = split_point
+
+
 def nlp_diff(gold_instance: NLPInstance, guess_instance: NLPInstance, match_prop, fn_prop, fp_prop) -> NLPInstance:
     """Calculate the difference between two NLP instances in terms of their edges.
 
@@ -3,8 +3,10 @@
 
 from libwwnlp.model.filter import Filter
 from libwwnlp.model.nlp_instance import RenderType
+from libwwnlp.render.renderers.alignment_matrix_renderer import AlignmentMatrixRenderer
 from libwwnlp.render.renderers.alignment_renderer import AlignmentRenderer
 from libwwnlp.render.renderers.single_sentence_renderer import SingleSentenceRenderer
+from libwwnlp.render.renderers.window_renderer import WindowRenderer
 from libwwnlp.render.backends.svg_writer import SVGWriteRenderer
 from libwwnlp.render.backends.matplotlib_writer import MPLRenderer
 
@@ -18,6 +20,15 @@ class NLPCanvas:
     calling NLPCanvas#updateNLPGraphics. The latter method should also be
     called whenever changes are made to the layout configuration (curved edges
     vs straight edges, antialiasing etc.).
+
+    Long instances (e.g. whole documents) can be rendered in windows of tokens
+    (see NLPCanvas#set_window). The global layout of the instance is computed
+    once and reused until the instance, the filter or the parameters change.
+
+    Alignments of more than matrix_threshold tokens are rendered as an
+    alignment matrix (see AlignmentMatrixRenderer) instead of as curves
+    between the two sentences. The renderers are stored by the key returned by
+    NLPCanvas#renderer_key.
     """
 
     def __init__(self):
@@ -27,12 +38,18 @@ class NLPCanvas:
         self.renderer_backends = {'SVGWrite': SVGWriteRenderer(), 'MPL': MPLRenderer()}
         self.renderer = SingleSentenceRenderer()
         self.renderers = {RenderType.single: SingleSentenceRenderer(),
-                          RenderType.alignment: AlignmentRenderer()}
+                          RenderType.alignment: AlignmentRenderer(),
+                          'alignment_matrix': AlignmentMatrixRenderer()}
+        self.matrix_threshold = 100
         self.used_types = set()
         self.used_properties = set()
         self.filter = Filter()
         self.nlp_instance = None
         self.used_edge_properties = set()
+        self.shape_indexes = ()
+        self.window = None
+        self._global_layout_key = None
+        self._global_layout = None
 
     def set_nlp_instance(self, nlp_instance):
         """
@@ -46,7 +63,21 @@ class NLPCanvas:
         self.used_properties = {prop for token in self.nlp_instance.tokens for prop in token.get_property_names()}
         self.used_edge_properties = {prop for edge in self.nlp_instance.get_edges() for prop in edge.properties}
         self.filter.allowed_edge_types = self.used_types
-        self.renderer = self.renderers[nlp_instance.render_type]
+        self.renderer = self.renderers[self.renderer_key(nlp_instance)]
+        self.window = None
+
+    def renderer_key(self, instance):
+        """Return the key of the renderer (see renderers) for the given instance.
+
+        Args:
+            instance (NLPInstance): The instance to render.
+
+        Returns:
+            RenderType or str: The render type of the instance or 'alignment_matrix' for long alignments.
+        """
+        if instance.render_type == RenderType.alignment and len(instance.tokens) > self.matrix_threshold:
+            return 'alignment_matrix'
+        return instance.render_type
 
     def filter_instance(self):
         """Just calls the filter on the current instance.
@@ -70,6 +101,85 @@ class NLPCanvas:
     def fire_instance_changed(self):
         raise NotImplementedError
 
+    def set_window(self, from_token, to_token):
+        """Restricts the rendering to the tokens from_token..to_token (exclusive) or lifts the restriction if None.
+
+        Only single sentence instances can be windowed, the others are always rendered whole.
+
+        Args:
+            from_token (int): The index of the first token to render.
+            to_token (int): The index of the token after the last one to render.
+        """
+        self.window = None if from_token is None else (from_token, to_token)
+
+    def global_layout(self, backend):
+        """Return the recorded layout of the whole current instance for rendering windows of it.
+
+        The layout is recorded at the first call and reused until the instance, the filter, the parameters or the
+        backend change.
+
+        Args:
+            backend: The backend which will draw the windows.
+
+        Returns:
+            DisplayList: The recorded layout.
+        """
+        key = (self.nlp_instance, self.filter.state_key(), repr(self.renderer.params), backend)
+        if key != self._global_layout_key:
+            self._global_layout = self.renderer.record(self.filter_instance(), backend)
+            self._global_layout_key = key
+        return self._global_layout
+
+    def windowed_renderer(self, backend):
+        """Return the renderer of the current instance for the given backend taking the window into account.
+
+        Args:
+            backend: The backend to render with.
+
+        Returns:
+            SingleSentenceRenderer, AlignmentRenderer, AlignmentMatrixRenderer or WindowRenderer: The renderer to use.
+        """
+        if self.window is None or self.nlp_instance.render_type != RenderType.single:
+            self.renderer.backend = backend
+            return self.renderer
+        return WindowRenderer(self.global_layout(backend), *self.window)
+
     def render_nlpgraphics(self, name=None, output_format='SVG'):
-        self.renderer.backend = self.renderer_backend
-        return self.renderer_backend.render_nlpgraphics(self.renderer, self.filter_instance(), name, output_format)
+        renderer = self.windowed_renderer(self.renderer_backend)
+        result = self.renderer_backend.render_nlpgraphics(renderer, self.filter_instance(), name, output_format)
+        self.shape_indexes = renderer.shape_indexes()
+        return result
+
+    def edge_at(self, point):
+        """Return the edge under the given point of the last rendered graph.
+
+        Args:
+            point (tuple): The (x, y) coordinates.
+
+        Returns:
+            Edge: The most specific edge under the point or None.
+        """
+        for index in self.shape_indexes:
+            hits = index.query_point(*point)
+            if len(hits) > 0:
+                return hits[0]
+        return None
+
+    def edges_in(self, rect):
+        """Return the edges intersecting the given rectangle of the last rendered graph.
+
+        Args:
+            rect (tuple): The (x, y, width, height) rectangle.
+
+        Returns:
+            set: The edges intersecting the rectangle.
+        """
+        return set().union(*(index.query_rect(*rect) for index in self.shape_indexes))
+
+    def edge_bounds(self, edge):
+        """Return the bounding boxes of the given edge in the last rendered graph.
+
+        Returns:
+            list: The (x, y, width, height) boxes of the edge.
+        """
+        return [bbox for index in self.shape_indexes for bbox in index.bounds(edge)]
@@ -6,7 +6,7 @@ Specialised Bokeh subclasses for visualising linguistic parses with Bokeh.
 """
 from .matplotlib_writer import MPLRenderer
 from bokeh.models import ColumnDataSource, DataRange1d, Plot, Label
-from bokeh.models.glyphs import Line, Bezier, Text
+from bokeh.models.glyphs import Line, Bezier, Text, Quad
 from bokeh.io import show
 from bokeh.plotting import figure
 
@@ -20,6 +20,15 @@ class BokehRenderer:
             int: The width of the text.
         """
         return MPLRenderer.get_text_width(text, size, font)
+
+    @staticmethod
+    def get_text_dims(text: str, size: int, font: str) -> tuple:
+        """Return the width and the height of the text.
+
+        Returns:
+            tuple: The width and the height of the text.
+        """
+        return MPLRenderer.get_text_dims(text, size, font)
         
     @staticmethod
     def draw_line(scene: Plot, start: tuple, ctrl1: tuple, ctrl2: tuple, end: tuple,
@@ -103,6 +112,19 @@ class BokehRenderer:
         scene.add_layout(label)
         return origin[0], origin[1], width, height
 
+    @staticmethod
+    def draw_cells(scene: Plot, origin: tuple, cell_size: int, cells: list, color: tuple):
+        # One Quad glyph for all cells of the color instead of a glyph for each
+        if len(cells) == 0:
+            return
+        left = [origin[0] + column * cell_size for _, column in cells]
+        top = [origin[1] + row * cell_size for row, _ in cells]
+        source = ColumnDataSource(dict(left=left, right=[x + cell_size for x in left],
+                                       top=top, bottom=[y + cell_size for y in top]))
+        glyph = Quad(left="left", right="right", top="top", bottom="bottom",
+                     fill_color='#{0:02x}{1:02x}{2:02x}'.format(*color), line_alpha=0)
+        scene.add_glyph(source, glyph)
+
     @staticmethod
     def draw_text(scene: Plot, origin: tuple, text: str, font_size: int, font_family: str, color: tuple):
         source = ColumnDataSource(dict(x=[origin[0]], y=[origin[1]], text=[text]))
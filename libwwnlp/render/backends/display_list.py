@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A recording backend which stores the drawing commands of a layout to replay any horizontal window of it later.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from libwwnlp.render.layouts.spatial_index import SpatialIndex
+
+
+class DisplayList:
+    """Records the drawing commands of a render to replay horizontal windows of it into an other backend.
+
+    The DisplayList is used as both the backend and the scene of a renderer (e.g. renderer.render(instance, dl)).
+    The text dimensions are measured by the target backend, so the recorded layout is the same as the one the target
+    backend would produce. Every command is registered in a SpatialIndex by its horizontal extent, so replaying a
+    window only touches the commands that are visible in it.
+
+    Commands crossing the window boundary are clipped: arrows and lines are cut at the boundary (as stubs pointing
+    out of the window) and boxes are narrowed to the visible part.
+
+    Attributes:
+        backend: The target backend (e.g. SVGWriteRenderer or QPainterRenderer).
+        width (int): The width of the recorded graph.
+        height (int): The height of the recorded graph.
+        token_bounds (list): The horizontal Bounds1D of the tokens in the order of the tokens (set by the renderer).
+        shape_indexes (tuple): The spatial indexes of the edges of the recorded render (set by the renderer).
+
+    Note on types:
+    _commands ([(str, tuple)]): The method names and arguments in the order of drawing.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.width = 0
+        self.height = 0
+        self.token_bounds = []
+        self.shape_indexes = ()
+        self._token_starts = None
+        self._token_ends = None
+        self._commands = []
+        self._index = SpatialIndex(cell_size=256)
+
+    def _record(self, x_min, x_max, method, args):
+        self._index.insert((x_min, 0, x_max - x_min, 0), len(self._commands))
+        self._commands.append((method, args))
+
+    def __len__(self):
+        return len(self._commands)
+
+    def get_text_dims(self, text: str, size: int, font: str) -> tuple:
+        return self.backend.get_text_dims(text, size, font)
+
+    def draw_line(self, scene, start: tuple, ctrl1: tuple, ctrl2: tuple, end: tuple, is_curved: bool,
+                  edge_color: tuple):
+        if scene is self:
+            xs = [point[0] for point in (start, ctrl1, ctrl2, end) if len(point) > 0]
+            self._record(min(xs), max(xs), 'draw_line', (start, ctrl1, ctrl2, end, is_curved, edge_color))
+
+    def draw_arrow_w_text_middle(self, scene, start: tuple, point1: tuple, point2: tuple, end: tuple,
+                                 height: int, arrowsize: int, is_curved: bool, text: str, font_size: int,
+                                 font_family: str, over: bool, color: tuple):
+        if scene is self:
+            half_label = self.get_text_dims(text, font_size, font_family)[0] / 2
+            labelx = min(start[0], point2[0]) + abs(start[0] - point2[0]) // 2
+            xs = [start[0], point1[0], point2[0], end[0]]
+            self._record(min(min(xs) - arrowsize, labelx - half_label), max(max(xs) + arrowsize, labelx + half_label),
+                         'draw_arrow_w_text_middle', (start, point1, point2, end, height, arrowsize, is_curved, text,
+                                                      font_size, font_family, over, color))
+
+    def draw_rectangle_around_text(self, scene, origin: tuple, width: int, height: int, fill_color: tuple,
+                                   line_color: tuple, line_width: int, rounded: int,
+                                   text: str, font_size: int, font_family: str):
+        if scene is self:
+            self._record(origin[0], origin[0] + width, 'draw_rectangle_around_text',
+                         (origin, width, height, fill_color, line_color, line_width, rounded, text, font_size,
+                          font_family))
+        return origin[0], origin[1], width, height
+
+    def draw_cells(self, scene, origin: tuple, cell_size: int, cells: list, color: tuple):
+        if scene is self and len(cells) > 0:
+            columns = [column for _, column in cells]
+            self._record(origin[0] + min(columns) * cell_size, origin[0] + (max(columns) + 1) * cell_size,
+                         'draw_cells', (origin, cell_size, cells, color))
+
+    def draw_text(self, scene, origin: tuple, text: str, font_size: int, font_family: str,
+                  color: tuple=(0, 0, 0)):
+        dims = self.get_text_dims(text, font_size, font_family)
+        if scene is self:
+            self._record(origin[0], origin[0] + dims[0], 'draw_text', (origin, text, font_size, font_family, color))
+        return dims
+
+    def token_window(self, from_token: int, to_token: int) -> tuple:
+        """Return the horizontal coordinates of the window showing the given tokens.
+
+        The window sides are halfway between the neighbouring tokens, so the edges attached to the first and last
+        tokens are not cut.
+
+        Args:
+            from_token (int): The index of the first token in the window.
+            to_token (int): The index of the token after the last one in the window (exclusive).
+
+        Returns:
+            tuple: The left and right side of the window.
+        """
+        from_token = max(from_token, 0)
+        to_token = min(to_token, len(self.token_bounds))
+        if from_token >= to_token:
+            return 0, 0
+        left = 0
+        if from_token > 0:
+            left = (self.token_bounds[from_token - 1].end + self.token_bounds[from_token].start) // 2
+        right = self.width
+        if to_token < len(self.token_bounds):
+            right = (self.token_bounds[to_token - 1].end + self.token_bounds[to_token].start) // 2
+        return left, right
+
+    def tokens_between(self, left: int, right: int) -> tuple:
+        """Return the range of the tokens that are (at least partially) between the given horizontal coordinates.
+
+        Returns:
+            tuple: The index of the first token and the index after the last token.
+        """
+        if self._token_ends is None:  # The token bounds are final once the first window is requested
+            self._token_starts = [bounds.start for bounds in self.token_bounds]
+            self._token_ends = [bounds.end for bounds in self.token_bounds]
+        return bisect_left(self._token_ends, left), bisect_right(self._token_starts, right)
+
+    def replay(self, scene, left: int, right: int):
+        """Draw the commands visible between the given horizontal coordinates into the scene of the target backend.
+
+        The window is translated to the origin of the scene.
+
+        Args:
+            scene: The scene of the target backend to draw on.
+            left (int): The left side of the window.
+            right (int): The right side of the window.
+        """
+        if left >= right:
+            return
+        for command_nr in sorted(self._index.query_rect(left, 0, right - left, 0)):
+            method, args = self._commands[command_nr]
+            getattr(self, '_replay_' + method)(scene, left, right, *args)
+
+    @staticmethod
+    def _clip(point: tuple, left: int, right: int) -> tuple:
+        """Clamp a point into the window and translate it to the origin of the window."""
+        return min(max(point[0], left), right) - left, point[1]
+
+    def _replay_draw_line(self, scene, left, right, start, ctrl1, ctrl2, end, is_curved, edge_color):
+        if is_curved:  # Bezier curves are not cut, they are drawn whole (the scene clips them)
+            start, ctrl1, ctrl2, end = ((point[0] - left, point[1]) for point in (start, ctrl1, ctrl2, end))
+        else:
+            start, end = self._clip(start, left, right), self._clip(end, left, right)
+        self.backend.draw_line(scene, start, ctrl1, ctrl2, end, is_curved, edge_color)
+
+    def _replay_draw_arrow_w_text_middle(self, scene, left, right, start, point1, point2, end, height, arrowsize,
+                                         is_curved, text, font_size, font_family, over, color):
+        if any(not left <= point[0] <= right for point in (start, end)):
+            # A stub: the vertical parts outside of the window collapse onto the boundary and the arrow head
+            # (if the end is outside) marks where the edge leaves the window
+            is_curved = False
+        start, point1, point2, end = (self._clip(point, left, right) for point in (start, point1, point2, end))
+        self.backend.draw_arrow_w_text_middle(scene, start, point1, point2, end, height, arrowsize, is_curved, text,
+                                              font_size, font_family, over, color)
+
+    def _replay_draw_rectangle_around_text(self, scene, left, right, origin, width, height, fill_color, line_color,
+                                           line_width, rounded, text, font_size, font_family):
+        new_origin = self._clip(origin, left, right)
+        width = self._clip((origin[0] + width, 0), left, right)[0] - new_origin[0]
+        self.backend.draw_rectangle_around_text(scene, new_origin, width, height, fill_color, line_color, line_width,
+                                                rounded, text, font_size, font_family)
+
+    def _replay_draw_cells(self, scene, left, right, origin, cell_size, cells, color):
+        # The cells are drawn whole (the scene clips the ones crossing the boundary)
+        first, last = (left - origin[0]) // cell_size, (right - origin[0]) // cell_size
+        self.backend.draw_cells(scene, (origin[0] - left, origin[1]), cell_size,
+                                [(row, column) for row, column in cells if first <= column <= last], color)
+
+    def _replay_draw_text(self, scene, left, right, origin, text, font_size, font_family, color):
+        self.backend.draw_text(scene, (origin[0] - left, origin[1]), text, font_size, font_family, color)
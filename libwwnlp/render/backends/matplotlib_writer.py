@@ -33,6 +33,20 @@ class MPLRenderer:
         plt.close(fig)
         return bounding_box.width
 
+    @staticmethod
+    def get_text_dims(text: str, size: int, font: str) -> tuple:
+        """Return the width and the height of the text.
+
+        Returns:
+            tuple: The width and the height of the text.
+        """
+        fig = plt.figure()
+        ax = fig.add_subplot(111)
+        content = Axes.text(ax, 0, 0, s=text, fontsize=size, fontname=font)
+        bounding_box = content.get_window_extent()
+        plt.close(fig)
+        return bounding_box.width, bounding_box.height
+
     @staticmethod
     def draw_line(scene: Axes, start: tuple, ctrl1: tuple, ctrl2: tuple, end: tuple, is_curved: bool,
                   edge_color: tuple):
@@ -141,6 +155,18 @@ class MPLRenderer:
 
         return origin[0], origin[1], width, height
 
+    @staticmethod
+    def draw_cells(scene: Axes, origin: tuple, cell_size: int, cells: list, color: tuple):
+        # One compound path with a closed subpath for each cell instead of a patch for each
+        vertices, codes = [], []
+        for row, column in cells:
+            x, y = origin[0] + column * cell_size, origin[1] + row * cell_size
+            vertices.extend(((x, y), (x + cell_size, y), (x + cell_size, y + cell_size), (x, y + cell_size), (x, y)))
+            codes.extend((Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY))
+        if len(vertices) > 0:
+            scene.add_patch(PathPatch(Path(vertices, codes), facecolor='#{0:02x}{1:02x}{2:02x}'.format(*color),
+                                      edgecolor='none', linewidth=0))
+
     @staticmethod
     def draw_text(scene: Axes, origin: tuple, text: str, font_size: int, font_family: str, color: tuple):
         # TODO: Here was TextToken (must align to left)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Qt-native rendering backend which draws linguistic parses with QPainter.
+
+The drawing is recorded into a QPicture, so no SVG is generated and parsed for the interactive view. Recording a
+QPicture is allowed outside the GUI thread, hence pictures can also be prepared in the background.
+"""
+
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QColor, QFont, QFontMetricsF, QImage, QPainter, QPainterPath, QPen, QPicture
+
+
+class QPainterRenderer:
+    @staticmethod
+    def _font(size: int, font: str) -> QFont:
+        """Return a QFont for a CSS like font family list (e.g. 'Courier New, Courier, monospace')."""
+        families = [family.strip() for family in font.split(',')]
+        qfont = QFont(families[0])
+        qfont.setPixelSize(size)
+        if 'monospace' in families:
+            qfont.setStyleHint(QFont.Monospace)
+        return qfont
+
+    @staticmethod
+    def _pen(color: tuple, width: int=1) -> QPen:
+        pen = QPen(QColor(*color))
+        pen.setWidth(width)
+        return pen
+
+    def get_text_dims(self, text: str, size: int, font: str) -> tuple:
+        """Return the width and height of the text.
+
+        Returns:
+            tuple: The width and height of the text.
+        """
+        metrics = QFontMetricsF(self._font(size, font))
+        return metrics.horizontalAdvance(text), metrics.height()
+
+    def _draw_centered_text(self, scene: QPainter, center: tuple, text: str, font_size: int, font_family: str,
+                            color: tuple):
+        width, height = self.get_text_dims(text, font_size, font_family)
+        scene.setFont(self._font(font_size, font_family))
+        scene.setPen(self._pen(color))
+        scene.drawText(QRectF(center[0] - width / 2, center[1] - height / 2, width, height), Qt.AlignCenter, text)
+
+    def draw_line(self, scene: QPainter, start: tuple, ctrl1: tuple, ctrl2: tuple, end: tuple, is_curved: bool,
+                  edge_color: tuple):
+        path = QPainterPath(QPointF(*start))
+        if is_curved:  # cubic Bezier curve
+            path.cubicTo(QPointF(*ctrl1), QPointF(*ctrl2), QPointF(*end))
+        else:
+            path.lineTo(QPointF(*end))
+        scene.strokePath(path, self._pen(edge_color))
+
+    def draw_arrow_w_text_middle(self, scene: QPainter, start: tuple, point1: tuple, point2: tuple, end: tuple,
+                                 height: int, arrowsize: int, is_curved: bool, text: str, font_size: int,
+                                 font_family: str, over: bool, color: tuple):
+        path = QPainterPath(QPointF(*start))
+        if is_curved:
+            middle = (point1[0] + (point2[0] - point1[0]) // 2, point1[1])
+            path.cubicTo(QPointF(*point1), QPointF(*point1), QPointF(*middle))
+            path.cubicTo(QPointF(*point2), QPointF(*point2), QPointF(*end))
+        else:
+            path.lineTo(QPointF(*point1))
+            path.lineTo(QPointF(*point2))
+            path.lineTo(QPointF(*end))
+
+        # Draw the arrow head
+        path.moveTo(end[0] - arrowsize, end[1] - arrowsize)
+        path.lineTo(QPointF(*end))
+        path.lineTo(end[0] + arrowsize, end[1] - arrowsize)
+        scene.strokePath(path, self._pen(color))
+
+        direction = 1
+        if over:
+            direction = -1
+
+        # Write label in the middle under
+        labelx = min(start[0], point2[0]) + abs(start[0] - point2[0]) // 2
+        labely = height + direction * self.get_text_dims(text, font_size, font_family)[1]
+        self._draw_centered_text(scene, (labelx, labely), text, font_size, font_family, color)
+
+    def draw_rectangle_around_text(self, scene: QPainter, origin: tuple, width: int, height: int, fill_color: tuple,
+                                   line_color: tuple, line_width: int, rounded: int,
+                                   text: str, font_size: int, font_family: str):
+        scene.setPen(self._pen(line_color, line_width))
+        scene.setBrush(QColor(*fill_color))
+        scene.drawRoundedRect(QRectF(origin[0], origin[1], width, height), rounded, rounded)
+
+        # write label in the middle
+        self._draw_centered_text(scene, (origin[0] + width // 2, origin[1] + height // 2), text, font_size,
+                                 font_family, line_color)
+
+        return origin[0], origin[1], width, height
+
+    @staticmethod
+    def draw_cells(scene: QPainter, origin: tuple, cell_size: int, cells: list, color: tuple):
+        """Fill the given (row, column) cells of a grid starting at origin with one color in one call."""
+        scene.setPen(Qt.NoPen)
+        scene.setBrush(QColor(*color))
+        scene.drawRects([QRectF(origin[0] + column * cell_size, origin[1] + row * cell_size, cell_size, cell_size)
+                         for row, column in cells])
+
+    def draw_text(self, scene: QPainter, origin: tuple, text: str, font_size: int, font_family: str,
+                  color: tuple=(0, 0, 0)):
+        # Layouts pass a non-painter scene (set()) when they only need the dimensions
+        if isinstance(scene, QPainter):
+            scene.setFont(self._font(font_size, font_family))
+            scene.setPen(self._pen(color))
+            scene.drawText(QPointF(*origin), text)  # Origin is on the baseline like in SVG
+        return self.get_text_dims(text, font_size, font_family)
+
+    @staticmethod
+    def render_nlpgraphics(renderer, filtered, filepath: str=None, output_type: str='PNG'):
+        """Render an NLPInstance with QPainter.
+
+        Args:
+            renderer (SingleSentenceRenderer or AlignmentRenderer): The renderer object.
+            filtered (NLPInstance): The filtered NLPInstane to be rendered.
+            filepath (str): The path of the outputfile.
+            output_type (str): The type of the output format (PNG or other raster formats supported by QImage).
+
+        Returns: The QPicture of the rendered object if no filepath is given.
+        """
+        picture = QPicture()
+        painter = QPainter(picture)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        dim = renderer.render(filtered, painter)
+        painter.end()
+        picture.setBoundingRect(QRectF(0, 0, dim[0], dim[1]).toAlignedRect())
+
+        if filepath is None:
+            return picture
+
+        image = QImage(max(int(dim[0]), 1), max(int(dim[1]), 1), QImage.Format_ARGB32)
+        image.fill(Qt.white)
+        painter = QPainter(image)
+        picture.play(painter)
+        painter.end()
+        if not image.save(filepath, output_type):
+            raise ValueError('{0} not a supported filetype!'.format(output_type))
@@ -134,6 +134,14 @@ class SVGWriteRenderer:
 
         return origin[0], origin[1], width, height
 
+    @staticmethod
+    def draw_cells(scene: Drawing, origin: tuple, cell_size: int, cells: list, color: tuple):
+        # One path with a subpath for each cell instead of a Rect element for each
+        path = ''.join('M{0},{1}h{2}v{2}h-{2}z'.format(origin[0] + column * cell_size, origin[1] + row * cell_size,
+                                                       cell_size) for row, column in cells)
+        if len(path) > 0:
+            scene.add(Path(d=path, fill=rgb(*color), stroke='none', shape_rendering='inherit'))
+
     def draw_text(self, scene: Drawing, origin: tuple, text: str, font_size: int, font_family: str,
                   color: tuple=(0, 0, 0)):
         # TODO: Here was TextToken (must align to left)
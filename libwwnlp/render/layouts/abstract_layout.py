@@ -5,6 +5,8 @@
 # use of QPoint which introduced an unnecessary dependency on QT.
 from collections import namedtuple, Counter
 
+from libwwnlp.render.layouts.spatial_index import SpatialIndex
+
 """This named tuple represents one dimensional bounds.
 """
 Point = namedtuple('Point', ['x', 'y'])
@@ -31,14 +33,43 @@ class AbstractLayout:
 
     It mostly stores properties associated with drawing edge layouts, such as
     whether lines should be curved or not.
+
+    Attributes:
+        shapes (dict): The drawn shapes (coordinate tuples) mapped to their edges.
+        index (SpatialIndex): The spatial index of the drawn edges built
+            during the last layout (a new index is created for each layout).
     """
     def __init__(self):
         """Initialize an AbstractLayout instance.
         """
         self.shapes = {}
+        self.index = SpatialIndex()
         self.visible = set()
         self.r = None
 
+    def edge_at(self, point):
+        """Return the edge under the given point in the last layout.
+
+        Args:
+            point (tuple): The (x, y) coordinates.
+
+        Returns:
+            Edge: The most specific edge under the point or None.
+        """
+        hits = self.index.query_point(*point)
+        return hits[0] if len(hits) > 0 else None
+
+    def edges_in(self, rect):
+        """Return the edges intersecting the given rectangle in the last layout.
+
+        Args:
+            rect (tuple): The (x, y, width, height) rectangle.
+
+        Returns:
+            set: The edges intersecting the rectangle.
+        """
+        return self.index.query_rect(*rect)
+
     def calculate_depth_maxdepth_height(self, dominates, edges_, height_per_level):
         depth = self._calculate_depth(dominates, edges_)
         # calculate max_height and max_width
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from libwwnlp.render.layouts.abstract_layout import AbstractLayout, middle
+from libwwnlp.render.layouts.spatial_index import SpatialIndex
 
 
 class AlignmentLayout(AbstractLayout):
@@ -16,6 +17,8 @@ class AlignmentLayout(AbstractLayout):
         type_colors = constants['type_colors']
 
         token_xbounds1, token_xbounds2 = bounds
+        self.shapes.clear()
+        self.index = SpatialIndex()
         for edge in edges:
             bound1 = middle(token_xbounds1[edge.start])
             bound2 = middle(token_xbounds2[edge.end])
@@ -25,3 +28,19 @@ class AlignmentLayout(AbstractLayout):
             end = (bound2, height + height_per_level)
 
             self.r.draw_line(scene, start, ctrl1, ctrl2, end, curve, self.get_color(edge, type_colors, property_colors))
+
+            # Store shape coordinates for selection with mouse click (the curve is approximated by short segments)
+            self.shapes[(start, ctrl1, ctrl2, end)] = edge
+            if curve:
+                points = [self._bezier_point(start, ctrl1, ctrl2, end, i / 8) for i in range(9)]
+            else:
+                points = [start, end]
+            for seg_start, seg_end in zip(points, points[1:]):
+                self.index.insert_segment(seg_start, seg_end, edge)
+
+    @staticmethod
+    def _bezier_point(start, ctrl1, ctrl2, end, t):
+        """Return the point of the cubic Bezier curve at parameter t (0 <= t <= 1)."""
+        weights = ((1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t ** 2, t ** 3)
+        return tuple(sum(weight * point[i] for weight, point in zip(weights, (start, ctrl1, ctrl2, end)))
+                     for i in range(2))
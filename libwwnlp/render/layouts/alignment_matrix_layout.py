@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+
+from libwwnlp.render.layouts.abstract_layout import AbstractLayout
+from libwwnlp.render.layouts.spatial_index import SpatialIndex
+
+
+class AlignmentMatrixLayout(AbstractLayout):
+    """Lays out alignment edges as the filled cells of a source x target grid.
+
+    The cells are grouped by their colors and every group is drawn with one draw_cells call of the backend, so the
+    cost of drawing does not depend on the number of individual shapes the backend would have to create.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    def layout(self, scene, edges, positions, constants, origin, cell_size):
+        """Draw the cells of the given edges.
+
+        Args:
+            scene: The graphics object to draw upon.
+            edges (list): The alignment edges.
+            positions (tuple): The two {Token: int} dicts mapping the source tokens to rows and the target tokens to
+                columns. The edges between other tokens are not drawn.
+            constants (dict): The common constants (the type and property colors are used).
+            origin (tuple): The top left corner of the grid.
+            cell_size (int): The width and height of a cell.
+        """
+        property_colors = constants['property_colors']
+        type_colors = constants['type_colors']
+        rows, columns = positions
+        x, y = origin
+
+        self.shapes.clear()
+        self.index = SpatialIndex(cell_size=max(64, cell_size))
+        cells_by_color = defaultdict(list)
+        for edge in edges:
+            start, end = edge.start, edge.end
+            if start not in rows:  # Links stored from target to source
+                start, end = end, start
+            row, column = rows.get(start), columns.get(end)
+            if row is None or column is None:
+                continue
+            cells_by_color[self.get_color(edge, type_colors, property_colors)].append((row, column))
+            cell = (x + column * cell_size, y + row * cell_size, cell_size, cell_size)
+            self.shapes[cell] = edge
+            self.index.insert(cell, edge)
+
+        for color, cells in sorted(cells_by_color.items()):
+            self.r.draw_cells(scene, origin, cell_size, cells, color)
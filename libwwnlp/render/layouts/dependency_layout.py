@@ -7,6 +7,7 @@ import operator
 from collections import Counter, defaultdict
 
 from libwwnlp.render.layouts.abstract_layout import AbstractLayout
+from libwwnlp.render.layouts.spatial_index import SpatialIndex
 
 
 class DependencyLayout(AbstractLayout):
@@ -65,6 +66,7 @@ class DependencyLayout(AbstractLayout):
 
         # find out height of each edge
         self.shapes.clear()
+        self.index = SpatialIndex()
 
         loops = defaultdict(list)
         all_loops = set()
@@ -170,6 +172,9 @@ class DependencyLayout(AbstractLayout):
 
             # Store shape coordinates for selection with mouse click
             self.shapes[(point1, point2, point3, point4)] = edge
+            self.index.insert_segment(point1, point2, edge, arrowsize + 1)
+            self.index.insert_segment(point2, point3, edge, arrowsize + 1)
+            self.index.insert_segment(point3, point4, edge, arrowsize + 1)
 
         return max_width + arrowsize + 2, max_height  # TODO: Constants?
 
@@ -4,6 +4,7 @@
 from collections import Counter, defaultdict
 
 from libwwnlp.render.layouts.abstract_layout import AbstractLayout, Bounds1D
+from libwwnlp.render.layouts.spatial_index import SpatialIndex
 
 
 class SpanLayout(AbstractLayout):
@@ -90,9 +91,10 @@ class SpanLayout(AbstractLayout):
             for under in edges_:
                 order_over = orders.get(over.edge_type)
                 order_under = orders.get(under.edge_type)
+                # The types without an order are above the ordered ones (one way only, or they would dominate each
+                # other and the depth calculation would not terminate)
                 if over != under and (order_over is None and order_under is not None) or \
-                   (order_over is not None and order_under is None) or \
-                   (order_over != order_under and order_over > order_under) or \
+                   (order_over is not None and order_under is not None and order_over > order_under) or \
                    (order_over == order_under and  # Also when both are None...
                     (over.covers(under) or over.covers_semi(under) or
                      over.covers_exactly(under) and
@@ -107,6 +109,7 @@ class SpanLayout(AbstractLayout):
         # draw each edge
 
         self.shapes.clear()
+        self.index = SpatialIndex()
         for edge in edges_:
             # draw lines
             span_level = 1  # starts from 1
@@ -134,6 +137,7 @@ class SpanLayout(AbstractLayout):
 
             # Store shape coordinates for selection with mouse click
             self.shapes[bbox] = edge
+            self.index.insert(bbox, edge)
 
         if separation_lines:
             # find largest depth for each prefix type
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+
+
+class SpatialIndex:
+    """A uniform grid over axis-aligned bounding boxes for hit-testing the drawn shapes.
+
+    Every box is registered in each grid cell it overlaps, so point and
+    rectangle queries only check the boxes in the cells they touch instead of
+    scanning every shape of the graph.
+
+    Note on types:
+    bbox ((x, y, width, height)): The same format as the bounding boxes
+        returned by the render backends.
+    _cells (defaultdict({(int, int): [(bbox, item)]}))
+    _bounds (defaultdict({item: [bbox]}))
+    """
+
+    def __init__(self, cell_size: int=64):
+        """Initialize an empty index.
+
+        Args:
+            cell_size (int): The width and height of a grid cell in pixels.
+        """
+        self._cell_size = cell_size
+        self._cells = defaultdict(list)
+        self._bounds = defaultdict(list)
+
+    def _cell_keys(self, x, y, width, height):
+        size = self._cell_size
+        return ((col, row) for col in range(int(x // size), int((x + width) // size) + 1)
+                for row in range(int(y // size), int((y + height) // size) + 1))
+
+    def insert(self, bbox: tuple, item):
+        """Register an item with one of its bounding boxes.
+
+        An item can be registered with several boxes (e.g. the segments of an
+        arrow), it is hit if any of them is.
+
+        Args:
+            bbox (tuple): The (x, y, width, height) box.
+            item: The item to return for hits in the box (e.g. an Edge).
+        """
+        entry = (bbox, item)
+        for key in self._cell_keys(*bbox):
+            self._cells[key].append(entry)
+        self._bounds[item].append(bbox)
+
+    def insert_segment(self, start: tuple, end: tuple, item, tolerance: int=3):
+        """Register the bounding box of a line segment widened by the given tolerance.
+
+        Args:
+            start (tuple): The start point of the segment.
+            end (tuple): The end point of the segment.
+            item: The item to return for hits near the segment.
+            tolerance (int): How far a point can be from the segment to hit it.
+        """
+        min_x, max_x = sorted((start[0], end[0]))
+        min_y, max_y = sorted((start[1], end[1]))
+        self.insert((min_x - tolerance, min_y - tolerance, max_x - min_x + 2 * tolerance,
+                     max_y - min_y + 2 * tolerance), item)
+
+    def query_point(self, x, y) -> list:
+        """Return the items hit by the given point.
+
+        Returns:
+            list: The items that have a box containing the point, the ones
+            with the smallest box first (that is the most specific hit).
+        """
+        hits = {}
+        cell = (int(x // self._cell_size), int(y // self._cell_size))
+        for (b_x, b_y, width, height), item in self._cells.get(cell, ()):
+            if b_x <= x <= b_x + width and b_y <= y <= b_y + height:
+                area = width * height
+                if item not in hits or area < hits[item]:
+                    hits[item] = area
+        return sorted(hits, key=hits.get)
+
+    def query_rect(self, x, y, width, height) -> set:
+        """Return the items that have a box intersecting the given rectangle.
+
+        Returns:
+            set: The items intersecting the rectangle.
+        """
+        result = set()
+        for key in self._cell_keys(x, y, width, height):
+            for (b_x, b_y, b_width, b_height), item in self._cells.get(key, ()):
+                if b_x <= x + width and x <= b_x + b_width and b_y <= y + height and y <= b_y + b_height:
+                    result.add(item)
+        return result
+
+    def window(self, x, y, width, height):
+        """Return a new index of the items intersecting the given rectangle translated to its origin.
+
+        Only the items in the rectangle are copied (with all of their boxes), so it is cheap for small windows of
+        large graphs.
+
+        Returns:
+            SpatialIndex: The index of the window.
+        """
+        result = SpatialIndex(self._cell_size)
+        for item in self.query_rect(x, y, width, height):
+            for b_x, b_y, b_width, b_height in self._bounds[item]:
+                result.insert((b_x - x, b_y - y, b_width, b_height), item)
+        return result
+
+    def bounds(self, item) -> list:
+        """Return the boxes the given item was registered with.
+
+        Returns:
+            list: The (x, y, width, height) boxes of the item.
+        """
+        return self._bounds.get(item, [])
+
+    def __len__(self):
+        """Return the number of the registered items."""
+        return len(self._bounds)
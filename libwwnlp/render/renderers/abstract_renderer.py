@@ -85,3 +85,11 @@ class AbstractRenderer(Configurable):
 
     def render(self, instance, scene, render_spans=False):
         raise NotImplementedError
+
+    def shape_indexes(self):
+        """Return the spatial indexes of the edges drawn by the last render (see SpatialIndex).
+
+        Returns:
+            tuple: The indexes of the edge layouts.
+        """
+        raise NotImplementedError
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from libwwnlp.render.renderers.abstract_renderer import AbstractRenderer
+from libwwnlp.render.layouts.alignment_matrix_layout import AlignmentMatrixLayout
+from libwwnlp.model.edge import EdgeRenderType
+from libwwnlp.configurable import params_at_path
+
+
+class AlignmentMatrixRenderer(AbstractRenderer):
+    """An AlignmentMatrixRenderer renders two aligned sentences as an alignment matrix.
+
+    The tokens of the first sentence label the rows, the tokens of the second sentence are the columns (labelled by
+    their positions) and every alignment edge fills the cell of its two tokens with the color of its type or diff
+    status (see AbstractLayout#get_color). Unlike AlignmentRenderer, which draws a curve for every edge, the cells of
+    one color are drawn at once, so long (e.g. document length) pairs remain cheap to draw and readable.
+
+    The cells shrink (down to one pixel) if the grid would be larger than matrix.max_size, and only every n-th row
+    and column is labelled if the cells are too small for the labels, so the size of the output stays bounded.
+
+    Parameters:
+        matrix:
+            cell_size (int): The width and height of the cells in pixels.
+            max_size (int): The maximal width and height of the grid in pixels.
+            grid_color (color): The color of the frame and the guide lines of the labelled rows and columns.
+            label_margin (int): The space between the labels and the grid in pixels.
+
+    Attributes:
+        _matrix_layout (AlignmentMatrixLayout): The layout of the cells.
+    """
+
+    def __init__(self, params=None):
+        """Initialize an AlignmentMatrixRenderer.
+        """
+        super().__init__(params)
+        self._matrix_layout = AlignmentMatrixLayout()
+
+    @staticmethod
+    def default_params():
+        params = AbstractRenderer.default_params()
+        params.update({'matrix.cell_size': 12, 'matrix.max_size': 2400, 'matrix.grid_color': (211, 211, 211),
+                       'matrix.label_margin': 4})
+        return params
+
+    def render(self, instance, scene, render_spans=False):
+        """Renders the given instance as an alignment matrix.
+
+        Args:
+            instance (NLPInstance): The instance to render.
+            scene (Scene): The graphics object to draw upon.
+            render_spans (bool): Not used, alignments have no spans.
+
+        Returns:
+            tuple: The width and height of the drawn object.
+        """
+        self._matrix_layout.r = self.backend
+        token_params = params_at_path(self.params, 'token')
+        font_size, font_family, color = token_params['fontsize'], token_params['font_family'], token_params['color']
+        grid_color = self.params['matrix.grid_color']
+        margin = self.params['matrix.label_margin']
+        tokens = instance.tokens
+        source, target = tokens[:instance.split_point], tokens[instance.split_point:]
+
+        cell_size = max(1, min(self.params['matrix.cell_size'],
+                               self.params['matrix.max_size'] // max(len(source), len(target), 1)))
+        em_width, em_height = self.backend.get_text_dims('M', font_size, font_family)
+        row_step = -(-int(em_height) // cell_size)  # Ceiling division
+        column_step = -(-int(len(str(len(target))) * em_width + margin) // cell_size)
+
+        row_labels = [(row, self._label(token)) for row, token in enumerate(source) if row % row_step == 0]
+        left = max((self.backend.get_text_dims(label, font_size, font_family)[0] for _, label in row_labels),
+                   default=0) + margin
+        top = em_height + margin
+        width, height = len(target) * cell_size, len(source) * cell_size
+
+        self.backend.draw_rectangle_around_text(scene, (left, top), width, height, (255, 255, 255), grid_color, 1, 0,
+                                                '', font_size, font_family)
+        for row, label in row_labels:
+            y = top + row * cell_size + cell_size // 2
+            self.backend.draw_line(scene, (left, y), (), (), (left + width, y), False, grid_color)
+            label_width = self.backend.get_text_dims(label, font_size, font_family)[0]
+            self.backend.draw_text(scene, (left - margin - label_width, y + em_height // 3), label, font_size,
+                                   font_family, color)
+        for column in range(0, len(target), column_step):
+            x = left + column * cell_size + cell_size // 2
+            self.backend.draw_line(scene, (x, top), (), (), (x, top + height), False, grid_color)
+            label = str(column + 1)
+            label_width = self.backend.get_text_dims(label, font_size, font_family)[0]
+            self.backend.draw_text(scene, (x - label_width // 2, top - margin), label, font_size, font_family, color)
+
+        self._matrix_layout.layout(scene, instance.get_edges(EdgeRenderType.dependency),
+                                   ({token: row for row, token in enumerate(source)},
+                                    {token: column for column, token in enumerate(target)}),
+                                   params_at_path(self.params, 'common'), (left, top), cell_size)
+
+        return left + width + margin, top + height + margin
+
+    @staticmethod
+    def _label(token):
+        """Return the value of the first property (e.g. the word) of the token."""
+        names = token.get_property_names()
+        if len(names) == 0:
+            return ''
+        return token.get_property_value(names[0])
+
+    def shape_indexes(self):
+        """Return the spatial indexes of the edges drawn by the last render.
+
+        Returns:
+            tuple: The index of the matrix layout.
+        """
+        return self._matrix_layout.index,
@@ -61,3 +61,11 @@ class AlignmentRenderer(AbstractRenderer):
                                       dim1y)
 
         return max(dim1x, dim2x), sum((dim1y, dim2y, height_per_level))
+
+    def shape_indexes(self):
+        """Return the spatial indexes of the edges drawn by the last render.
+
+        Returns:
+            tuple: The index of the alignment layout.
+        """
+        return self._alignment_layout.index,
@@ -7,10 +7,12 @@ analysed sentence.
 """
 
 from libwwnlp.render.renderers.abstract_renderer import AbstractRenderer
+from libwwnlp.render.backends.display_list import DisplayList
 from libwwnlp.model.edge import EdgeRenderType
 from libwwnlp.render.layouts.span_layout import SpanLayout
 from libwwnlp.render.layouts.dependency_layout import DependencyLayout
 from libwwnlp.render.layouts.token_layout import TokenLayout
+from libwwnlp.render.layouts.abstract_layout import Bounds1D
 from libwwnlp.configurable import params_at_path
 
 
@@ -23,6 +25,7 @@ class SingleSentenceRenderer(AbstractRenderer):
         _span_layout (EdgeLayout): The layout of span edges.
         _dependency_layout (EdgeLayout): The layout of dep. edges.
         _token_layout (TokenLayout): The token layout for the sentence.
+        _token_x_bounds (dict): The horizontal bounds of the tokens in the last render.
     """
 
     def __init__(self, params=None):
@@ -32,6 +35,7 @@ class SingleSentenceRenderer(AbstractRenderer):
         self._span_layout = SpanLayout()
         self._dependency_layout = DependencyLayout()
         self._token_layout = TokenLayout()
+        self._token_x_bounds = {}
 
     def render(self, instance, scene, render_spans=True):
         """Renders the given instance as a single sentence.
@@ -57,6 +61,7 @@ class SingleSentenceRenderer(AbstractRenderer):
         # find token bounds
         token_x_bounds, token_max_width, _ = self._token_layout.layout(set(), instance.tokens, widths,
                                                                        params_at_path(self.params, 'token'))
+        self._token_x_bounds = token_x_bounds
 
         # place dependencies on top
         d_width, d_height = self._dependency_layout.layout(scene, instance.get_edges(EdgeRenderType.dependency),
@@ -75,3 +80,36 @@ class SingleSentenceRenderer(AbstractRenderer):
                                                 (0, d_height + t_height))
 
         return max(d_width, t_width, token_max_width), sum((d_height, t_height, s_height))
+
+    def record(self, instance, backend, render_spans=True):
+        """Lay out the whole instance once and record the drawing commands to render windows of it later.
+
+        Args:
+            instance (NLPInstance): The instance to render.
+            backend: The backend which will draw the windows (it measures the texts).
+            render_spans (bool): Whether to render span edges.
+
+        Returns:
+            DisplayList: The recorded global layout (see WindowRenderer).
+        """
+        display_list = DisplayList(backend)
+        self.backend = display_list
+        try:
+            display_list.width, display_list.height = self.render(instance, display_list, render_spans)
+        finally:
+            self.backend = backend
+        last_end = 0
+        for token in instance.tokens:  # Tokens without properties take no space
+            bounds = self._token_x_bounds.get(token, Bounds1D(last_end, last_end))
+            display_list.token_bounds.append(bounds)
+            last_end = bounds.end
+        display_list.shape_indexes = self.shape_indexes()
+        return display_list
+
+    def shape_indexes(self):
+        """Return the spatial indexes of the edges drawn by the last render.
+
+        Returns:
+            tuple: The indexes of the dependency and span layouts.
+        """
+        return self._dependency_layout.index, self._span_layout.index
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+This module defines a class which renders a window of tokens from a once
+recorded global layout of a long NLPInstance.
+"""
+
+from libwwnlp.render.backends.display_list import DisplayList
+
+
+class WindowRenderer:
+    """A WindowRenderer renders the tokens from_token..to_token of a recorded layout.
+
+    The global layout is computed only once (see SingleSentenceRenderer#record)
+    and the windows are replayed from it, so scrolling through a long document
+    draws only the visible tokens and the edges touching them. Edges crossing
+    the window boundary are drawn as stubs cut at the boundary.
+
+    It can be used in place of the other renderers by the render backends
+    (e.g. backend.render_nlpgraphics(WindowRenderer(...), instance)).
+
+    Attributes:
+        display_list (DisplayList): The recorded global layout.
+        from_token (int): The index of the first token of the window.
+        to_token (int): The index of the token after the window (exclusive).
+    """
+
+    def __init__(self, display_list: DisplayList, from_token: int, to_token: int):
+        """Initialize a WindowRenderer instance.
+        """
+        self.display_list = display_list
+        self.from_token = from_token
+        self.to_token = to_token
+        self.backend = display_list.backend
+
+    def window(self):
+        """Return the horizontal coordinates of the window in the global layout.
+
+        Returns:
+            tuple: The left and right side of the window.
+        """
+        return self.display_list.token_window(self.from_token, self.to_token)
+
+    def render(self, instance, scene, render_spans=True):
+        """Renders the window of the recorded layout.
+
+        The instance is not used, as the layout was recorded for it before.
+
+        Args:
+            instance (NLPInstance): The instance the layout was recorded for.
+            scene (Scene): The graphics object to draw upon.
+            render_spans (bool): Not used, it was decided at recording.
+
+        Returns:
+            tuple: The width and height of the drawn object.
+        """
+        left, right = self.window()
+        self.display_list.replay(scene, left, right)
+        return right - left, self.display_list.height
+
+    def shape_indexes(self):
+        """Return the spatial indexes of the edges in the window (in the coordinates of the window).
+
+        Returns:
+            tuple: The indexes of the edge layouts cut to the window.
+        """
+        left, right = self.window()
+        return tuple(index.window(left, 0, right - left, self.display_list.height)
+                     for index in self.display_list.shape_indexes)
@@ -19,15 +19,23 @@ thebeast = True
 bionlp09 = True
 lisp_sexpr = True
 
+round_trip = True
+sampling = True
+
 
 def test():
     import os
 
     from libwwnlp.corpus_navigator import CorpusNavigator
 
-    def test_process(corp_format, fname, min_sent=0, max_sent=2):
+    # The predicates of test_data/thebeast_srl.gold (set in the GUI otherwise)
+    beast_settings = {'tokens': 'word:Word,pos:Pos', 'deps': 'dep:dep,role:role', 'spans': 'ne:ner'}
+
+    def test_process(corp_format, fname, min_sent=0, max_sent=2, settings=None):
         print('Testing {0}'.format(corp_format), file=sys.stderr)
         nav = CorpusNavigator()
+        for name, value in (settings or {}).items():
+            setattr(nav.known_corpus_formats[corp_format], name, value)
         nav.add_corpus(fname, corp_format, 'gold', min_sent, max_sent)
         nav.select_gold(os.path.basename(fname))
 
@@ -69,7 +77,7 @@ def test():
         test_process('Gale Alingment Format', 'test_data/gale.gold', max_sent=1)
 
     if thebeast:
-        test_process('The Beast Format', 'test_data/gale.gold', max_sent=1)
+        test_process('The Beast Format', 'test_data/thebeast_srl.gold', settings=beast_settings)
 
     if bionlp09:
         test_process('BioNLP2009 Shared Task Format', 'test_data/bionlp09', max_sent=1)
@@ -77,11 +85,175 @@ def test():
     if lisp_sexpr:
         test_process('Lisp S-expr Format', 'test_data/lispsexpr.gold', max_sent=1)
 
+    def signature(instance):
+        """Everything that the writers must keep: the tokens with their properties and the edges."""
+        return (sorted((token.index, sorted(token.token_properties.items())) for token in instance.tokens),
+                sorted((edge.start.index, edge.end.index, str(edge.label), str(edge.edge_type), edge.render_type.name,
+                        str(edge.note), str(edge.description), sorted(edge.properties)) for edge in instance.edges))
+
+    if thebeast:
+        import shutil
+        import tempfile
+
+        from ioformats.other_formats import TheBeastFormat
+
+        print('Testing streaming of The Beast Format', file=sys.stderr)
+        beast = TheBeastFormat()
+        for name, value in beast_settings.items():
+            setattr(beast, name, value)
+        fname = 'test_data/thebeast_srl.gold'
+        corpus = beast.load(fname, 0, sys.maxsize)
+        assert len(corpus) == 3
+        assert [token.get_property_value('Word') for token in corpus[0].tokens] == \
+            ['-Root-', 'John', 'loves', 'Mary', '.']
+        assert [token.get_property_value('Pos') for token in corpus[0].tokens] == [None, 'NNP', 'VBZ', 'NNP', '.']
+        assert sorted((edge.start.index, edge.end.index, edge.label, edge.edge_type, edge.description)
+                      for edge in corpus[0].edges) == \
+            [(0, 2, 'ROOT', 'dep', None), (1, 1, 'PER', 'ner', None), (2, 1, 'A0', 'role', None),
+             (2, 1, 'SBJ', 'dep', None), (2, 3, 'A1', 'role', 'the\n\tloved one'), (2, 3, 'OBJ', 'dep', None),
+             (2, 4, 'P', 'dep', None), (3, 3, 'PER', 'ner', None)]  # The unconfigured 'score' is ignored
+        # The bad rows of the second instance are skipped: a token, two dependencies and a span
+        assert [token.get_property_value('Word') for token in corpus[1].tokens] == \
+            ['-Root-', 'Peter', 'lives', 'in', 'New York']
+        assert sorted((edge.start.index, edge.end.index, edge.label) for edge in corpus[1].edges
+                      if edge.edge_type in ('dep', 'ner')) == \
+            [(0, 2, 'ROOT'), (1, 1, 'PER'), (2, 1, 'SBJ'), (2, 3, 'LOC'), (3, 4, 'PMOD'), (4, 4, 'LOC')]
+        assert [signature(inst) for inst in beast.load(fname, 1, 3)] == [signature(inst) for inst in corpus[1:]]
+
+        # A followed file: the last instance is complete only when the next one starts
+        with tempfile.TemporaryDirectory() as directory:
+            followed = os.path.join(directory, 'thebeast_srl.gold')
+            shutil.copy(fname, followed)
+            appended, offset = beast.load_appended(followed, 0)
+            assert [signature(inst) for inst in appended] == [signature(inst) for inst in corpus[:2]]
+            with open(followed, 'rb') as reader:
+                assert reader.read()[offset:].startswith(b'>>\n>word\n0 "-Root-"\n1 "It"')
+            assert beast.load_appended(followed, offset) == ([], offset)
+            with open(followed, 'a', encoding='UTF-8') as writer:
+                writer.write('\n>>\n>word\n1 "Next"\n')
+            appended, next_offset = beast.load_appended(followed, offset)
+            assert [signature(inst) for inst in appended] == [signature(corpus[2])]
+            with open(followed, 'rb') as reader:
+                assert reader.read()[next_offset:] == b'>>\n>word\n1 "Next"\n'
+
+    if round_trip:
+        import tempfile
+
+        from ioformats.corpus_converter import convert_corpus
+        from ioformats.format_registry import known_corpus_formats
+        from ioformats.format_sniffer import detect_format
+        from ioformats.jsonl_format import JSONLFormat, instance_from_line
+
+        formats = known_corpus_formats()
+        for name, value in beast_settings.items():
+            setattr(formats['The Beast Format'], name, value)
+        jsonl = JSONLFormat()
+        # The conll05.gold test file is in the CoNLL 2004 format, conll08.closed is read without its open track
+        tab_files = {'CoNLL2000': 'test_data/conll00.gold', 'CoNLL2002': 'test_data/conll02.gold',
+                     'CoNLL2003': 'test_data/conll03.gold', 'CoNLL2004': 'test_data/conll04.gold',
+                     'CoNLL2006': 'test_data/conll06.gold', 'CoNLL2008': 'test_data/conll08.closed',
+                     'CoNLL2009': 'test_data/conll09.gold', 'MaltTab': 'test_data/malt.gold'}
+        other_files = {'Giza Alingment Format': 'test_data/giza.gold', 'Gale Alingment Format': 'test_data/gale.gold',
+                       'Lisp S-expr Format': 'test_data/lispsexpr.gold',
+                       'The Beast Format': 'test_data/thebeast_srl.gold',
+                       'BioNLP2009 Shared Task Format': 'test_data/bionlp09'}
+        unread_columns = {'CoNLL2006': {8, 9}, 'CoNLL2008': {4}}  # PHEAD and PDEPREL, PPOS are written as '_'
+
+        with tempfile.TemporaryDirectory() as directory:
+            for corp_format, fname in sorted(tab_files.items()):
+                print('Testing round trip of {0}'.format(corp_format), file=sys.stderr)
+                tab_format = formats[corp_format]
+                raw = list(tab_format.iter_rows(fname, 0, sys.maxsize))
+                corpus = [tab_format.create(rows) for rows in raw]
+                written = os.path.join(directory, os.path.basename(fname) + '.gz')
+                assert tab_format.write(written, corpus) == len(corpus)
+                written_raw = list(tab_format.iter_rows(written, 0, sys.maxsize))
+                read_back = [tab_format.create(rows) for rows in written_raw]
+                assert [signature(inst) for inst in corpus] == [signature(inst) for inst in read_back], corp_format
+                assert detect_format(written, formats) == corp_format, corp_format
+
+                # The raw rows too, as the columns that are only written (e.g. FILLPRED) are not in the instances
+                unread = unread_columns.get(corp_format, set())
+                for rows, written_rows in zip(raw, written_raw):
+                    for row, written_row in zip(rows, written_rows):
+                        assert len(row) == len(written_row) and \
+                            all(value == written_value for column, (value, written_value)
+                                in enumerate(zip(row, written_row)) if column not in unread), (corp_format, row)
+
+            # Converted corpora must be detected as their new format (e.g. CoNLL 2009 without predicted heads)
+            converted = os.path.join(directory, 'conll06.conll09')
+            formats['CoNLL2009'].write(converted, formats['CoNLL2006'].load('test_data/conll06.gold', 0, sys.maxsize))
+            assert detect_format(converted, formats) == 'CoNLL2009'
+            # Nothing is written if the tokens have no words for the output format (e.g. alignments)
+            converted = os.path.join(directory, 'gale.malt')
+            try:
+                convert_corpus('test_data/gale.gold', formats['Gale Alingment Format'], converted, formats['MaltTab'])
+                assert False, 'Gale alignments converted to MaltTab'
+            except ValueError:
+                assert not os.path.exists(converted)
+
+            for corp_format, fname in sorted(tab_files.items()) + sorted(other_files.items()):
+                print('Testing JSONL round trip of {0}'.format(corp_format), file=sys.stderr)
+                corpus = formats[corp_format].load(fname, 0, sys.maxsize)
+                for inst in corpus:
+                    assert signature(instance_from_line(jsonl.format_instance(inst))) == signature(inst), corp_format
+                written = os.path.join(directory, os.path.basename(fname) + '.jsonl')
+                jsonl.write(written, corpus)
+                read_back = jsonl.load(written, 0, sys.maxsize)
+                assert [signature(inst) for inst in corpus] == [signature(inst) for inst in read_back], corp_format
+
+    if sampling:
+        from ioformats.corpus_sampler import _allocate, sample_corpus, load_indexes
+        from ioformats.tab_processor import CoNLL2009
+
+        print('Testing sampling', file=sys.stderr)
+        assert _allocate(10, [50, 30, 20], 'proportional') == [5, 3, 2]
+        assert _allocate(10, [1, 20, 20], 'proportional') == [0, 5, 5]  # The largest remainders get the places
+        assert _allocate(10, [2, 3, 0], 'proportional') == [2, 3, 0]  # Not more than the strata have
+        assert _allocate(10, [5], 'proportional') == [5]
+        assert _allocate(9, [1, 10, 10], 'equal') == [1, 4, 4]  # The places of the small stratum go to the others
+        assert _allocate(10, [10, 3, 10], 'equal') == [4, 3, 3]
+        assert _allocate(10, [2, 0, 3], 'equal') == [2, 0, 3]
+        assert _allocate(10, [0, 0], 'proportional') == [0, 0]
+
+        conll09 = CoNLL2009()
+        fname = 'test_data/conll09.gold'
+        corpus = [conll09.create(rows) for rows in conll09.iter_rows(fname, 0, sys.maxsize)]
+        sample = sample_corpus(conll09, fname, 5, seed=42)
+        indexes = [index for index, _ in sample]
+        assert indexes == [index for index, _ in sample_corpus(conll09, fname, 5, seed=42)]  # Reproducible
+        assert len(indexes) == 5 and indexes == sorted(set(indexes))
+        assert all(signature(inst) == signature(corpus[index]) for index, inst in sample)
+        assert [index for index, _ in sample_corpus(conll09, fname, 100, seed=42)] == list(range(len(corpus)))
+        assert [(index, signature(inst)) for index, inst in load_indexes(conll09, fname, indexes)] == \
+            [(index, signature(inst)) for index, inst in sample]
+
+        bins = (10, 20)
+        ranges = ((0, 10), (10, 20), (20, sys.maxsize))
+        row_counts = [len(rows) for rows in conll09.iter_rows(fname, 0, sys.maxsize)]  # The lengths of the sampler
+        strata = [sum(1 for length in row_counts if low <= length < high) for low, high in ranges]
+        sample = sample_corpus(conll09, fname, 6, length_bins=bins, seed=42)
+        lengths = [row_counts[index] for index, _ in sample]
+        assert [sum(1 for length in lengths if low <= length < high) for low, high in ranges] == \
+            _allocate(6, strata, 'proportional')
+        sample = sample_corpus(conll09, fname, 7, length_bins=bins, allocation='equal', seed=42)
+        lengths = [row_counts[index] for index, _ in sample]
+        assert [sum(1 for length in lengths if low <= length < high) for low, high in ranges] == \
+            _allocate(7, strata, 'equal') and len(sample) == min(7, len(row_counts))
+
+        label = 'A0'
+        with_label = [index for index, inst in enumerate(corpus) if any(edge.label == label for edge in inst.edges)]
+        sample = sample_corpus(conll09, fname, 3, label=label, seed=42)
+        assert len(sample) == min(3, len(with_label)) and all(index in with_label for index, _ in sample)
+
 
 if __name__ == '__main__':
     if len(sys.argv) > 1 and sys.argv[1] == 'TEST':
         test()
         exit(0)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'convert':
+        from ioformats.corpus_converter import main as convert
+        exit(convert(sys.argv[2:]))
     else:
         from Qt5GUI.gui_main import main
         main(sys.argv)